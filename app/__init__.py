@@ -1,34 +1,173 @@
 # app/__init__.py
-import os
-from flask import Flask
+import time
+_IMPORT_T0 = time.perf_counter()
+
+import hashlib, os, tempfile, threading
+from flask import Flask, g
 from dotenv import load_dotenv
 from .utils import load_version, tz_now
-from .models import init_db
+from .models import init_db, register_teardown
+from .weeks import ensure_current_week
+from .allocator import allocate_due
+from .metrics import init_metrics
+from .notify import init_notifications
+from .assets import init_assets
+from .archive import init_archive, start_archiver
+from .backup import init_backups
+from . import changes, jobs
+from .state import local_now
+from .schedule import parse_caps
 from .routes import register_kiosk
 from .admin_routes import register_admin
 
-def create_app():
+_IMPORT_MS = round((time.perf_counter() - _IMPORT_T0) * 1000, 1)
+
+def _schedule_seed(app):
+    """Create the current week eagerly, in a background thread, or on the first request (default)."""
+    mode = app.config["SEED_MODE"]
+    timing = app.config["STARTUP_TIMING"]
+
+    def seed():
+        t0 = time.perf_counter()
+        ensure_current_week()
+        timing.setdefault("seed_ms", round((time.perf_counter() - t0) * 1000, 1))
+
+    if mode == "eager":
+        seed()
+    elif mode == "background":
+        threading.Thread(target=seed, name="seed-week", daemon=True).start()
+    else:
+        # Also re-checks once a week when Monday rolls over; a no-op otherwise.
+        app.before_request(seed)
+
+def _schedule_allocation(app):
+    """Batch-allocate the current week's weekend holders on the first request after the freeze (jobs process only)."""
+    if not app.config["AUTO_ALLOCATE"]:
+        return
+
+    @app.before_request
+    def allocate_frozen_week():
+        if not jobs.held():
+            return
+        report = allocate_due(local_now())
+        if report:
+            app.logger.info("allocated week %s: %d changed, %d bumped",
+                            report["week_id"], report["changed"], len(report["bumped"]))
+
+def _share_invalidations(app):
+    """Several production workers: publish cache invalidations to the siblings (see changes.py)."""
+    if app.config["SERVER_MODE"] != "production" or app.config["WEB_WORKERS"] <= 1:
+        return
+    key = hashlib.sha1(app.config["DATABASE_URL"].encode()).hexdigest()[:12]
+    changes.enable(os.path.join(tempfile.gettempdir(), f"overtime-{key}.changes"))
+    app.before_request(changes.check)
+
+def _record_first_request(app, started: float):
+    """first_request_ms: the first request itself (incl. a lazy seed); ready_ms: create_app() to its response."""
+    timing = app.config["STARTUP_TIMING"]
+
+    @app.before_request
+    def mark_first_request():
+        if "first_request_ms" not in timing:
+            g.startup_t0 = time.perf_counter()
+
+    @app.after_request
+    def first_request(resp):
+        if "first_request_ms" not in timing and "startup_t0" in g:
+            now = time.perf_counter()
+            timing["first_request_ms"] = round((now - g.startup_t0) * 1000, 1)
+            timing["ready_ms"] = round((now - started) * 1000, 1)
+            app.logger.info("startup timing: %s", timing)
+        return resp
+
+def _start_jobs(app, dispatcher):
+    start_archiver(app)
+    init_backups(app)
+    if dispatcher:
+        dispatcher.start()
+
+def create_app(start_background: bool = True):
+    """The app; start_background=False (command-line scripts) leaves the background jobs to the serving process."""
+    started = time.perf_counter()
     load_dotenv()
     app = Flask(__name__, static_url_path="/static", static_folder="../static", template_folder="../templates")
 
     # Core config
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-key")
     app.config["DATABASE_URL"] = os.getenv("DATABASE_URL", "sqlite:///overtime.db")
+    app.config["SQLITE_PROFILE"] = os.getenv("SQLITE_PROFILE", "tuned").lower()  # tuned | default
     app.config["TIMEZONE"] = os.getenv("TIMEZONE", "America/Los_Angeles")
     app.config["APP_VERSION"] = load_version()
+    app.config["SEED_MODE"] = os.getenv("SEED_MODE", "lazy").lower()  # lazy | background | eager
+    app.config["STARTUP_TIMING"] = {"import_ms": _IMPORT_MS}
+    app.config["IDEMPOTENCY_TTL_HOURS"] = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+    app.config["AUTO_ALLOCATE"] = str(os.getenv("AUTO_ALLOCATE", "true")).lower() == "true"
+    # Weekly overtime-hours cap per shift_type, e.g. "DAY:16,ROTATING:12"; empty = no cap (see schedule.py)
+    app.config["WEEKLY_HOURS_CAP"] = parse_caps(os.getenv("WEEKLY_HOURS_CAP", ""))
+
+    # Archiving of closed weeks into per-year files (see archive.py); 0 weeks disables the background job
+    app.config["ARCHIVE_DIR"] = os.getenv("ARCHIVE_DIR", "")   # default: archive/ next to the database
+    app.config["ARCHIVE_AFTER_WEEKS"] = int(os.getenv("ARCHIVE_AFTER_WEEKS", "26"))
+    app.config["ARCHIVE_BATCH_WEEKS"] = int(os.getenv("ARCHIVE_BATCH_WEEKS", "4"))
+    app.config["ARCHIVE_INTERVAL_HOURS"] = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+    app.config["ARCHIVE_START_DELAY"] = float(os.getenv("ARCHIVE_START_DELAY", "60"))  # seconds after startup
+
+    # Online backups (see backup.py); 0 hours disables the background job
+    app.config["BACKUP_DIR"] = os.getenv("BACKUP_DIR", "")     # default: backups/ next to the database
+    app.config["BACKUP_INTERVAL_HOURS"] = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
+    app.config["BACKUP_KEEP"] = int(os.getenv("BACKUP_KEEP", "14"))
+    app.config["BACKUP_MAX_AGE_DAYS"] = float(os.getenv("BACKUP_MAX_AGE_DAYS", "60"))
+    app.config["BACKUP_PAGES_PER_STEP"] = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+    app.config["BACKUP_STEP_PAUSE_MS"] = float(os.getenv("BACKUP_STEP_PAUSE_MS", "20"))
+
+    # Instrumentation: /metrics is always on unless disabled; headers default to debug mode only
+    app.config["METRICS_ENABLED"] = str(os.getenv("METRICS_ENABLED", "true")).lower() == "true"
+    app.config["METRICS_HEADERS"] = str(os.getenv("METRICS_HEADERS", "")).lower() == "true"
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN", "")
+    app.config["SLOW_QUERY_MS"] = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+    # Serving (run.py): dev = Flask's server; production = gunicorn, see server.py
+    app.config["SERVER_MODE"] = os.getenv("SERVER_MODE", "dev").lower()
+    app.config["WEB_WORKERS"] = int(os.getenv("WEB_WORKERS", "1"))
+    app.config["WEB_THREADS"] = int(os.getenv("WEB_THREADS", "16"))
+    app.config["WEB_KEEPALIVE"] = int(os.getenv("WEB_KEEPALIVE", "75"))
+    app.config["WEB_GRACEFUL_TIMEOUT"] = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "20"))
+    # Dispatcher, archiver, backups, auto-allocation: one process per database runs them (see jobs.py)
+    app.config["BACKGROUND_JOBS"] = str(os.getenv("BACKGROUND_JOBS", "true")).lower() == "true"
 
     # Admin creds
     app.config["ADMIN_USERNAME"] = os.getenv("ADMIN_USERNAME", "admin")
     app.config["ADMIN_PASSWORD"] = os.getenv("ADMIN_PASSWORD", "admin123")
 
-    # Twilio placeholders (kept for future use)
+    # SMS: Twilio credentials plus the outbox dispatcher (see notify.py)
     app.config["TWILIO_ENABLED"] = str(os.getenv("TWILIO_ENABLED", "false")).lower() == "true"
     app.config["TWILIO_ACCOUNT_SID"] = os.getenv("TWILIO_ACCOUNT_SID", "")
     app.config["TWILIO_AUTH_TOKEN"] = os.getenv("TWILIO_AUTH_TOKEN", "")
     app.config["TWILIO_FROM_NUMBER"] = os.getenv("TWILIO_FROM_NUMBER", "")
+    app.config["NOTIFY_TRANSPORT"] = os.getenv(
+        "NOTIFY_TRANSPORT", "twilio" if app.config["TWILIO_ENABLED"] else "none").lower()  # twilio | fake | none
+    app.config["NOTIFY_WORKERS"] = int(os.getenv("NOTIFY_WORKERS", "2"))
+    app.config["NOTIFY_RATE_PER_SEC"] = float(os.getenv("NOTIFY_RATE_PER_SEC", "1"))
+    app.config["NOTIFY_BATCH"] = int(os.getenv("NOTIFY_BATCH", "20"))
+    app.config["NOTIFY_MAX_ATTEMPTS"] = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
 
     # DB
     init_db(app)
+    register_teardown(app)
+    _share_invalidations(app)
+    init_archive(app)
+    init_metrics(app)
+    _record_first_request(app, started)
+    _schedule_seed(app)
+    _schedule_allocation(app)
+    dispatcher = init_notifications(app, start=False)
+    init_assets(app)
+    if start_background and app.config["BACKGROUND_JOBS"]:
+        start = lambda: _start_jobs(app, dispatcher)
+        if app.config["SERVER_MODE"] == "production":
+            app.extensions["background_jobs"] = start   # server.py: after fork, in one worker
+        else:
+            jobs.lead(app, start)
 
     # Template globals
     @app.context_processor
@@ -41,4 +180,5 @@ def create_app():
     # Routes
     register_kiosk(app)
     register_admin(app)
+    app.config["STARTUP_TIMING"]["create_app_ms"] = round((time.perf_counter() - started) * 1000, 1)
     return app
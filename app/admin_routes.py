@@ -1,9 +1,23 @@
 # app/admin_routes.py
 from datetime import date, timedelta
+import hmac, time
 from functools import wraps
-from flask import render_template, request, redirect, url_for, current_app, session as flask_session, flash
+from sqlalchemy.exc import IntegrityError
+from flask import render_template, request, redirect, url_for, current_app, session as flask_session, flash, jsonify, Response, abort
 from .models import session, Week, Slot, Employee
-from .utils import monday_of, parse_categories, cats_to_str
+from .utils import monday_of, cats_to_str
+from .categories import all_names, names_of, register as register_categories
+from .services import eligible_employees, eligible_for_week
+from .schedule import week_conflicts
+from .weeks import TEMPLATES, clone_weeks, template_layout, week_layout
+from .grid import bump_week
+from .roster import invalidate as invalidate_roster
+from .ledger import rolling_totals
+from .export import EXPORTS, last_modified
+from .allocator import allocate_week, ORDERS as ALLOCATION_ORDERS
+from .metrics import render as render_metrics
+from .slot_edits import validate as validate_slot_edits, apply as apply_slot_edits
+from .importer import validate as validate_import, upsert as upsert_employees
 
 def _auth_ok():
     return flask_session.get("admin_ok") is True
@@ -37,150 +51,373 @@ def register_admin(app):
     @app.get("/admin/panel")
     @_require_login
     def admin_panel():
+        s = session()
+        today = date.today()
+        start = monday_of(today)
+        week = s.query(Week).filter(Week.start_date == start).one_or_none()
+        rows = []
+        if week:
+            for sl in sorted(week.slots, key=lambda x: (x.date, x.code)):
+                rows.append({
+                    "id": sl.id,
+                    "date": sl.date.isoformat(),
+                    "code": sl.code,
+                    "capacity": sl.capacity or 0,
+                    "cats": names_of(sl.category_mask or 0),
+                    "label": sl.label,
+                    "is_closed": bool(sl.is_closed),
+                    "version": sl.version or 1,
+                })
+        return render_template("admin_panel.html", rows=rows, categories=all_names())
+
+    @app.get("/admin/weeks")
+    @_require_login
+    def admin_weeks():
+        s = session()
+        weeks = s.query(Week).order_by(Week.start_date.desc()).all()
+        return render_template("admin_weeks.html", weeks=weeks, templates=sorted(TEMPLATES),
+                               allocation_orders=ALLOCATION_ORDERS, next_monday=monday_of(date.today()) + timedelta(days=7))
+
+    @app.post("/admin/weeks/create-next")
+    @_require_login
+    def admin_weeks_create_next():
+        s = session()
+        last = s.query(Week).order_by(Week.start_date.desc()).first()
+        start = last.start_date + timedelta(days=7) if last else monday_of(date.today())
+        layout = week_layout(s, last.id) if last else template_layout("standard")
+        created = clone_weeks(s, layout, start, 1, status="draft")
+        s.commit()
+        bump_week()
+        flash(f"Created draft week {start}" if created else f"Week {start} already exists", "success")
+        return redirect(url_for("admin_weeks"))
+
+    @app.post("/admin/weeks/plan")
+    @_require_login
+    def admin_weeks_plan():
+        """Clone a week (source_week_id) or named template across `count` weeks from `start`."""
+        data = request.get_json(silent=True) or request.form
         s = session()
         try:
-            today = date.today()
-            start = monday_of(today)
-            week = s.query(Week).filter(Week.start_date == start).one_or_none()
-            rows = []
-            cats = set()
-            if week:
-                for sl in sorted(week.slots, key=lambda x: (x.date, x.code)):
-                    rows.append({
-                        "id": sl.id,
-                        "date": sl.date.isoformat(),
-                        "code": sl.code,
-                        "capacity": sl.capacity or 0,
-                        "cats": parse_categories(sl.categories),
-                    })
-                    cats.update(parse_categories(sl.categories))
-            # Suggested default categories (update as needed)
-            all_cats = sorted(cats | {"Weld","Press","Paint","QA","Mill"})
-            return render_template("admin_panel.html", rows=rows, categories=all_cats)
-        finally:
-            s.close()
+            start = date.fromisoformat(data.get("start") or "")
+            count = int(data.get("count") or 1)
+            if not 1 <= count <= 104:
+                raise ValueError("count must be between 1 and 104")
+            source = data.get("source_week_id")
+            layout = week_layout(s, int(source)) if source else template_layout(data.get("template") or "standard")
+            if not layout:
+                raise ValueError("Source week has no slots")
+            t0 = time.perf_counter()
+            created = clone_weeks(s, layout, start, count, status=data.get("status") or "draft")
+            s.commit()
+        except ValueError as e:
+            s.rollback()
+            if request.is_json:
+                return jsonify({"error": str(e)}), 400
+            flash(str(e), "error")
+            return redirect(url_for("admin_weeks"))
+        bump_week()
+        result = {"created": [d.isoformat() for _, d in created], "skipped": count - len(created),
+                  "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        if request.is_json:
+            return jsonify(result)
+        flash(f"Created {len(created)} week(s), skipped {result['skipped']} existing", "success")
+        return redirect(url_for("admin_weeks"))
+
+    def _set_week_status(week_id: int, status: str):
+        s = session()
+        wk = s.get(Week, week_id)
+        if not wk:
+            flash("Week not found", "error")
+            return redirect(url_for("admin_weeks"))
+        wk.status = status
+        s.commit()
+        bump_week()
+        flash(f"Week {wk.start_date} is now {status}", "success")
+        return redirect(url_for("admin_weeks"))
+
+    @app.post("/admin/weeks/<int:week_id>/save")
+    @_require_login
+    def admin_week_save(week_id: int):
+        return _set_week_status(week_id, "draft")
+
+    @app.post("/admin/weeks/<int:week_id>/publish")
+    @_require_login
+    def admin_week_publish(week_id: int):
+        return _set_week_status(week_id, "published")
+
+    @app.post("/admin/weeks/<int:week_id>/close")
+    @_require_login
+    def admin_week_close(week_id: int):
+        return _set_week_status(week_id, "closed")
+
+    @app.post("/admin/weeks/<int:week_id>/allocate")
+    @_require_login
+    def admin_week_allocate(week_id: int):
+        """Batch-assign holders by seniority/hours; dry_run=1 returns the proposal without writing."""
+        data = request.get_json(silent=True) or request.values
+        dry_run = str(data.get("dry_run") or "") in ("1", "true", "on", "True")
+        try:
+            report = allocate_week(week_id, order=data.get("order") or "seniority",
+                                   weekend_only=str(data.get("all_days") or "") not in ("1", "true", "on", "True"),
+                                   dry_run=dry_run)
+        except ValueError as e:
+            if request.is_json or dry_run:
+                return jsonify({"error": str(e)}), 400
+            flash(str(e), "error")
+            return redirect(url_for("admin_weeks"))
+        if request.is_json or dry_run:
+            return jsonify(report)
+        flash(f"Allocated {len(report['assignments'])} slot(s): {report['changed']} changed, "
+              f"{len(report['bumped'])} bumped", "success")
+        return redirect(url_for("admin_weeks"))
 
     @app.post("/admin/slots/<int:slot_id>/capacity")
     @_require_login
     def admin_set_capacity(slot_id: int):
         s = session()
-        try:
-            sl = s.get(Slot, slot_id)
-            if not sl:
-                flash("Slot not found", "error")
-                return redirect(url_for("admin_panel"))
-            cap = int(request.form.get("capacity", sl.capacity or 0))
-            sl.capacity = max(0, cap)
-            s.commit()
-            flash("Capacity updated", "success")
+        sl = s.get(Slot, slot_id)
+        if not sl:
+            flash("Slot not found", "error")
             return redirect(url_for("admin_panel"))
-        finally:
-            s.close()
+        cap = int(request.form.get("capacity", sl.capacity or 0))
+        sl.capacity = max(0, cap)
+        sl.version = (sl.version or 1) + 1
+        s.commit()
+        bump_week(sl.week_id)
+        flash("Capacity updated", "success")
+        return redirect(url_for("admin_panel"))
 
     @app.post("/admin/slots/<int:slot_id>/categories")
     @_require_login
     def admin_set_slot_categories(slot_id: int):
         s = session()
-        try:
-            sl = s.get(Slot, slot_id)
-            if not sl:
-                flash("Slot not found", "error")
-                return redirect(url_for("admin_panel"))
-            cats = request.form.getlist("categories")
-            sl.categories = cats_to_str(cats)
-            s.commit()
-            flash("Categories updated", "success")
+        sl = s.get(Slot, slot_id)
+        if not sl:
+            flash("Slot not found", "error")
             return redirect(url_for("admin_panel"))
-        finally:
-            s.close()
+        cats = request.form.getlist("categories")
+        sl.categories = cats_to_str(cats)
+        sl.category_mask = register_categories(s, cats)
+        sl.version = (sl.version or 1) + 1
+        s.commit()
+        bump_week(sl.week_id)
+        flash("Categories updated", "success")
+        return redirect(url_for("admin_panel"))
+
+    @app.post("/admin/api/slots/batch")
+    @_require_login
+    def admin_slots_batch():
+        """Apply {"changes": [{id, version, capacity?, categories?, label?, is_closed?}]} in one transaction.
+
+        Stale versions are reported per slot in `conflicts` (409) with current values; the rest commit.
+        """
+        data = request.get_json(silent=True) or {}
+        try:
+            changes = validate_slot_edits(data.get("changes"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        s = session()
+        try:
+            applied, conflicts, missing, weeks = apply_slot_edits(s, changes)
+        except ValueError as e:
+            s.rollback()
+            return jsonify({"error": str(e)}), 400
+        s.commit()
+        for week_id in weeks:
+            bump_week(week_id)
+        body = {"applied": applied, "conflicts": conflicts, "missing": missing}
+        return jsonify(body), (409 if conflicts or missing else 200)
 
     @app.get("/admin/employees")
     @_require_login
     def admin_employees():
         s = session()
-        try:
-            emps = s.query(Employee).order_by(Employee.last_name.asc(), Employee.first_name.asc()).all()
-            # Suggested master list (align with slot categories)
-            categories = ["Weld","Press","Paint","QA","Mill"]
-            data = []
-            for e in emps:
-                data.append({
-                    "id": e.id,
-                    "name": f"{e.first_name} {e.last_name}",
-                    "first_name": e.first_name,
-                    "last_name": e.last_name,
-                    "clock_number": e.clock_number,
-                    "phone": e.phone or "",
-                    "cats": parse_categories(e.categories)
-                })
-            return render_template("employees.html", employees=data, categories=categories)
-        finally:
-            s.close()
+        emps = s.query(Employee).order_by(Employee.last_name.asc(), Employee.first_name.asc()).all()
+        categories = all_names()
+        data = []
+        for e in emps:
+            data.append({
+                "id": e.id,
+                "name": f"{e.first_name} {e.last_name}",
+                "first_name": e.first_name,
+                "last_name": e.last_name,
+                "clock_number": e.clock_number,
+                "phone": e.phone or "",
+                "cats": names_of(e.category_mask or 0)
+            })
+        return render_template("employees.html", employees=data, categories=categories)
 
     @app.post("/admin/employees")
     @_require_login
     def admin_emp_create():
         s = session()
-        try:
-            name = (request.form.get("name") or "").strip()
-            parts = name.split()
-            first = parts[0] if parts else ""
-            last = parts[-1] if len(parts) >= 2 else ""
-            clock = (request.form.get("clock_number") or "").strip()
-            phone = (request.form.get("phone") or "").strip()
-            cats = request.form.getlist("categories")
-            if not (first and last and clock):
-                flash("Name and 4-digit clock number required", "error")
-                return redirect(url_for("admin_employees"))
-            if len(clock) != 4 or not clock.isdigit():
-                flash("Clock number must be 4 digits", "error")
-                return redirect(url_for("admin_employees"))
-            e = Employee(first_name=first, last_name=last, clock_number=clock, phone=phone, categories=cats_to_str(cats))
-            s.add(e); s.commit()
-            flash("Employee added", "success")
+        name = (request.form.get("name") or "").strip()
+        parts = name.split()
+        first = parts[0] if parts else ""
+        last = parts[-1] if len(parts) >= 2 else ""
+        clock = (request.form.get("clock_number") or "").strip()
+        phone = (request.form.get("phone") or "").strip()
+        cats = request.form.getlist("categories")
+        if not (first and last and clock):
+            flash("Name and 4-digit clock number required", "error")
             return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
+        if len(clock) != 4 or not clock.isdigit():
+            flash("Clock number must be 4 digits", "error")
+            return redirect(url_for("admin_employees"))
+        e = Employee(first_name=first, last_name=last, clock_number=clock, phone=phone,
+                     categories=cats_to_str(cats), category_mask=register_categories(s, cats))
+        s.add(e); s.commit()
+        invalidate_roster()
+        bump_week()   # grid holder tags show employee names and clock numbers
+        flash("Employee added", "success")
+        return redirect(url_for("admin_employees"))
 
     @app.post("/admin/employees/<int:emp_id>")
     @_require_login
     def admin_emp_update(emp_id: int):
         s = session()
-        try:
-            e = s.get(Employee, emp_id)
-            if not e:
-                flash("Employee not found", "error")
-                return redirect(url_for("admin_employees"))
-            e.first_name = (request.form.get("first_name") or request.form.get("name","")).split()[0] or e.first_name
-            # for convenience, accept "name" field too in table
-            if request.form.get("last_name"):
-                e.last_name = request.form.get("last_name")
-            elif request.form.get("name"):
-                parts = request.form["name"].split()
-                if len(parts) >= 2:
-                    e.last_name = parts[-1]
-            clock = (request.form.get("clock_number") or "").strip()
-            if clock:
-                e.clock_number = clock
-            e.phone = (request.form.get("phone") or "").strip()
-            e.categories = cats_to_str(request.form.getlist("categories"))
-            s.commit()
-            flash("Employee updated", "success")
+        e = s.get(Employee, emp_id)
+        if not e:
+            flash("Employee not found", "error")
             return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
+        e.first_name = (request.form.get("first_name") or request.form.get("name","")).split()[0] or e.first_name
+        # for convenience, accept "name" field too in table
+        if request.form.get("last_name"):
+            e.last_name = request.form.get("last_name")
+        elif request.form.get("name"):
+            parts = request.form["name"].split()
+            if len(parts) >= 2:
+                e.last_name = parts[-1]
+        clock = (request.form.get("clock_number") or "").strip()
+        if clock:
+            e.clock_number = clock
+        e.phone = (request.form.get("phone") or "").strip()
+        cats = request.form.getlist("categories")
+        e.categories = cats_to_str(cats)
+        e.category_mask = register_categories(s, cats)
+        s.commit()
+        invalidate_roster()
+        bump_week()
+        flash("Employee updated", "success")
+        return redirect(url_for("admin_employees"))
 
     @app.post("/admin/employees/<int:emp_id>/delete")
     @_require_login
     def admin_emp_delete(emp_id: int):
         s = session()
+        e = s.get(Employee, emp_id)
+        if not e:
+            flash("Employee not found", "error")
+            return redirect(url_for("admin_employees"))
+        s.delete(e)
         try:
-            e = s.get(Employee, emp_id)
-            if not e:
-                flash("Employee not found", "error")
-                return redirect(url_for("admin_employees"))
-            s.delete(e); s.commit()
-            flash("Employee deleted", "success")
+            s.commit()
+        except IntegrityError:
+            s.rollback()
+            flash("Employee has signup history and cannot be deleted", "error")
+            return redirect(url_for("admin_employees"))
+        invalidate_roster()
+        bump_week()
+        flash("Employee deleted", "success")
+        return redirect(url_for("admin_employees"))
+
+    @app.post("/admin/employees/import")
+    @_require_login
+    def admin_emp_import():
+        """CSV roster import: multipart `file` or a text/csv body. All valid rows land in one transaction."""
+        upload = request.files.get("file")
+        raw = upload.read() if upload else request.get_data()
+        wants_json = not upload or request.accept_mimetypes.best == "application/json"
+        try:
+            text = raw.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            if wants_json:
+                return jsonify({"error": "CSV must be UTF-8"}), 400
+            flash("CSV must be UTF-8", "error")
             return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
+
+        t0 = time.perf_counter()
+        rows, errors, present = validate_import(text)
+        dry_run = (request.values.get("dry_run") or "") in ("1", "true", "on")
+        s = session()
+        try:
+            inserted, updated = upsert_employees(s, rows, present)
+        except ValueError as e:
+            s.rollback()
+            errors.append({"row": None, "error": str(e)})
+            inserted = updated = 0
+            rows = []
+        if dry_run:
+            s.rollback()
+        else:
+            s.commit()
+        if rows and not dry_run:
+            invalidate_roster()
+            bump_week()
+        report = {"inserted": inserted, "updated": updated, "rejected": len(errors), "errors": errors,
+                  "dry_run": dry_run, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        if wants_json:
+            return jsonify(report), (200 if rows or not errors else 400)
+        flash(f"Imported {inserted} new, {updated} updated, {len(errors)} rejected", "success" if not errors else "error")
+        for err in errors[:20]:
+            flash(f"Row {err['row']}: {err['error']}", "error")
+        return redirect(url_for("admin_employees"))
+
+    @app.get("/admin/api/slots/<int:slot_id>/eligible")
+    @_require_login
+    def admin_slot_eligible(slot_id: int):
+        return jsonify([{"id": e.id, "tag": e.display_tag()} for e in eligible_employees(slot_id)])
+
+    @app.get("/admin/api/weeks/<int:week_id>/eligible")
+    @_require_login
+    def admin_week_eligible(week_id: int):
+        return jsonify({str(k): v for k, v in eligible_for_week(week_id).items()})
+
+    @app.get("/admin/api/weeks/<int:week_id>/conflicts")
+    @_require_login
+    def admin_week_conflicts(week_id: int):
+        """Overlapping shifts and employees over their WEEKLY_HOURS_CAP among the week's signups."""
+        return jsonify(week_conflicts(session(), week_id))
+
+    @app.get("/admin/reports/hours")
+    @_require_login
+    def admin_hours_report():
+        """Rolling 4/13/52-week overtime hours; ?order=equalization (default) or seniority, ?as_of=YYYY-MM-DD."""
+        try:
+            as_of = date.fromisoformat(request.args["as_of"]) if request.args.get("as_of") else None
+        except ValueError:
+            return jsonify({"error": "as_of must be YYYY-MM-DD"}), 400
+        s = session()
+        return jsonify(rolling_totals(s, as_of, order=request.args.get("order", "equalization")))
+
+    @app.get("/admin/export/<name>.csv")
+    @_require_login
+    def admin_export(name: str):
+        """Stream weeks/slots/signups as CSV; ?from=&to= (YYYY-MM-DD) filter by date."""
+        export = EXPORTS.get(name)
+        if not export:
+            abort(404)
+        try:
+            start = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+            end = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+        except ValueError:
+            return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+        modified = last_modified()
+        if request.if_modified_since and request.if_modified_since >= modified:
+            return Response(status=304)
+        resp = Response(export(start, end), mimetype="text/csv")
+        resp.last_modified = modified
+        resp.headers["Content-Disposition"] = f"attachment; filename={name}.csv"
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+
+    @app.get("/metrics")
+    def metrics():
+        """Prometheus text. Admin session, or `Authorization: Bearer $METRICS_TOKEN` for scrapers."""
+        token = current_app.config["METRICS_TOKEN"]
+        bearer = request.headers.get("Authorization", "")
+        if not (_auth_ok() or (token and hmac.compare_digest(bearer, f"Bearer {token}"))):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        if not current_app.config["METRICS_ENABLED"]:
+            abort(404)
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,216 @@
+# app/allocator.py
+"""Batch holder allocation for a week's slots.
+
+At the weekend freeze (or on demand from admin) every signup of the week is a
+candidate for its slot's holder. Candidates sit in one heap keyed by seniority
+rank and 13-week hours (or hours first with order="equalization"); the best
+candidate is popped and given the slot unless the slot is already held or the
+employee already holds a slot overlapping it in time (First 4 and Last 4 on
+the same day do not overlap). Winning a slot adds its hours to the
+employee, so their remaining entries are re-keyed lazily when popped. Each
+signup is pushed at most once per slot its employee wins, so a week resolves
+in O(n log n).
+
+assign_slot uses claim_holder() for the same rule one signup at a time: a
+signup takes the holder seat when it is empty or held by someone less senior.
+"""
+import heapq, threading, time
+from datetime import date, datetime, time as dtime, timedelta
+from sqlalchemy import select, insert, update, func
+from .models import session, seniority, Week, Slot, Signup, Employee, HoursLedger, Bump
+from .grid import bump_week, find_week
+from .state import freeze_at
+from .utils import monday_of
+from .weeks import SLOT_HOURS, slot_interval
+from . import notify
+
+ORDERS = ("seniority", "equalization")
+HOURS_WINDOW = 13  # weeks of history behind hours-equalization, matching the report's middle window
+
+def _key(order: str, rank: int, hours: int):
+    return (rank, hours) if order == "seniority" else (hours, rank)
+
+def _prior_hours(s, week_start, employee_ids):
+    """Ledger hours of the HOURS_WINDOW weeks before `week_start`, per employee."""
+    if not employee_ids:
+        return {}
+    return dict(s.execute(
+        select(HoursLedger.employee_id, func.sum(HoursLedger.hours))
+        .where(HoursLedger.employee_id.in_(employee_ids),
+               HoursLedger.week_start >= week_start - timedelta(weeks=HOURS_WINDOW),
+               HoursLedger.week_start < week_start)
+        .group_by(HoursLedger.employee_id)
+    ).all())
+
+def _interval(day, code, starts_at, ends_at):
+    """A slot's [start, end); slots without set times block their whole day."""
+    if starts_at is None or ends_at is None:
+        starts_at, ends_at = slot_interval(day, code)
+    if starts_at is None:
+        starts_at = datetime.combine(day, dtime())
+        ends_at = starts_at + timedelta(days=1)
+    return starts_at, ends_at
+
+def plan(s, week_id: int, order: str = "seniority", weekend_only: bool = True):
+    """Proposed holders for a week: [{slot_id, date, code, employee_id, previous_id}].
+
+    Only slots with at least one eligible signup appear. One query for the
+    candidates, one for prior hours; nothing is written.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+    week_start = s.execute(select(Week.start_date).where(Week.id == week_id)).scalar()
+    if week_start is None:
+        raise ValueError("Week not found")
+    stmt = (
+        select(Signup.id, Slot.id, Slot.date, Slot.code, Slot.starts_at, Slot.ends_at, Slot.category_mask,
+               Slot.assigned_employee_id, Employee.id, Employee.category_mask, Employee.seniority_rank)
+        .join(Slot, Slot.id == Signup.slot_id)
+        .join(Employee, Employee.id == Signup.employee_id)
+        .where(Slot.week_id == week_id)
+    )
+    if weekend_only:
+        stmt = stmt.where(Slot.date >= week_start + timedelta(days=5))
+    rows = s.execute(stmt).all()
+
+    hours = _prior_hours(s, week_start, {r[8] for r in rows})
+    rank, version, slots = {}, {}, {}
+    heap = []
+    for signup_id, slot_id, day, code, starts_at, ends_at, slot_mask, holder, emp_id, emp_mask, emp_rank in rows:
+        if slot_mask and not (slot_mask & emp_mask):
+            continue
+        slots[slot_id] = (day, code, holder, _interval(day, code, starts_at, ends_at))
+        rank[emp_id] = seniority(emp_rank)
+        version[emp_id] = 0
+        hours.setdefault(emp_id, 0)
+        heap.append((_key(order, rank[emp_id], hours[emp_id]), signup_id, slot_id, emp_id, 0))
+    heapq.heapify(heap)
+
+    held, busy, out = set(), {}, []   # busy: employee -> [(start, end)] of the slots they won
+    while heap:
+        _, signup_id, slot_id, emp_id, ver = heapq.heappop(heap)
+        day, code, previous, (start, end) = slots[slot_id]
+        if slot_id in held or any(a < end and start < b for a, b in busy.get(emp_id, ())):
+            continue
+        if ver != version[emp_id]:
+            heapq.heappush(heap, (_key(order, rank[emp_id], hours[emp_id]), signup_id, slot_id, emp_id,
+                                  version[emp_id]))
+            continue
+        held.add(slot_id)
+        busy.setdefault(emp_id, []).append((start, end))
+        hours[emp_id] += SLOT_HOURS.get(code, 0)
+        version[emp_id] += 1
+        out.append({"slot_id": slot_id, "date": day.isoformat(), "code": code,
+                    "employee_id": emp_id, "previous_id": previous})
+    out.sort(key=lambda a: (a["date"], a["code"]))
+    return out
+
+def _record_bumps(s, rows):
+    """Insert Bump rows [{week_id, slot_id, employee_id, by_employee_id, reason}] in one executemany."""
+    if rows:
+        now = datetime.utcnow()
+        s.execute(insert(Bump), [dict(r, created_at=now) for r in rows])
+
+def _allocation_notices(assignments):
+    out = []
+    for a in assignments:
+        if a["previous_id"] == a["employee_id"]:
+            continue
+        what = notify.slot_text(date.fromisoformat(a["date"]), a["code"])
+        out.append({"kind": "assigned", "employee_id": a["employee_id"],
+                    "dedup_key": f"assigned:{a['slot_id']}:{a['employee_id']}",
+                    "body": f"Overtime: you have been awarded {what}."})
+        if a["previous_id"] is not None:
+            out.append(bump_notice(a["slot_id"], a["previous_id"], a["employee_id"], what))
+    return out
+
+def bump_notice(slot_id: int, employee_id: int, by_employee_id: int, what: str):
+    return {"kind": "bump", "employee_id": employee_id,
+            "dedup_key": f"bump:{slot_id}:{employee_id}:{by_employee_id}",
+            "body": f"Overtime: you were bumped from {what} by a more senior signup."}
+
+def allocate_week(week_id: int, order: str = "seniority", weekend_only: bool = True, dry_run: bool = False,
+                  once: bool = False):
+    """Run plan() and, unless dry_run, write holders and bumps in one transaction.
+
+    once=True (the freeze hook) first stamps allocated_at only if it is still
+    unset; that UPDATE takes the write lock, so of several processes racing
+    for the same week one allocates and the rest return None.
+    """
+    t0 = time.perf_counter()
+    s = session()
+    try:
+        if once and not dry_run:
+            claimed = s.execute(update(Week).where(Week.id == week_id, Week.allocated_at.is_(None))
+                                .values(allocated_at=datetime.utcnow())).rowcount
+            if not claimed:
+                s.rollback()
+                return None
+        assignments = plan(s, week_id, order, weekend_only)
+        bumped = [
+            {"week_id": week_id, "slot_id": a["slot_id"], "employee_id": a["previous_id"],
+             "by_employee_id": a["employee_id"], "reason": "allocation"}
+            for a in assignments if a["previous_id"] not in (None, a["employee_id"])
+        ]
+        changed = [{"id": a["slot_id"], "assigned_employee_id": a["employee_id"]}
+                   for a in assignments if a["previous_id"] != a["employee_id"]]
+        if not dry_run:
+            if changed:
+                s.execute(update(Slot), changed)
+            _record_bumps(s, bumped)
+            s.execute(update(Week).where(Week.id == week_id).values(allocated_at=datetime.utcnow()))
+            notify.enqueue(s, _allocation_notices(assignments))
+            s.commit()
+    finally:
+        s.close()
+    if changed and not dry_run:
+        bump_week(week_id)
+        notify.wake()
+    return {"week_id": week_id, "order": order, "dry_run": dry_run, "assignments": assignments,
+            "changed": len(changed), "bumped": [{k: b[k] for k in ("slot_id", "employee_id", "by_employee_id")}
+                                                for b in bumped],
+            "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+def claim_holder(s, week_id: int, slot_id: int, employee_id: int, rank: int):
+    """Seat `employee_id` as holder if the seat is empty or held by someone less senior.
+
+    Runs in the caller's signup transaction (after its insert has taken the
+    write lock). Returns the id of the holder it bumped, or None.
+    """
+    holder_id, holder_rank = s.execute(
+        select(Slot.assigned_employee_id, Employee.seniority_rank)
+        .outerjoin(Employee, Employee.id == Slot.assigned_employee_id)
+        .where(Slot.id == slot_id)
+    ).one()
+    if holder_id is not None and not seniority(rank) < seniority(holder_rank):
+        return None
+    s.execute(update(Slot).where(Slot.id == slot_id).values(assigned_employee_id=employee_id))
+    if holder_id is None:
+        return None
+    _record_bumps(s, [{"week_id": week_id, "slot_id": slot_id, "employee_id": holder_id,
+                       "by_employee_id": employee_id, "reason": "signup"}])
+    return holder_id
+
+_allocated_monday = None
+_due_lock = threading.Lock()
+
+def allocate_due(now):
+    """Allocate the current week once its weekend has frozen; cheap no-op otherwise."""
+    monday = monday_of(now.date())
+    if _allocated_monday == monday:
+        return None
+    if now < freeze_at(monday + timedelta(days=5), now.tzinfo.zone):
+        return None
+    with _due_lock:
+        if _allocated_monday == monday:
+            return None
+        return _allocate_frozen(monday)
+
+def _allocate_frozen(monday):
+    global _allocated_monday
+    found = find_week(monday)
+    if not found or found[1] != "published":
+        _allocated_monday = monday
+        return None
+    _allocated_monday = monday
+    return allocate_week(found[0], once=True)
@@ -0,0 +1,231 @@
+# app/archive.py
+"""Hot/cold split: closed weeks move out of the live database into per-year archives.
+
+Weeks with status "closed" that ended more than ARCHIVE_AFTER_WEEKS ago are
+moved, ARCHIVE_BATCH_WEEKS at a time, with their slots, signups and bumps into
+ARCHIVE_DIR/overtime-<year>.db (the year the week starts in). Each batch is
+copied into the attached archive and committed, checked by row count, then
+deleted from the live tables in a second short transaction; a crash in between
+leaves the rows in both files and the next run finishes the move (the copy is
+INSERT OR REPLACE on the same ids). hours_ledger stays in the live database.
+
+Reads that span history (CSV exports, ledger rebuilds) go through
+history_session(), whose connections ATTACH every archive and define TEMP
+views all_weeks, all_slots, all_signups, all_bumps = live UNION ALL archives;
+history(name) returns the view to select from. SQLite allows 10 attached
+databases by default, so only the newest MAX_ARCHIVES years are in the views.
+
+Only SQLite databases are archived; elsewhere history() is the live table.
+"""
+import logging, os, threading, time
+from datetime import date, timedelta
+from sqlalchemy import event, select, func, table, column, MetaData, Table, Column
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateTable
+from .models import get_engine, read_session, SQLITE_PROFILES, Week, Slot, Signup, Bump
+
+log = logging.getLogger(__name__)
+
+# Moved together, parents first; the WHERE picks one batch of week ids.
+TABLES = {
+    "weeks": (Week, "id IN ({ids})"),
+    "slots": (Slot, "week_id IN ({ids})"),
+    "signups": (Signup, "slot_id IN (SELECT id FROM main.slots WHERE week_id IN ({ids}))"),
+    "bumps": (Bump, "week_id IN ({ids})"),
+}
+MAX_ARCHIVES = 9
+BATCH_PAUSE = 0.2   # seconds between batches so kiosk writes get the lock
+
+_dir = None
+_history = None      # sessionmaker on the history engine, when archiving is configured
+_lock = threading.Lock()
+
+def archive_path(directory: str, year: int) -> str:
+    return os.path.join(directory, f"overtime-{year}.db")
+
+def archive_dir():
+    """Where archives live, or None when the database is not a SQLite file."""
+    return _dir
+
+def _archive_files(directory: str):
+    if not directory or not os.path.isdir(directory):
+        return []
+    years = sorted(int(n[9:13]) for n in os.listdir(directory)
+                   if n.startswith("overtime-") and n.endswith(".db") and n[9:13].isdigit())
+    return [(y, archive_path(directory, y)) for y in years[-MAX_ARCHIVES:]]
+
+def _columns(model):
+    return [c.name for c in model.__table__.columns]
+
+# ---- history views ----
+
+_VIEWS = {name: table(f"all_{name}", *(column(c.name, c.type) for c in model.__table__.columns))
+          for name, (model, _) in TABLES.items()}
+
+def history(name: str):
+    """Selectable for weeks/slots/signups/bumps including archived rows."""
+    return _VIEWS[name] if _history is not None else TABLES[name][0].__table__
+
+def history_session():
+    """Read-only Session whose connection sees history(); the plain read session when not archiving."""
+    return _history() if _history is not None else read_session()
+
+def _attach_history(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    attached = []
+    for year, path in _archive_files(_dir):
+        cur.execute(f"ATTACH DATABASE ? AS y{year}", (path,))
+        attached.append(f"y{year}")
+    for name, (model, _) in TABLES.items():
+        cols = _columns(model)
+        parts = [f"SELECT {', '.join(cols)} FROM main.{name}"]
+        for schema in attached:
+            have = {r[1] for r in cur.execute(f"PRAGMA {schema}.table_info({name})")}
+            if have:
+                parts.append(f"SELECT {', '.join(c if c in have else f'NULL AS {c}' for c in cols)} FROM {schema}.{name}")
+        cur.execute(f"CREATE TEMP VIEW all_{name} AS " + " UNION ALL ".join(parts))
+    cur.execute("PRAGMA query_only=ON")
+    cur.close()
+
+def init_archive(app):
+    """Configure the history views; start_archiver() runs the background job."""
+    global _dir, _history
+    url = app.config["DATABASE_URL"]
+    if not url.startswith("sqlite:///") or url.endswith(":memory:"):
+        _dir, _history = None, None
+        return
+    _dir = app.config["ARCHIVE_DIR"] or os.path.join(
+        os.path.dirname(os.path.abspath(url.replace("sqlite:///", ""))), "archive")
+    pragmas = {k: v for k, v in SQLITE_PROFILES[app.config.get("SQLITE_PROFILE", "tuned")].items()
+               if k != "journal_mode"}
+    # NullPool: every history read gets a fresh connection, so a new year's archive shows up at once.
+    engine = get_engine(url, pragmas, poolclass=NullPool)
+    event.listen(engine, "connect", _attach_history)
+    _history = sessionmaker(bind=engine)
+
+# ---- moving weeks ----
+
+def due_weeks(s, today: date, after_weeks: int):
+    """(week_id, year) of closed weeks that ended more than `after_weeks` weeks before `today`.
+
+    The weeks holding each live table's highest id (weeks, slots, signups,
+    bumps) are never archived: SQLite hands out max(id)+1, so moving them could
+    let a new row reuse an archived id and collide in the history views.
+    """
+    keep = {
+        s.execute(select(func.max(Week.id))).scalar(),
+        s.execute(select(Slot.week_id).order_by(Slot.id.desc()).limit(1)).scalar(),
+        s.execute(select(Slot.week_id).join(Signup, Signup.slot_id == Slot.id)
+                  .order_by(Signup.id.desc()).limit(1)).scalar(),
+        s.execute(select(Bump.week_id).order_by(Bump.id.desc()).limit(1)).scalar(),
+    }
+    rows = s.execute(
+        select(Week.id, Week.start_date)
+        .where(Week.status == "closed", Week.end_date < today - timedelta(weeks=after_weeks))
+        .order_by(Week.start_date)
+    ).all()
+    return [(wid, start.year) for wid, start in rows if wid not in keep]
+
+def _ensure_schema(cur, schema: str):
+    """Create archive tables (no foreign keys: employees stay live) and add columns new since the file was made."""
+    for name, (model, _) in TABLES.items():
+        have = {r[1] for r in cur.execute(f"PRAGMA {schema}.table_info({name})")}
+        if not have:
+            t = Table(name, MetaData(), *(Column(c.name, c.type, primary_key=c.primary_key)
+                                          for c in model.__table__.columns), schema=schema)
+            cur.execute(str(CreateTable(t).compile(dialect=sqlite.dialect())))
+            continue
+        for c in model.__table__.columns:
+            if c.name not in have:
+                cur.execute(f"ALTER TABLE {schema}.{name} ADD COLUMN {c.name} "
+                            f"{c.type.compile(dialect=sqlite.dialect())}")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {schema}.ix_slots_week ON slots(week_id)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {schema}.ix_signups_slot ON signups(slot_id)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {schema}.ix_signups_employee ON signups(employee_id)")
+
+def _move(conn, path: str, week_ids) -> dict:
+    """Copy one batch into the archive at `path`, verify, delete it from the live tables."""
+    ids = ",".join(str(int(w)) for w in week_ids)
+    cur = conn.cursor()
+    cur.execute("ATTACH DATABASE ? AS arch", (path,))
+    try:
+        _ensure_schema(cur, "arch")
+        conn.commit()
+        counts = {}
+        for name, (model, where) in TABLES.items():
+            cols = ", ".join(_columns(model))
+            cond = where.format(ids=ids)
+            cur.execute(f"INSERT OR REPLACE INTO arch.{name} ({cols}) SELECT {cols} FROM main.{name} WHERE {cond}")
+            counts[name] = cur.rowcount
+        conn.commit()
+        for name, (_, where) in TABLES.items():
+            live = cur.execute(f"SELECT count(*) FROM main.{name} WHERE {where.format(ids=ids)}").fetchone()[0]
+            kept = cur.execute(f"SELECT count(*) FROM arch.{name} WHERE "
+                               f"{where.format(ids=ids).replace('main.slots', 'arch.slots')}").fetchone()[0]
+            if kept < live:
+                raise RuntimeError(f"archive copy of {name} incomplete ({kept} < {live}); live rows kept")
+        for name in ("signups", "bumps", "slots", "weeks"):
+            cur.execute(f"DELETE FROM main.{name} WHERE {TABLES[name][1].format(ids=ids)}")
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.execute("DETACH DATABASE arch")
+        cur.close()
+
+def archive_due(engine, directory: str, after_weeks: int, batch_weeks: int = 4, today: date | None = None,
+                dry_run: bool = False) -> dict:
+    """Move every due week in batches; returns {"weeks": n, "slots": n, "signups": n, "bumps": n, "years": [...]}."""
+    from .grid import bump_week
+    with _lock:
+        s = read_session()
+        try:
+            due = due_weeks(s, today or date.today(), after_weeks)
+        finally:
+            s.close()
+        totals = {name: 0 for name in TABLES}
+        totals["years"] = sorted({y for _, y in due})
+        if dry_run or not due:
+            totals["weeks"] = len(due)
+            return totals
+        os.makedirs(directory, exist_ok=True)
+        by_year = {}
+        for wid, year in due:
+            by_year.setdefault(year, []).append(wid)
+        conn = engine.raw_connection()
+        try:
+            for year, ids in sorted(by_year.items()):
+                for i in range(0, len(ids), batch_weeks):
+                    counts = _move(conn, archive_path(directory, year), ids[i:i + batch_weeks])
+                    for name, n in counts.items():
+                        totals[name] += n
+                    time.sleep(BATCH_PAUSE)
+        finally:
+            conn.close()
+        bump_week()
+        return totals
+
+def start_archiver(app):
+    """The background archiver thread, with ARCHIVE_AFTER_WEEKS > 0 on a file-backed database."""
+    from .models import SessionLocal
+    if _dir is None or app.config["ARCHIVE_AFTER_WEEKS"] <= 0:
+        return
+    every = app.config["ARCHIVE_INTERVAL_HOURS"] * 3600
+
+    def run():
+        time.sleep(app.config["ARCHIVE_START_DELAY"])
+        while True:
+            try:
+                moved = archive_due(SessionLocal.session_factory.kw["bind"], _dir, app.config["ARCHIVE_AFTER_WEEKS"],
+                                    app.config["ARCHIVE_BATCH_WEEKS"])
+                if moved["weeks"]:
+                    log.info("archived %s", moved)
+            except Exception:
+                log.exception("archiving failed")
+            time.sleep(every)
+
+    threading.Thread(target=run, name="archiver", daemon=True).start()
@@ -0,0 +1,51 @@
+# app/assets.py
+"""Fingerprinted static assets.
+
+scripts/build_assets.py copies every file under static/ to
+static/dist/<name>.<hash>.<ext> (text files with a .gz twin) and writes
+static/dist/manifest.json. static_url() maps a source path to its hashed copy,
+so templates never reference a stale asset and the hashed files can be cached
+forever. Without a manifest (a fresh checkout, development) static_url() falls
+back to the plain /static/ path, which Flask serves with ETag/Last-Modified.
+"""
+import json, mimetypes, os
+from flask import request, send_from_directory, url_for
+
+DIST = "dist"
+IMMUTABLE = "public, max-age=31536000, immutable"
+_manifest = {}
+
+def load_manifest(static_folder: str) -> dict:
+    try:
+        with open(os.path.join(static_folder, DIST, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def static_url(path: str) -> str:
+    """URL for a file under static/: the fingerprinted copy when built, else the source file."""
+    return url_for("static", filename=_manifest.get(path, path))
+
+def init_assets(app):
+    """Load the manifest, expose static_url() to templates and serve dist/ files precompressed and immutable."""
+    global _manifest
+    _manifest = load_manifest(app.static_folder)
+    app.jinja_env.globals["static_url"] = static_url
+    plain = app.view_functions["static"]
+    # Only files the build compressed; images and fonts have no .gz twin.
+    gzipped = {p for p in _manifest.values() if os.path.isfile(os.path.join(app.static_folder, p + ".gz"))}
+
+    def static(filename):
+        if not filename.startswith(DIST + "/"):
+            return plain(filename=filename)
+        if filename in gzipped and request.accept_encodings["gzip"]:   # quality 0 for "gzip;q=0" or absent
+            resp = send_from_directory(app.static_folder, filename + ".gz", max_age=None)
+            resp.headers["Content-Encoding"] = "gzip"
+            resp.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        else:
+            resp = send_from_directory(app.static_folder, filename, max_age=None)
+        resp.headers["Cache-Control"] = IMMUTABLE
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    app.view_functions["static"] = static
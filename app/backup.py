@@ -0,0 +1,172 @@
+# app/backup.py
+"""Online backups of the SQLite database.
+
+snapshot() copies the live file with the sqlite3 backup API, `pages` pages
+per step with a short sleep after each, so a backup never holds the database
+for long (under WAL it only ever reads). The copy is switched to a rollback
+journal, checked with PRAGMA quick_check, gzipped to
+BACKUP_DIR/overtime-<UTC timestamp>.db.gz and only then given its final name;
+a half-written backup never looks like a real one. rotate() keeps the newest
+`keep` backups and drops any older than `max_age_days` (the newest always
+survives). restore() puts a backup back in place of the live file.
+
+The app runs snapshot() from a background thread when the newest backup is
+older than BACKUP_INTERVAL_HOURS; an flock on BACKUP_DIR/.lock keeps several
+processes from backing up at once. scripts/backup.py is the command line.
+"""
+import fcntl, gzip, logging, os, shutil, sqlite3, threading, time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+log = logging.getLogger(__name__)
+
+PREFIX, SUFFIX = "overtime-", ".db.gz"
+STAMP = "%Y%m%dT%H%M%SZ"
+CHECK_INTERVAL = 3600   # seconds between "is a backup due?" checks
+START_DELAY = 120       # let startup and the first requests finish before the first check
+
+class BackupError(Exception):
+    pass
+
+def db_path(url: str) -> str | None:
+    """Filesystem path of a sqlite:/// URL, None for anything else."""
+    if not url.startswith("sqlite:///") or url.endswith(":memory:"):
+        return None
+    return os.path.abspath(url.replace("sqlite:///", ""))
+
+def default_dir(path: str) -> str:
+    return os.path.join(os.path.dirname(path), "backups")
+
+def backups(directory: str):
+    """[(taken_at UTC, path)] newest first."""
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for name in os.listdir(directory):
+        if name.startswith(PREFIX) and name.endswith(SUFFIX):
+            try:
+                out.append((datetime.strptime(name[len(PREFIX):-len(SUFFIX)], STAMP), os.path.join(directory, name)))
+            except ValueError:
+                continue
+    return sorted(out, reverse=True)
+
+@contextmanager
+def _locked(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise BackupError("another backup is running")
+        yield
+
+def _quick_check(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:   # not a database at all
+        result = str(e)
+    finally:
+        conn.close()
+    if result != "ok":
+        raise BackupError(f"quick_check failed for {path}: {result}")
+
+def snapshot(path: str, directory: str, pages: int = 256, pause: float = 0.02) -> dict:
+    """Back up the database at `path` into `directory`; returns {"path", "pages", "bytes", "gz_bytes", "ms"}."""
+    t0 = time.perf_counter()
+    with _locked(directory):
+        name = PREFIX + datetime.utcnow().strftime(STAMP) + SUFFIX
+        final = os.path.join(directory, name)
+        raw = final[:-3] + ".tmp"
+        try:
+            src = sqlite3.connect(path)
+            dst = sqlite3.connect(raw)
+            total = [0]
+            def paced(status, remaining, count):
+                total[0] = count
+                if pause > 0:
+                    time.sleep(pause)
+            try:
+                src.backup(dst, pages=pages, progress=paced)
+                dst.execute("PRAGMA journal_mode=DELETE")   # one self-contained file, whatever the source used
+            finally:
+                dst.close()
+                src.close()
+            _quick_check(raw)
+            size = os.path.getsize(raw)
+            with open(raw, "rb") as f_in, gzip.open(final + ".part", "wb", compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out, 1 << 20)
+            os.replace(final + ".part", final)
+        finally:
+            for leftover in (raw, final + ".part"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+    return {"path": final, "pages": total[0], "bytes": size, "gz_bytes": os.path.getsize(final),
+            "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+def rotate(directory: str, keep: int, max_age_days: float, now: datetime | None = None):
+    """Delete backups beyond the newest `keep` or older than `max_age_days`; returns the removed paths."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=max_age_days)
+    removed = []
+    for i, (taken, path) in enumerate(backups(directory)):
+        if i > 0 and (i >= keep or taken < cutoff):
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def restore(backup: str, path: str) -> str:
+    """Replace the database at `path` with `backup` (stop the app first).
+
+    The backup is decompressed and checked next to the target before anything
+    is touched; the current file is kept as <path>.pre-restore-<stamp>.
+    Returns that path, or "" when there was no current file.
+    """
+    tmp = path + ".restore"
+    try:
+        with gzip.open(backup, "rb") as f_in, open(tmp, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1 << 20)
+        _quick_check(tmp)
+        kept = ""
+        if os.path.exists(path):
+            kept = f"{path}.pre-restore-{datetime.utcnow().strftime(STAMP)}"
+            os.replace(path, kept)
+        for side in ("-wal", "-shm"):
+            if os.path.exists(path + side):
+                os.remove(path + side)   # belongs to the file just moved aside
+        os.replace(tmp, path)
+        return kept
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def run_once(config, path: str) -> dict | None:
+    """Take a backup if the newest one is older than BACKUP_INTERVAL_HOURS, then rotate."""
+    directory = config["BACKUP_DIR"] or default_dir(path)
+    newest = backups(directory)
+    if newest and datetime.utcnow() - newest[0][0] < timedelta(hours=config["BACKUP_INTERVAL_HOURS"]):
+        return None
+    result = snapshot(path, directory, config["BACKUP_PAGES_PER_STEP"], config["BACKUP_STEP_PAUSE_MS"] / 1000)
+    result["removed"] = rotate(directory, config["BACKUP_KEEP"], config["BACKUP_MAX_AGE_DAYS"])
+    return result
+
+def init_backups(app):
+    """Start the backup thread for a file-backed SQLite database when BACKUP_INTERVAL_HOURS > 0."""
+    path = db_path(app.config["DATABASE_URL"])
+    if path is None or app.config["BACKUP_INTERVAL_HOURS"] <= 0:
+        return
+
+    def loop():
+        time.sleep(START_DELAY)
+        while True:
+            try:
+                result = run_once(app.config, path)
+                if result:
+                    log.info("backup %s: %d bytes -> %d gz in %.0f ms, rotated %d",
+                             result["path"], result["bytes"], result["gz_bytes"], result["ms"], len(result["removed"]))
+            except BackupError as e:
+                log.warning("backup skipped: %s", e)
+            except Exception:
+                log.exception("backup failed")
+            time.sleep(CHECK_INTERVAL)
+
+    threading.Thread(target=loop, name="backup", daemon=True).start()
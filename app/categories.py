@@ -0,0 +1,91 @@
+# app/categories.py
+"""Category registry: each category owns one bit of slots/employees.category_mask.
+
+Eligibility is `slot_mask == 0 or slot_mask & emp_mask`, so hot paths compare
+two integers instead of splitting comma strings. The name <-> bit map is read
+once and cached until a transaction that registered a new category commits;
+invalidating any earlier could re-cache the map without it, and a rolled-back
+registration (a dry-run import) invalidates nothing.
+"""
+import threading
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from .models import read_session, Category
+from . import changes
+
+DEFAULT_CATEGORIES = ["Weld", "Press", "Paint", "QA", "Mill"]
+MAX_BIT = 62  # keep masks inside a signed 64-bit SQLite integer
+
+_lock = threading.Lock()
+_bits = None  # name -> bit, in bit order
+
+def _registry() -> dict:
+    global _bits
+    bits = _bits
+    if bits is None:
+        s = read_session()
+        try:
+            bits = dict(s.execute(select(Category.name, Category.bit).order_by(Category.bit)).all())
+        finally:
+            s.close()
+        with _lock:
+            _bits = bits
+    return bits
+
+@changes.on_change
+def _drop():
+    global _bits
+    with _lock:
+        _bits = None
+
+def invalidate():
+    _drop()
+    changes.publish()
+
+@event.listens_for(Session, "after_commit")
+def _committed(s):
+    if s.info.pop("categories_added", False):
+        invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _rolled_back(s):
+    s.info.pop("categories_added", None)
+
+def all_names() -> list[str]:
+    return list(_registry())
+
+def names_of(mask: int) -> list[str]:
+    return [name for name, bit in _registry().items() if mask & (1 << bit)]
+
+def mask_of(names) -> int:
+    """Mask for already-registered names; unknown names are ignored."""
+    bits = _registry()
+    mask = 0
+    for name in names:
+        if name in bits:
+            mask |= 1 << bits[name]
+    return mask
+
+def register_bits(s, names) -> dict:
+    """name -> bit for `names`, adding unknown categories to the registry inside session `s`."""
+    names = {n.strip() for n in names if n and n.strip()}
+    bits = _registry()
+    if names <= bits.keys():
+        return {n: bits[n] for n in names}
+    # Read through `s` so categories added earlier in this transaction are seen.
+    bits = dict(s.execute(select(Category.name, Category.bit)).all())
+    missing = sorted(names - bits.keys())
+    if missing:
+        next_bit = max(bits.values(), default=-1) + 1
+        if next_bit + len(missing) - 1 > MAX_BIT:
+            raise ValueError("Too many categories (limit %d)" % (MAX_BIT + 1))
+        for i, name in enumerate(missing):
+            s.add(Category(name=name, bit=next_bit + i))
+            bits[name] = next_bit + i
+        s.flush()
+        s.info["categories_added"] = True   # invalidate() once this commits (_committed)
+    return {n: bits[n] for n in names}
+
+def register(s, names) -> int:
+    """Mask for `names`, adding unknown categories to the registry inside session `s`."""
+    return sum(1 << bit for bit in register_bits(s, names).values())
@@ -0,0 +1,77 @@
+# app/changes.py
+"""Cross-process cache invalidation for multi-worker serving.
+
+grid, roster and categories cache reads in-process and are invalidated by
+the process that wrote. When the app runs in several worker processes
+(WEB_WORKERS > 1) every such invalidation also appends one byte to a shared
+stamp file; check() runs before each request and in the SSE wait loop (one
+stat(), no SQL) and, when the file changed since this process last looked,
+calls every registered handler to drop the local caches. The file's size
+counts every publish, so sequence() is the same number in every worker once
+it has checked: grid uses it as the data version behind page ETags and
+stream event ids. The file only ever grows: enable() runs in every process
+that builds the app (init_db.py and the scripts too), and truncating it there
+would send the live workers' version backwards, so an old ETag or event id
+could match again.
+"""
+import os, threading
+
+_path = None
+_seen = None
+_handlers = []
+_lock = threading.RLock()   # handlers may publish; the same thread re-enters
+
+def on_change(fn):
+    """Register fn() to drop this process's cache when another process wrote."""
+    _handlers.append(fn)
+    return fn
+
+def enabled() -> bool:
+    return _path is not None
+
+def _stamp():
+    st = os.stat(_path)
+    return st.st_ino, st.st_size
+
+def enable(path: str):
+    global _path, _seen
+    with open(path, "ab"):
+        pass
+    _path = path
+    _seen = _stamp()
+
+def sequence() -> int:
+    """Publishes seen by this process; identical across workers after check()."""
+    return _seen[1] if _seen else 0
+
+def publish():
+    """Tell sibling processes that cached data changed."""
+    global _seen
+    if _path is None:
+        return
+    with _lock:
+        fd = os.open(_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, b".")
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        if _seen == (st.st_ino, st.st_size - 1):
+            _seen = (st.st_ino, st.st_size)   # only our own byte: the caller already dropped its caches
+        else:
+            check()                           # a sibling wrote in between: drop everything once
+
+def check():
+    """Run the handlers if any process published since the last check."""
+    global _seen
+    if _path is None:
+        return
+    with _lock:
+        try:
+            stamp = _stamp()
+        except FileNotFoundError:
+            return
+        if stamp != _seen:
+            _seen = stamp
+            for fn in _handlers:
+                fn()
@@ -0,0 +1,118 @@
+# app/export.py
+"""Streaming CSV exports for weeks, slots and signups.
+
+Each export is a generator that owns its own session and reads with
+yield_per/stream_results, emitting CSV in chunks; memory stays flat no matter
+how many years of history are exported. Weeks, slots and signups are read
+through the archive's history views, so archived weeks are included.
+"""
+import csv
+from datetime import date, datetime, timezone
+from sqlalchemy import select, func
+from .models import read_session, Signup, Employee
+from .grid import last_change
+from .archive import history, history_session
+
+BATCH = 500
+
+class _Echo:
+    """File-like object for csv.writer that hands each formatted row back."""
+    def write(self, value):
+        return value
+
+def last_modified() -> datetime:
+    """Newest of the latest signup and the last grid write seen by this process (UTC)."""
+    s = read_session()
+    try:
+        latest = s.execute(select(func.max(Signup.created_at))).scalar()
+    finally:
+        s.close()
+    stamps = [last_change()]
+    if latest:
+        stamps.append(latest.replace(tzinfo=timezone.utc))
+    return max(stamps).replace(microsecond=0)
+
+def _stream(header, stmt, to_row):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    s = history_session()
+    try:
+        chunk = []
+        for row in s.execute(stmt.execution_options(stream_results=True, yield_per=BATCH)):
+            chunk.append(writer.writerow(to_row(row)))
+            if len(chunk) >= BATCH:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+    finally:
+        s.close()
+
+def _between(col, start: date | None, end: date | None):
+    conds = []
+    if start:
+        conds.append(col >= start)
+    if end:
+        conds.append(col <= end)
+    return conds
+
+def weeks_csv(start: date | None = None, end: date | None = None):
+    Week, Slot = history("weeks").c, history("slots").c
+    stmt = (
+        select(Week.id, Week.start_date, Week.end_date, Week.status,
+               func.count(Slot.id), func.coalesce(func.sum(Slot.capacity), 0))
+        .select_from(history("weeks"))
+        .outerjoin(history("slots"), Slot.week_id == Week.id)
+        .where(*_between(Week.start_date, start, end))
+        .group_by(Week.id)
+        .order_by(Week.start_date)
+    )
+    return _stream(["week_id", "start_date", "end_date", "status", "slots", "capacity"], stmt, tuple)
+
+def slots_csv(start: date | None = None, end: date | None = None):
+    Week, Slot, Signups = history("weeks").c, history("slots").c, history("signups").c
+    taken = (
+        select(Signups.slot_id, func.count(Signups.id).label("taken"))
+        .group_by(Signups.slot_id)
+        .subquery()
+    )
+    stmt = (
+        select(Slot.id, Week.start_date, Slot.date, Slot.code, Slot.label, Slot.capacity,
+               func.coalesce(taken.c.taken, 0), Slot.categories, Slot.is_closed, Week.status)
+        .select_from(history("slots"))
+        .join(history("weeks"), Week.id == Slot.week_id)
+        .outerjoin(taken, taken.c.slot_id == Slot.id)
+        .where(*_between(Slot.date, start, end))
+        .order_by(Slot.date, Slot.code)
+    )
+
+    def row(r):
+        slot_id, week_start, d, code, label, cap, n, cats, closed, status = r
+        fill = f"{n / cap:.2f}" if cap else ""
+        return (slot_id, week_start, d, code, label, cap or 0, n, fill, cats or "", int(bool(closed)), status)
+
+    return _stream(["slot_id", "week_start", "date", "code", "label", "capacity", "taken", "fill_rate",
+                    "categories", "is_closed", "week_status"], stmt, row)
+
+def signups_csv(start: date | None = None, end: date | None = None):
+    Slot, Signups = history("slots").c, history("signups").c
+    stmt = (
+        select(Signups.id, Signups.created_at, Slot.id, Slot.date, Slot.code,
+               Employee.id, Employee.first_name, Employee.last_name, Employee.clock_number)
+        .select_from(history("signups"))
+        .join(history("slots"), Slot.id == Signups.slot_id)
+        .join(Employee, Employee.id == Signups.employee_id)
+        .where(*_between(Slot.date, start, end))
+        .order_by(Slot.date, Slot.code, Signups.id)
+    )
+
+    def row(r):
+        signup_id, created, slot_id, d, code, emp_id, first, last, clock = r
+        tag = Employee(first_name=first, last_name=last, clock_number=clock).display_tag()
+        return (signup_id, created.isoformat(sep=" ", timespec="seconds") if created else "",
+                slot_id, d, code, emp_id, clock, tag)
+
+    return _stream(["signup_id", "created_at", "slot_id", "date", "code", "employee_id", "clock_number",
+                    "employee"], stmt, row)
+
+EXPORTS = {"weeks": weeks_csv, "slots": slots_csv, "signups": signups_csv}
@@ -0,0 +1,142 @@
+# app/grid.py
+"""Cached week-grid read model for the kiosk, display and wallboard pages.
+
+A week's grid is built from one grouped COUNT(signups) query joined to slots
+and kept in-process keyed by a per-week version stamp; at most MAX_GRIDS weeks
+stay cached, dropping the least recently built. Writers (assign_slot,
+admin slot edits) call bump_week(); until then a page refresh costs no SQL.
+Every bump also advances the data version and wakes the /api/stream
+listeners waiting in wait_for_change(). With several worker processes the
+bump is published to the siblings through changes.py and the data version is
+the shared changes.sequence(), so a page ETag or event id means the same
+grid whichever worker answers.
+"""
+import threading, time
+from datetime import date, datetime, timezone
+from sqlalchemy import select, func
+from .models import read_session, Week, Slot, Signup, Employee
+from . import changes
+
+POLL_SECONDS = 1.0   # wait_for_change re-checks sibling writes and shutdown this often
+MAX_GRIDS = 8        # cached week grids; the screens show two weeks, admin browsing adds a few
+
+_lock = threading.Lock()
+_changed = threading.Condition(_lock)
+_data_version = 0  # advances on every bump_week(); data_version() uses changes.sequence() when shared
+_versions = {}     # week_id -> int
+_grids = {}        # week_id -> (version, [day dicts]), least recently built first
+_weeks = {}        # monday -> (week_id, status) | None
+_generation = 0    # bumped with every full invalidation
+_last_change = datetime.now(timezone.utc)  # wall time of the last bump (process start until then)
+_stopping = threading.Event()  # set on server shutdown so SSE streams end and workers can drain
+
+def week_version(week_id: int) -> int:
+    return _versions.get(week_id, 0)
+
+def data_version() -> int:
+    return changes.sequence() if changes.enabled() else _data_version
+
+def last_change() -> datetime:
+    return _last_change
+
+def wait_for_change(seen: int, timeout: float) -> int:
+    """Block until data_version() moves past `seen`, `timeout` elapses or the server stops; returns the current version."""
+    deadline = time.monotonic() + timeout
+    while True:
+        changes.check()
+        with _changed:
+            _changed.wait_for(lambda: data_version() != seen,
+                              timeout=max(0.0, min(POLL_SECONDS, deadline - time.monotonic())))
+            version = data_version()
+        if version != seen or _stopping.is_set() or time.monotonic() >= deadline:
+            return version
+
+def stopping() -> bool:
+    return _stopping.is_set()
+
+def stop():
+    """Server shutdown: make waiting streams return within POLL_SECONDS."""
+    _stopping.set()
+
+def bump_week(week_id: int | None = None) -> int:
+    """Invalidate one week's grid, or every cached week (and the week lookup) when week_id is None."""
+    changes.publish()   # first, so waking streams already see this write's sequence
+    return _bump(week_id)
+
+@changes.on_change
+def _drop_all():
+    _bump(None)
+
+def _bump(week_id: int | None) -> int:
+    global _generation, _data_version, _last_change
+    with _lock:
+        _data_version += 1
+        _last_change = datetime.now(timezone.utc)
+        _changed.notify_all()
+        if week_id is None:
+            _generation += 1
+            _weeks.clear()
+            for wid in set(_versions) | set(_grids):
+                _versions[wid] = _versions.get(wid, 0) + 1
+            return 0
+        _versions[week_id] = _versions.get(week_id, 0) + 1
+        return _versions[week_id]
+
+def find_week(start: date):
+    """(week_id, status) for the week starting on `start`, or None. Cached until bump_week()."""
+    if start in _weeks:
+        return _weeks[start]
+    generation = _generation
+    s = read_session()
+    try:
+        row = s.execute(select(Week.id, Week.status).where(Week.start_date == start)).one_or_none()
+    finally:
+        s.close()
+    found = tuple(row) if row else None
+    with _lock:
+        if _generation == generation:
+            _weeks[start] = found
+    return found
+
+def _load_grid(week_id: int):
+    s = read_session()
+    try:
+        rows = s.execute(
+            select(Slot.id, Slot.date, Slot.code, Slot.label, Slot.capacity, Slot.is_closed,
+                   Employee.first_name, Employee.last_name, Employee.clock_number,
+                   func.count(Signup.id))
+            .outerjoin(Signup, Signup.slot_id == Slot.id)
+            .outerjoin(Employee, Employee.id == Slot.assigned_employee_id)
+            .where(Slot.week_id == week_id)
+            .group_by(Slot.id, Employee.id)
+            .order_by(Slot.date, Slot.code)
+        ).all()
+    finally:
+        s.close()
+    days = {}
+    for slot_id, d, code, label, cap, closed, first, last, clock, taken in rows:
+        holder = Employee(first_name=first, last_name=last, clock_number=clock).display_tag() if clock else None
+        days.setdefault(d, []).append({
+            "slot_id": slot_id, "date": d, "code": code, "label": label,
+            "capacity": cap or 0, "taken": taken, "is_closed": bool(closed), "holder": holder,
+        })
+    return [{"date": d.isoformat(), "rows": r} for d, r in days.items()]
+
+def week_grid(week_id: int):
+    """Days of slot rows (slot_id, date, code, label, capacity, taken, is_closed, holder).
+
+    Treat the result as read-only; it is shared between requests.
+    """
+    version = week_version(week_id)
+    hit = _grids.get(week_id)
+    if hit and hit[0] == version:
+        return hit[1]
+    grid = _load_grid(week_id)
+    with _lock:
+        # Only publish if no writer bumped the week while we were reading.
+        if _versions.get(week_id, 0) == version:
+            _grids.pop(week_id, None)
+            _grids[week_id] = (version, grid)
+            while len(_grids) > MAX_GRIDS:
+                del _grids[next(iter(_grids))]
+    return grid
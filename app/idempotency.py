@@ -0,0 +1,78 @@
+# app/idempotency.py
+"""Idempotency keys for /api/signup and /api/signup/batch.
+
+A kiosk sends an Idempotency-Key with each tap and reuses it on retry. The
+first result (status + JSON body) is stored under the key; a retry gets the
+stored result back without running assign_slot again. Keys expire after
+IDEMPOTENCY_TTL_HOURS; expired rows are deleted at most once per
+EVICT_INTERVAL by whichever request stores a key next.
+
+Two retries racing past lookup() both reach assign_slot, where the unique
+(slot, employee) index turns the second into "Already signed up", and
+store() keeps whichever result landed first.
+"""
+import hashlib, json, time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, delete
+from .models import session, IdempotencyKey
+
+MAX_KEY_LENGTH = 200
+EVICT_INTERVAL = 600  # seconds
+_last_evict = 0.0
+
+def fingerprint(slot_id: int, employee_id: int) -> str:
+    return hashlib.sha1(f"signup:{slot_id}:{employee_id}".encode()).hexdigest()
+
+def _insert(s):
+    if s.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(IdempotencyKey)
+
+def lookup(keys):
+    """key -> (fingerprint, status, body) for the unexpired keys among `keys`; one query."""
+    keys = [k for k in keys if k]
+    if not keys:
+        return {}
+    since = datetime.utcnow() - timedelta(hours=current_app.config["IDEMPOTENCY_TTL_HOURS"])
+    s = session()
+    try:
+        rows = s.execute(
+            select(IdempotencyKey.key, IdempotencyKey.fingerprint, IdempotencyKey.status, IdempotencyKey.body)
+            .where(IdempotencyKey.key.in_(keys), IdempotencyKey.created_at >= since)
+        ).all()
+    finally:
+        s.close()
+    return {k: (fp, status, json.loads(body)) for k, fp, status, body in rows}
+
+def store(results):
+    """Persist [(key, fingerprint, status, body)]; existing keys are left alone. Server errors are not stored."""
+    rows = [{"key": k, "fingerprint": fp, "status": status, "body": json.dumps(body), "created_at": datetime.utcnow()}
+            for k, fp, status, body in results if k and status < 500]
+    if not rows:
+        return
+    s = session()
+    try:
+        s.execute(_insert(s).on_conflict_do_nothing(index_elements=["key"]), rows)
+        _maybe_evict(s)
+        s.commit()
+    finally:
+        s.close()
+
+def _maybe_evict(s):
+    global _last_evict
+    now = time.monotonic()
+    if now - _last_evict < EVICT_INTERVAL:
+        return
+    _last_evict = now
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config["IDEMPOTENCY_TTL_HOURS"])
+    s.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+
+def replay(hit, fp: str):
+    """(status, body) to return for a stored key, or a 422 when the key was used for a different signup."""
+    stored_fp, status, body = hit
+    if stored_fp != fp:
+        return 422, {"error": "Idempotency-Key was already used for a different signup"}
+    return status, body
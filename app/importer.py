@@ -0,0 +1,95 @@
+# app/importer.py
+"""Bulk employee import from CSV with clock-number upsert.
+
+validate() checks every row in one pass (required name, 4-digit clock, in-file
+duplicate clocks, shift type, seniority) and returns clean rows plus a per-row
+error list. upsert() writes the clean rows with one executemany of
+INSERT ... ON CONFLICT(clock_number) DO UPDATE inside the caller's transaction.
+"""
+import csv, io, re
+from sqlalchemy import select
+from .models import Employee
+from .categories import register_bits
+from .utils import cats_to_str
+
+COLUMNS = ["name", "clock_number", "phone", "categories", "shift_type", "seniority_rank"]
+SHIFT_TYPES = ("DAY", "ROTATING")
+_CAT_SPLIT = re.compile(r"[,;|]")
+
+def validate(text: str):
+    """(rows, errors, present_columns). Row numbers in errors are 1-based CSV lines incl. header."""
+    reader = csv.DictReader(io.StringIO(text))
+    header = [h.strip().lower() for h in (reader.fieldnames or [])]
+    reader.fieldnames = header
+    if "clock_number" not in header or not ({"name"} <= set(header) or {"first_name", "last_name"} <= set(header)):
+        return [], [{"row": 1, "error": "Header needs clock_number and name (or first_name, last_name)"}], set()
+
+    rows, errors, seen = [], [], {}
+    for line, rec in enumerate(reader, start=2):
+        rec = {k: (v or "").strip() for k, v in rec.items() if k}
+        problems = []
+        if rec.get("first_name") or rec.get("last_name"):
+            first, last = rec.get("first_name", ""), rec.get("last_name", "")
+        else:
+            parts = rec.get("name", "").split()
+            first = parts[0] if parts else ""
+            last = parts[-1] if len(parts) >= 2 else ""
+        if not (first and last):
+            problems.append("first and last name required")
+        clock = rec.get("clock_number", "")
+        if len(clock) != 4 or not clock.isdigit():
+            problems.append("clock number must be 4 digits")
+        elif clock in seen:
+            problems.append(f"duplicate clock number (also on row {seen[clock]})")
+        shift = (rec.get("shift_type") or "DAY").upper()
+        if shift not in SHIFT_TYPES:
+            problems.append(f"shift_type must be one of {', '.join(SHIFT_TYPES)}")
+        rank = (rec.get("seniority_rank") or "").strip()   # blank: unranked
+        if rank and not (rank.isdigit() and int(rank) > 0):
+            problems.append("seniority_rank must be a positive integer")
+        if problems:
+            errors.append({"row": line, "clock_number": clock, "error": "; ".join(problems)})
+            continue
+        seen[clock] = line
+        rows.append({
+            "first_name": first, "last_name": last, "clock_number": clock,
+            "phone": rec.get("phone", ""), "shift_type": shift, "seniority_rank": int(rank) if rank else None,
+            "cat_names": [c.strip() for c in _CAT_SPLIT.split(rec.get("categories", "")) if c.strip()],
+        })
+    present = {"first_name", "last_name", "clock_number"} | ({"phone", "shift_type", "seniority_rank", "categories"} & set(header))
+    return rows, errors, present
+
+def _insert(s):
+    if s.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Employee)
+
+def upsert(s, rows, present):
+    """Insert or update `rows` by clock_number. Columns missing from the CSV are left alone on update.
+
+    Returns (inserted, updated). Does not commit.
+    """
+    if not rows:
+        return 0, 0
+    bits = register_bits(s, {n for r in rows for n in r["cat_names"]})
+    params = []
+    for r in rows:
+        p = {k: v for k, v in r.items() if k != "cat_names"}
+        p["categories"] = cats_to_str(r["cat_names"])
+        p["category_mask"] = sum(1 << bits[n] for n in set(r["cat_names"]))
+        params.append(p)
+    existing = set(s.execute(select(Employee.clock_number)).scalars())
+    updated = sum(1 for p in params if p["clock_number"] in existing)
+
+    stmt = _insert(s)
+    update_cols = {"first_name", "last_name"} | (present & {"phone", "shift_type", "seniority_rank"})
+    if "categories" in present:
+        update_cols |= {"categories", "category_mask"}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["clock_number"],
+        set_={c: getattr(stmt.excluded, c) for c in sorted(update_cols)},
+    )
+    s.execute(stmt, params)
+    return len(params) - updated, updated
@@ -0,0 +1,70 @@
+# app/jobs.py
+"""One process per database runs the background jobs.
+
+The SMS dispatcher, the archiver, backups and the auto-allocation hook must
+run once per database, but the app lives in every process that loads it:
+each gunicorn worker, a `run.py --dev` started beside the service, a second
+copy of the unit. The process that takes an exclusive flock on
+<database>.jobs.lock runs them; any other logs who holds it and waits for the
+lock in a thread, taking over when the holder exits (a recycled worker, an
+old server still draining during a restart). Under gunicorn each worker
+calls lead() after fork with its own descriptor, so exactly one worker runs
+the jobs and no thread is ever forked. BACKGROUND_JOBS=false opts a process
+out.
+"""
+import fcntl, hashlib, logging, os, tempfile, threading
+from .backup import db_path
+
+log = logging.getLogger(__name__)
+
+_fd = None
+_held = False
+
+def lock_path(url: str) -> str:
+    path = db_path(url)
+    if path:
+        return path + ".jobs.lock"
+    key = hashlib.sha1(url.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"overtime-{key}.jobs.lock")
+
+def held() -> bool:
+    """True once this process holds the jobs lock."""
+    global _held
+    if not _held and _fd is not None:
+        try:
+            fcntl.flock(_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            _held = True
+        except OSError:
+            pass
+    return _held
+
+def _owner() -> str:
+    try:
+        return os.pread(_fd, 32, 0).decode().strip() or "?"
+    except OSError:
+        return "?"
+
+def _take(start):
+    os.ftruncate(_fd, 0)
+    os.pwrite(_fd, f"{os.getpid()}\n".encode(), 0)
+    start()
+
+def lead(app, start) -> bool:
+    """Call start() now if this process gets the jobs lock, else once the holder releases it."""
+    global _fd, _held
+    if _fd is None:
+        _fd = os.open(lock_path(app.config["DATABASE_URL"]), os.O_RDWR | os.O_CREAT, 0o644)
+    if held():
+        _take(start)
+        return True
+    log.warning("background jobs already run by pid %s; standing by", _owner())
+
+    def wait():
+        global _held
+        fcntl.flock(_fd, fcntl.LOCK_EX)
+        _held = True
+        log.info("background jobs lock taken; starting them")
+        _take(start)
+
+    threading.Thread(target=wait, name="jobs-standby", daemon=True).start()
+    return False
@@ -0,0 +1,107 @@
+# app/ledger.py
+"""Per-employee, per-week overtime hours ledger.
+
+assign_slot calls record_signup() inside its signup transaction, so the ledger
+never drifts from the signups table; rolling 4/13/52-week totals then come
+from at most 52 small rows per employee instead of a scan of signups x slots.
+rebuild() recomputes everything from history, archived weeks included.
+"""
+from datetime import date, timedelta
+from sqlalchemy import select, delete, func, case, literal
+from .models import seniority_order, Slot, Employee, HoursLedger
+from .utils import monday_of
+from .weeks import SLOT_HOURS
+from .archive import history, history_session
+
+WINDOWS = (4, 13, 52)
+
+def _insert(s):
+    if s.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(HoursLedger)
+
+def _add(s, rows):
+    """Upsert [{employee_id, week_start, hours, shifts}], adding to existing totals."""
+    stmt = _insert(s)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["employee_id", "week_start"],
+        set_={"hours": HoursLedger.hours + stmt.excluded.hours, "shifts": HoursLedger.shifts + stmt.excluded.shifts},
+    )
+    s.execute(stmt, rows)
+
+def record_signup(s, employee_id: int, week_start: date, code: str, sign: int = 1):
+    """Credit (or with sign=-1, debit) one shift's hours in the caller's transaction."""
+    _add(s, [{"employee_id": employee_id, "week_start": week_start,
+              "hours": sign * SLOT_HOURS.get(code, 0), "shifts": sign}])
+
+def _hours_expr(code=Slot.code):
+    return case(*((code == c, literal(h)) for c, h in SLOT_HOURS.items()), else_=literal(0))
+
+def rebuild(s, batch_size: int = 5000) -> int:
+    """Recompute the ledger from signups, reading history in keyset batches.
+
+    Writes in the caller's transaction (commit once at the end so readers never
+    see a half-built ledger); signups are read through the archive history views
+    on a separate connection. Returns the number of signups processed.
+    """
+    s.execute(delete(HoursLedger))
+    signups, slots, weeks = history("signups"), history("slots"), history("weeks")
+    hs = history_session()
+    last_id, total = 0, 0
+    try:
+        while True:
+            rows = hs.execute(
+                select(signups.c.id, signups.c.employee_id, weeks.c.start_date, _hours_expr(slots.c.code))
+                .select_from(signups)
+                .join(slots, slots.c.id == signups.c.slot_id)
+                .join(weeks, weeks.c.id == slots.c.week_id)
+                .where(signups.c.id > last_id)
+                .order_by(signups.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return total
+            acc = {}
+            for _, emp_id, week_start, hours in rows:
+                h, n = acc.get((emp_id, week_start), (0, 0))
+                acc[(emp_id, week_start)] = (h + hours, n + 1)
+            _add(s, [{"employee_id": e, "week_start": w, "hours": h, "shifts": n}
+                     for (e, w), (h, n) in acc.items()])
+            last_id = rows[-1][0]
+            total += len(rows)
+    finally:
+        hs.close()
+
+def rolling_totals(s, as_of: date | None = None, order: str = "equalization"):
+    """Rolling 4/13/52-week hours for every employee, ending with the week of `as_of`.
+
+    order="equalization": fewest 13-week hours first, then seniority (lower rank first);
+    order="seniority": seniority rank only. One query over employees + ledger.
+    """
+    this_week = monday_of(as_of or date.today())
+    since = {n: this_week - timedelta(weeks=n - 1) for n in WINDOWS}
+    sums = (
+        select(
+            HoursLedger.employee_id,
+            *(func.sum(case((HoursLedger.week_start >= since[n], HoursLedger.hours), else_=0)).label(f"h{n}")
+              for n in WINDOWS),
+        )
+        .where(HoursLedger.week_start >= since[max(WINDOWS)], HoursLedger.week_start <= this_week)
+        .group_by(HoursLedger.employee_id)
+        .subquery()
+    )
+    cols = [func.coalesce(getattr(sums.c, f"h{n}"), 0).label(f"hours_{n}w") for n in WINDOWS]
+    stmt = select(Employee, *cols).outerjoin(sums, sums.c.employee_id == Employee.id)
+    if order == "seniority":
+        stmt = stmt.order_by(seniority_order(), Employee.id)
+    else:
+        stmt = stmt.order_by(cols[1].asc(), seniority_order(), Employee.id)
+    out = []
+    for emp, *hours in s.execute(stmt).all():
+        row = {"employee_id": emp.id, "tag": emp.display_tag(), "shift_type": emp.shift_type,
+               "seniority_rank": emp.seniority_rank}
+        row.update({f"hours_{n}w": h for n, h in zip(WINDOWS, hours)})
+        out.append(row)
+    return out
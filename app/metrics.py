@@ -0,0 +1,130 @@
+# app/metrics.py
+"""Per-request latency and SQL instrumentation, rendered as Prometheus text.
+
+Engine-level cursor hooks time every statement; when it runs inside a request
+its count and duration are added to that request's tally (thread-local, since
+a request runs on one thread). Flask request hooks then fold the tally into
+per-endpoint histograms under one lock. Statements slower than SLOW_QUERY_MS
+are logged with their SQL text (parameters are left out: they carry phone
+numbers and names).
+"""
+import logging, threading, time
+from bisect import bisect_left
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)   # seconds; +Inf is implicit
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local = threading.local()
+_endpoints = {}          # endpoint -> {"buckets": [...], "count", "sum", "sql", "db"}
+_totals = {"statements": 0, "db_seconds": 0.0, "slow": 0}
+_slow_seconds = None     # set by init_metrics; None until then (hooks still count)
+_installed = False
+
+def _before_cursor(conn, cursor, statement, params, context, executemany):
+    conn.info["query_start"] = time.perf_counter()   # statements on one connection never overlap
+
+def _after_cursor(conn, cursor, statement, params, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"]
+    tally = getattr(_local, "tally", None)
+    if tally is not None:
+        tally[0] += 1
+        tally[1] += elapsed
+    slow = _slow_seconds is not None and elapsed >= _slow_seconds
+    with _lock:
+        _totals["statements"] += 1
+        _totals["db_seconds"] += elapsed
+        if slow:
+            _totals["slow"] += 1
+    if slow:
+        log.warning("slow query %.1f ms: %s", elapsed * 1000, " ".join(statement.split())[:1000])
+
+def _install_engine_hooks():
+    """Listen on the Engine class once, so engines made by later init_db calls are covered too."""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor)
+        event.listen(Engine, "after_cursor_execute", _after_cursor)
+        _installed = True
+
+def _observe(endpoint: str, seconds: float, statements: int, db_seconds: float):
+    with _lock:
+        m = _endpoints.get(endpoint)
+        if m is None:
+            m = _endpoints[endpoint] = {"buckets": [0] * (len(BUCKETS) + 1), "count": 0, "sum": 0.0,
+                                        "sql": 0, "db": 0.0}
+        m["buckets"][bisect_left(BUCKETS, seconds)] += 1
+        m["count"] += 1
+        m["sum"] += seconds
+        m["sql"] += statements
+        m["db"] += db_seconds
+
+def init_metrics(app):
+    """Install SQL hooks and per-request timing; add X-Query-Count/Server-Timing in debug or with METRICS_HEADERS."""
+    global _slow_seconds
+    if not app.config["METRICS_ENABLED"]:
+        return
+    _slow_seconds = app.config["SLOW_QUERY_MS"] / 1000
+    _install_engine_hooks()
+
+    @app.before_request
+    def start_request_metrics():
+        _local.tally = [0, 0.0]
+        g.metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(resp):
+        tally = getattr(_local, "tally", None)
+        if tally is None or "metrics_t0" not in g:
+            return resp
+        elapsed = time.perf_counter() - g.metrics_t0
+        _local.tally = None
+        _observe(request.endpoint or "unmatched", elapsed, tally[0], tally[1])
+        if app.debug or app.config["METRICS_HEADERS"]:
+            resp.headers["X-Query-Count"] = str(tally[0])
+            resp.headers["Server-Timing"] = f"db;dur={tally[1] * 1000:.1f}, total;dur={elapsed * 1000:.1f}"
+        return resp
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        endpoints = {k: {**v, "buckets": list(v["buckets"])} for k, v in _endpoints.items()}
+        totals = dict(_totals)
+    lines = [
+        "# HELP overtime_request_duration_seconds Request latency by endpoint.",
+        "# TYPE overtime_request_duration_seconds histogram",
+    ]
+    for name in sorted(endpoints):
+        m, ep = endpoints[name], _label(name)
+        running = 0
+        for le, n in zip(BUCKETS + ("+Inf",), m["buckets"]):
+            running += n
+            lines.append(f'overtime_request_duration_seconds_bucket{{endpoint="{ep}",le="{le}"}} {running}')
+        lines.append(f'overtime_request_duration_seconds_sum{{endpoint="{ep}"}} {m["sum"]:.6f}')
+        lines.append(f'overtime_request_duration_seconds_count{{endpoint="{ep}"}} {m["count"]}')
+    lines += ["# HELP overtime_request_sql_statements_total SQL statements executed while serving requests.",
+              "# TYPE overtime_request_sql_statements_total counter"]
+    lines += [f'overtime_request_sql_statements_total{{endpoint="{_label(n)}"}} {endpoints[n]["sql"]}'
+              for n in sorted(endpoints)]
+    lines += ["# HELP overtime_request_db_seconds_total Time spent in SQL while serving requests.",
+              "# TYPE overtime_request_db_seconds_total counter"]
+    lines += [f'overtime_request_db_seconds_total{{endpoint="{_label(n)}"}} {endpoints[n]["db"]:.6f}'
+              for n in sorted(endpoints)]
+    lines += [
+        "# HELP overtime_sql_statements_total All SQL statements, including background work.",
+        "# TYPE overtime_sql_statements_total counter",
+        f"overtime_sql_statements_total {totals['statements']}",
+        "# HELP overtime_sql_seconds_total Time spent in all SQL statements.",
+        "# TYPE overtime_sql_seconds_total counter",
+        f"overtime_sql_seconds_total {totals['db_seconds']:.6f}",
+        "# HELP overtime_sql_slow_total Statements at or above SLOW_QUERY_MS.",
+        "# TYPE overtime_sql_slow_total counter",
+        f"overtime_sql_slow_total {totals['slow']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,25 @@
 # app/models.py
-from datetime import date, datetime, timedelta
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, DateTime
+import hashlib, time
+from datetime import datetime
+from sqlalchemy import create_engine, event, text, case, Column, Integer, String, Text, Date, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateTable, CreateIndex
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
 
 Base = declarative_base()
 SessionLocal = scoped_session(sessionmaker())
+ReadSession = sessionmaker()   # bound to the read-only engine by init_db
+
+class AppMeta(Base):
+    __tablename__ = "app_meta"
+    key = Column(String, primary_key=True)   # "schema" -> fingerprint of the model DDL
+    value = Column(String, nullable=False)
+
+class Category(Base):
+    __tablename__ = "categories"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+    bit = Column(Integer, nullable=False, unique=True)      # 0..62; mask = 1 << bit
 
 class Week(Base):
     __tablename__ = "weeks"
@@ -12,6 +27,7 @@ class Week(Base):
     start_date = Column(Date, nullable=False, unique=True)  # Monday
     end_date = Column(Date, nullable=False)                 # Sunday
     status = Column(String, default="published")            # draft|published|closed
+    allocated_at = Column(DateTime, nullable=True)          # last batch allocation (allocator.allocate_week)
     slots = relationship("Slot", back_populates="week", cascade="all, delete-orphan")
 
 class Slot(Base):
@@ -23,8 +39,16 @@ class Slot(Base):
     label = Column(String, nullable=False)
     capacity = Column(Integer, default=0)
     categories = Column(String, default="")  # comma-separated
+    category_mask = Column(Integer, nullable=False, default=0, server_default="0")  # bits from categories.bit
+    is_closed = Column(Integer, default=0)
+    # Bumped by every admin edit (capacity, categories, label, is_closed); slot_edits rejects stale versions.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    assigned_employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    starts_at = Column(DateTime, nullable=True)  # local time, from code (weeks.slot_interval)
+    ends_at = Column(DateTime, nullable=True)
     signups = relationship("Signup", back_populates="slot", cascade="all, delete-orphan")
     week = relationship("Week", back_populates="slots")
+    assigned_employee = relationship("Employee")
 
 class Employee(Base):
     __tablename__ = "employees"
@@ -34,54 +58,203 @@ class Employee(Base):
     clock_number = Column(String, nullable=False, unique=True)  # 4 digits
     phone = Column(String, nullable=True)
     categories = Column(String, default="")  # comma-separated
+    category_mask = Column(Integer, nullable=False, default=0, server_default="0")
     shift_type = Column(String, default="DAY")     # DAY | ROTATING
-    seniority_rank = Column(Integer, default=0)
+    seniority_rank = Column(Integer)   # lower is more senior; NULL (or 0 on older rows) = unranked, see seniority()
 
     def display_tag(self):
         fi = (self.first_name[:1].upper() + ".") if self.first_name else ""
         return f"{fi} {self.last_name} - {self.clock_number}"
 
+UNRANKED = 1 << 31   # sort key of an employee without a seniority rank: after everyone ranked
+
+def seniority(rank) -> int:
+    """Sort key for a seniority_rank: lower is more senior, unranked (NULL or 0) last."""
+    return rank if rank and rank > 0 else UNRANKED
+
+def seniority_order():
+    """seniority() as a SQL expression, for ORDER BY."""
+    return case((Employee.seniority_rank > 0, Employee.seniority_rank), else_=UNRANKED)
+
 class Signup(Base):
     __tablename__ = "signups"
+    # One signup per (slot, employee); assign_slot relies on this for duplicate detection.
+    # starts_at/ends_at copy the slot's times so an employee's shifts are one index range (schedule.py).
+    __table_args__ = (UniqueConstraint("slot_id", "employee_id", name="ux_signups_slot_employee"),
+                      Index("ix_signups_employee_start", "employee_id", "starts_at"))
     id = Column(Integer, primary_key=True)
     slot_id = Column(Integer, ForeignKey("slots.id"), nullable=False)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    starts_at = Column(DateTime, nullable=True)
+    ends_at = Column(DateTime, nullable=True)
     slot = relationship("Slot", back_populates="signups")
 
-def get_engine(db_url: str):
+class Bump(Base):
+    """A slot holder displaced by a more senior signup or by a batch allocation."""
+    __tablename__ = "bumps"
+    __table_args__ = (Index("ix_bumps_week", "week_id"),)
+    id = Column(Integer, primary_key=True)
+    week_id = Column(Integer, ForeignKey("weeks.id"), nullable=False)
+    slot_id = Column(Integer, ForeignKey("slots.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)      # who lost the slot
+    by_employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)    # who took it
+    reason = Column(String, nullable=False)                                       # signup | allocation
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class IdempotencyKey(Base):
+    """Stored result of a signup request, replayed when a kiosk retries with the same key."""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_created", "created_at"),)
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)     # what the key was first used for
+    status = Column(Integer, nullable=False)
+    body = Column(Text, nullable=False)              # JSON
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class Notification(Base):
+    """SMS outbox row, written in the same transaction as the change it reports (see notify.py)."""
+    __tablename__ = "notifications"
+    __table_args__ = (Index("ix_notifications_due", "status", "next_attempt_at"),)
+    id = Column(Integer, primary_key=True)
+    dedup_key = Column(String, nullable=False, unique=True)   # e.g. "signup:<slot>:<employee>"
+    kind = Column(String, nullable=False)                     # signup | bump | assigned
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending | sending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+class HoursLedger(Base):
+    """Overtime hours per employee per week, kept in step with signups by assign_slot."""
+    __tablename__ = "hours_ledger"
+    __table_args__ = (Index("ix_hours_ledger_week", "week_start"),)
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # Monday
+    hours = Column(Integer, nullable=False, default=0)
+    shifts = Column(Integer, nullable=False, default=0)
+
+# Connect-time PRAGMAs per SQLITE_PROFILE. "tuned": WAL so wallboard/display
+# readers never wait on a signup write, NORMAL sync (safe under WAL), a busy
+# timeout instead of immediate "database is locked", a 16 MiB page cache and
+# 64 MiB of mmap. "default" leaves SQLite's own settings alone.
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "foreign_keys": "ON",
+    },
+}
+
+def _apply_pragmas(engine, pragmas: dict):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+def get_engine(db_url: str, pragmas: dict | None = None, read_only: bool = False, **engine_kw):
     if db_url.startswith("sqlite:///"):
         path = db_url.replace("sqlite:///", "")
-        return create_engine(
+        engine = create_engine(
             f"sqlite:///{path}",
             echo=False, future=True,
-            connect_args={"check_same_thread": False}
+            connect_args={"check_same_thread": False}, **engine_kw
         )
-    return create_engine(db_url, echo=False, future=True)
+        pragmas = dict(pragmas or {})
+        if read_only:
+            pragmas.pop("journal_mode", None)  # set by the writer; a query_only connection cannot change it
+            pragmas["query_only"] = "ON"
+        if pragmas:
+            _apply_pragmas(engine, pragmas)
+        return engine
+    engine = create_engine(db_url, echo=False, future=True, **engine_kw)
+    if read_only and engine.dialect.name == "postgresql":
+        engine = engine.execution_options(postgresql_readonly=True)
+    return engine
 
-def init_db(app):
-    engine = get_engine(app.config["DATABASE_URL"])
-    SessionLocal.configure(bind=engine)
-    Base.metadata.create_all(engine)
+def schema_fingerprint(engine) -> str:
+    """Hash of the DDL the models would emit; changes whenever a table, column or index does."""
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        ddl.extend(str(CreateIndex(ix).compile(dialect=engine.dialect)) for ix in sorted(table.indexes, key=lambda i: i.name))
+    return hashlib.sha1("\n".join(ddl).encode()).hexdigest()[:16]
 
-    # Seed this week if missing
-    s = SessionLocal()
+def _stored_fingerprint(engine):
     try:
-        today = date.today()
-        monday = today - timedelta(days=today.weekday())
-        sunday = monday + timedelta(days=6)
-        wk = s.query(Week).filter(Week.start_date == monday).one_or_none()
-        if not wk:
-            wk = Week(start_date=monday, end_date=sunday, status="published")
-            s.add(wk); s.flush()
-            labels = ["First 4", "Full 8", "Last 4"]
-            for i in range(7):
-                d = monday + timedelta(days=i)
-                for lab in labels:
-                    s.add(Slot(week_id=wk.id, date=d, code=lab, label=lab))
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT value FROM app_meta WHERE key = 'schema'")).scalar()
+    except DBAPIError:
+        return None  # app_meta not created yet
+
+def init_db(app, force: bool = False):
+    """Bind the engine and bring the schema up to date.
+
+    create_all (and the category seed) only run when the stored schema
+    fingerprint differs from the models, or with force=True. Seeding the current
+    week is left to weeks.ensure_current_week(), which create_app schedules per
+    SEED_MODE.
+    """
+    timing = app.config.setdefault("STARTUP_TIMING", {})
+    t0 = time.perf_counter()
+    url = app.config["DATABASE_URL"]
+    pragmas = {**SQLITE_PROFILES[app.config.get("SQLITE_PROFILE", "tuned")], **app.config.get("SQLITE_PRAGMAS", {})}
+    engine = get_engine(url, pragmas)
+    SessionLocal.remove()
+    SessionLocal.configure(bind=engine)
+    # An in-memory database exists only on its own connection, so it gets no separate reader.
+    ReadSession.configure(bind=engine if url.endswith(":memory:") or url == "sqlite://"
+                          else get_engine(url, pragmas, read_only=True))
+    t1 = time.perf_counter()
+    timing["engine_ms"] = round((t1 - t0) * 1000, 1)
+
+    fingerprint = schema_fingerprint(engine)
+    if force or _stored_fingerprint(engine) != fingerprint:
+        Base.metadata.create_all(engine)
+        s = SessionLocal()
+        try:
+            if s.query(Category.id).first() is None:
+                from .categories import DEFAULT_CATEGORIES
+                s.add_all(Category(name=n, bit=i) for i, n in enumerate(DEFAULT_CATEGORIES))
+            s.merge(AppMeta(key="schema", value=fingerprint))
             s.commit()
-    finally:
-        s.close()
+        finally:
+            s.close()
+        timing["schema"] = "created"
+    else:
+        timing["schema"] = "fingerprint match"
+    timing["schema_ms"] = round((time.perf_counter() - t1) * 1000, 1)
 
 def session():
     return SessionLocal()
+
+def new_session():
+    """A Session independent of the thread's scoped one, for background writers
+    that may run while a route still holds session() open."""
+    return SessionLocal.session_factory()
+
+def read_session():
+    """A Session on the read-only engine (PRAGMA query_only) for page and cache reads."""
+    return ReadSession()
+
+def dispose_engines():
+    """Forget pooled connections inherited across fork(); the parent keeps using its own."""
+    SessionLocal.remove()
+    for engine in {id(e): e for e in (SessionLocal.session_factory.kw.get("bind"), ReadSession.kw.get("bind")) if e}.values():
+        engine.dispose(close=False)
+
+def register_teardown(app):
+    """Make session() request-scoped: whatever a request opened is closed (and
+    rolled back if uncommitted) when its app context ends."""
+    @app.teardown_appcontext
+    def remove_session(_exc):
+        SessionLocal.remove()
@@ -0,0 +1,250 @@
+# app/notify.py
+"""SMS notifications through a transactional outbox.
+
+assign_slot and the allocator call enqueue() inside their own transaction,
+so a notification exists exactly when the change it reports was committed;
+the request never talks to the SMS provider. A unique dedup_key makes a
+repeated enqueue a no-op.
+
+A background dispatcher claims due rows in batches (one UPDATE ... RETURNING,
+so two processes never claim the same row), sends them on a small thread pool
+behind a shared rate limiter, and writes results back in one executemany:
+sent, or pending again after an exponential backoff, or failed after
+max_attempts. A claim is a lease: next_attempt_at is pushed LEASE_SECONDS
+ahead, and only rows still "sending" after it ran out (their process died
+mid-send) are released, so a second process never re-sends a live batch.
+Only the serving process starts a dispatcher (create_app(start_background=False)
+for scripts); enqueue() works either way.
+
+Transports: "twilio" (imported lazily), "fake" (records messages in memory,
+for tests and benches), "none" (notifications disabled; enqueue writes nothing).
+"""
+import logging, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, bindparam
+from .models import new_session, Notification, Employee
+
+log = logging.getLogger(__name__)
+
+BACKOFF_BASE = 30        # seconds before the first retry; doubles per attempt
+BACKOFF_MAX = 3600
+LEASE_SECONDS = 600      # a claimed batch must be written back within this long
+_enabled = False
+_wake = threading.Event()
+
+class FakeTransport:
+    """Keeps (to, body) pairs in `sent`; fails the first `fail_first` sends."""
+    def __init__(self, fail_first: int = 0):
+        self.sent = []
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+
+    def send(self, to: str, body: str):
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                raise RuntimeError("fake transport failure")
+            self.sent.append((to, body))
+
+class TwilioTransport:
+    def __init__(self, account_sid: str, auth_token: str, from_number: str):
+        from twilio.rest import Client  # deferred: only needed when SMS is actually on
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    def send(self, to: str, body: str):
+        self.client.messages.create(to=to, from_=self.from_number, body=body)
+
+class RateLimiter:
+    """Token bucket shared by the pool's workers."""
+    def __init__(self, per_second: float, burst: int = 1):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+def _insert(s):
+    if s.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(Notification)
+
+def enqueue(s, items):
+    """Add [{kind, employee_id, body, dedup_key}] to the outbox in the caller's transaction."""
+    if not _enabled or not items:
+        return
+    now = datetime.utcnow()
+    rows = [dict(it, status="pending", attempts=0, next_attempt_at=now, created_at=now) for it in items]
+    s.execute(_insert(s).on_conflict_do_nothing(index_elements=["dedup_key"]), rows)
+
+def wake():
+    """Nudge the dispatcher after a commit that enqueued something."""
+    if _enabled:
+        _wake.set()
+
+def slot_text(day, code: str) -> str:
+    return f"{code} on {day.strftime('%a %m/%d')}"
+
+def backoff(attempts: int) -> float:
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+
+class Dispatcher:
+    def __init__(self, transport, workers: int = 2, per_second: float = 1.0, batch: int = 20,
+                 max_attempts: int = 5, poll: float = 5.0):
+        self.transport = transport
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms")
+        self.limiter = RateLimiter(per_second, burst=workers)
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.poll = poll
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _claim(self, s, now):
+        due = (select(Notification.id)
+               .where(Notification.status == "pending", Notification.next_attempt_at <= now)
+               .order_by(Notification.next_attempt_at, Notification.id)
+               .limit(self.batch))
+        ids = s.execute(
+            update(Notification).where(Notification.id.in_(due.scalar_subquery()), Notification.status == "pending")
+            .values(status="sending", next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if not ids:
+            s.commit()
+            return []
+        rows = s.execute(
+            select(Notification.id, Notification.body, Notification.attempts, Employee.phone)
+            .join(Employee, Employee.id == Notification.employee_id)
+            .where(Notification.id.in_(ids))
+        ).all()
+        s.commit()
+        return rows
+
+    def _send(self, row):
+        if not (row.phone or "").strip():
+            return row, "no phone number"
+        self.limiter.acquire()
+        try:
+            self.transport.send(row.phone.strip(), row.body)
+            return row, None
+        except Exception as e:  # any provider error is retried
+            return row, str(e)[:500] or type(e).__name__
+
+    def drain_once(self) -> int:
+        """Claim one batch, send it, record results. Returns how many rows were claimed."""
+        s = new_session()
+        try:
+            now = datetime.utcnow()
+            rows = self._claim(s, now)
+            if not rows:
+                return 0
+            results = list(self.pool.map(self._send, rows))
+            done = datetime.utcnow()
+            updates = []
+            for row, error in results:
+                attempts = row.attempts + 1
+                if error is None:
+                    updates.append({"b_id": row.id, "status": "sent", "attempts": attempts, "next_attempt_at": done,
+                                    "last_error": None, "sent_at": done})
+                else:
+                    final = attempts >= self.max_attempts or error == "no phone number"
+                    updates.append({"b_id": row.id, "status": "failed" if final else "pending", "attempts": attempts,
+                                    "next_attempt_at": done + timedelta(seconds=backoff(attempts)),
+                                    "last_error": error, "sent_at": None})
+                    log.warning("sms %s failed (attempt %d): %s", row.id, attempts, error)
+            s.execute(
+                Notification.__table__.update().where(Notification.id == bindparam("b_id")),
+                updates,
+            )
+            s.commit()
+            return len(rows)
+        finally:
+            s.close()
+
+    def release_stuck(self, now=None):
+        """Return rows whose claim lease ran out (the claiming process died) to pending; returns how many."""
+        s = new_session()
+        try:
+            n = s.execute(
+                update(Notification)
+                .where(Notification.status == "sending", Notification.next_attempt_at <= (now or datetime.utcnow()))
+                .values(status="pending")
+            ).rowcount
+            s.commit()
+            return n
+        finally:
+            s.close()
+
+    def run(self):
+        next_release = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_release:
+                try:
+                    self.release_stuck()
+                except Exception:
+                    log.exception("sms lease release failed")
+                next_release = time.monotonic() + LEASE_SECONDS
+            try:
+                claimed = self.drain_once()
+            except Exception:
+                log.exception("sms dispatcher pass failed")
+                claimed = 0
+            if claimed < self.batch:
+                _wake.wait(self.poll)
+                _wake.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="sms-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        _wake.set()
+        if self._thread:
+            self._thread.join()
+        self.pool.shutdown(wait=True)
+
+def make_transport(config):
+    name = config["NOTIFY_TRANSPORT"]
+    if name == "twilio":
+        return TwilioTransport(config["TWILIO_ACCOUNT_SID"], config["TWILIO_AUTH_TOKEN"], config["TWILIO_FROM_NUMBER"])
+    if name == "fake":
+        return FakeTransport()
+    return None
+
+def init_notifications(app, start: bool = True):
+    """Enable the outbox and start the dispatcher thread unless NOTIFY_TRANSPORT is "none"."""
+    global _enabled
+    transport = make_transport(app.config)
+    _enabled = transport is not None
+    if not _enabled:
+        return None
+    dispatcher = Dispatcher(
+        transport,
+        workers=app.config["NOTIFY_WORKERS"],
+        per_second=app.config["NOTIFY_RATE_PER_SEC"],
+        batch=app.config["NOTIFY_BATCH"],
+        max_attempts=app.config["NOTIFY_MAX_ATTEMPTS"],
+    )
+    app.extensions["sms_dispatcher"] = dispatcher
+    return dispatcher.start() if start else dispatcher
@@ -0,0 +1,116 @@
+# app/roster.py
+"""In-process roster index for the signup modal.
+
+Built once from the employees table and kept until invalidate() is called by
+the admin employee routes. Each entry is indexed by every prefix of its
+normalized first name, last name and clock number, plus character trigrams
+so mid-word queries ("ilva" -> "Silva") still resolve without a scan. The
+same build keeps a clock number -> employee map for badge signups.
+"""
+import hashlib, json, threading, unicodedata
+from sqlalchemy import select
+from .models import read_session, Employee
+from . import changes
+
+SEARCH_LIMIT = 20
+CLOCK_DIGITS = 4
+
+_lock = threading.Lock()
+_index = None
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents so "José" matches "jose"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+def _trigrams(token: str):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class RosterIndex:
+    def __init__(self, rows):
+        self.entries = []    # roster dicts in display order
+        self.tokens = []     # normalized tokens per entry
+        self.prefixes = {}   # prefix -> {entry idx}
+        self.grams = {}      # trigram -> {entry idx}
+        self.by_clock = {}   # clock number -> entry
+        for i, (emp_id, first, last, clock, tag) in enumerate(rows):
+            self.entries.append({"id": emp_id, "name": f"{first} {last}", "tag": tag, "clock_number": clock})
+            self.by_clock[clock] = self.entries[-1]
+            toks = [t for t in (normalize(first), normalize(last), normalize(clock)) if t]
+            self.tokens.append(toks)
+            for tok in toks:
+                for n in range(1, len(tok) + 1):
+                    self.prefixes.setdefault(tok[:n], set()).add(i)
+                for g in _trigrams(tok):
+                    self.grams.setdefault(g, set()).add(i)
+        self.payload = json.dumps(
+            [{k: e[k] for k in ("id", "name", "tag")} for e in self.entries], separators=(",", ":")
+        ).encode()
+        self.etag = hashlib.sha1(self.payload).hexdigest()
+
+    def _match(self, term: str):
+        """{idx: rank} for one query term; lower rank is a better match."""
+        hits = {i: 1 for i in self.prefixes.get(term, ())}
+        if len(term) >= 3:
+            grams = [self.grams.get(g, set()) for g in _trigrams(term)]
+            for i in set.intersection(*grams) - hits.keys():
+                if any(term in tok for tok in self.tokens[i]):
+                    hits[i] = 2
+        for i in hits:
+            if term in self.tokens[i]:
+                hits[i] = 0
+        return hits
+
+    def search(self, q: str, limit: int = SEARCH_LIMIT):
+        terms = normalize(q).split()
+        if not terms:
+            return self.entries[:limit]
+        ranked = None
+        for term in terms:
+            hits = self._match(term)
+            ranked = hits if ranked is None else {i: ranked[i] + r for i, r in hits.items() if i in ranked}
+            if not ranked:
+                return []
+        best = sorted(ranked, key=lambda i: (ranked[i], i))[:limit]
+        return [self.entries[i] for i in best]
+
+def clock_key(text) -> str:
+    """Typed or scanned clock number as stored: surrounding whitespace dropped, short numbers zero-padded."""
+    text = str(text or "").strip()
+    return text.zfill(CLOCK_DIGITS) if text.isdigit() else text
+
+def _build():
+    s = read_session()
+    try:
+        emps = s.execute(
+            select(Employee).order_by(Employee.last_name.asc(), Employee.first_name.asc())
+        ).scalars().all()
+        rows = [(e.id, e.first_name, e.last_name, e.clock_number, e.display_tag()) for e in emps]
+    finally:
+        s.close()
+    return RosterIndex(rows)
+
+def roster_index() -> RosterIndex:
+    global _index
+    idx = _index
+    if idx is None:
+        with _lock:
+            if _index is None:
+                _index = _build()
+            idx = _index
+    return idx
+
+def employee_by_clock(clock) -> dict | None:
+    """Roster entry {id, name, tag, clock_number} for a clock number; no SQL once the index is built."""
+    return roster_index().by_clock.get(clock_key(clock))
+
+@changes.on_change
+def _drop():
+    global _index
+    with _lock:
+        _index = None
+
+def invalidate():
+    """Drop the index; called after any employee create/update/delete."""
+    _drop()
+    changes.publish()
@@ -1,161 +1,217 @@
-# app/admin_routes.py
-from datetime import date
-from functools import wraps
-from flask import render_template, request, redirect, url_for, current_app, session as flask_session, flash
-from .models import session, Week, Slot, Employee
-from .utils import monday_of, parse_categories, cats_to_str
-
-def _auth_ok(): return flask_session.get("admin_ok") is True
-def _require_login(f):
-    @wraps(f)
-    def wrapper(*a, **kw):
-        if not _auth_ok(): return redirect(url_for("admin_login"))
-        return f(*a, **kw)
-    return wrapper
-
-def register_admin(app):
-    @app.route("/admin", methods=["GET", "POST"])
-    def admin_login():
-        if request.method == "POST":
-            user = request.form.get("username", "")
-            pw = request.form.get("password", "")
-            if (user == current_app.config["ADMIN_USERNAME"]
-                and pw == current_app.config["ADMIN_PASSWORD"]):
-                flask_session["admin_ok"] = True
-                return redirect(url_for("admin_panel"))
-            flash("Invalid credentials", "error")
-        return render_template("admin_login.html")
-
-    @app.get("/admin/logout")
-    def admin_logout():
-        flask_session.clear()
-        return redirect(url_for("admin_login"))
-
-    @app.get("/admin/panel")
-    @_require_login
-    def admin_panel():
-        s = session()
-        try:
-            start = monday_of(date.today())
-            week = s.query(Week).filter(Week.start_date == start).one_or_none()
-            rows, cats = [], set()
-            if week:
-                for sl in sorted(week.slots, key=lambda x: (x.date, x.code)):
-                    scats = parse_categories(sl.categories)
-                    rows.append({"id": sl.id, "date": sl.date.isoformat(), "code": sl.code, "capacity": sl.capacity or 0, "cats": scats})
-                    cats.update(scats)
-            all_cats = sorted(cats | {"Weld","Press","Paint","QA","Mill"})
-            return render_template("admin_panel.html", rows=rows, categories=all_cats)
-        finally:
-            s.close()
-
-    @app.post("/admin/slots/<int:slot_id>/capacity")
-    @_require_login
-    def admin_set_capacity(slot_id: int):
-        s = session()
-        try:
-            sl = s.get(Slot, slot_id)
-            if not sl:
-                flash("Slot not found", "error"); return redirect(url_for("admin_panel"))
-            cap = int(request.form.get("capacity", sl.capacity or 0))
-            sl.capacity = max(0, cap); s.commit()
-            flash("Capacity updated", "success")
-            return redirect(url_for("admin_panel"))
-        finally:
-            s.close()
-
-    @app.post("/admin/slots/<int:slot_id>/categories")
-    @_require_login
-    def admin_set_slot_categories(slot_id: int):
-        s = session()
-        try:
-            sl = s.get(Slot, slot_id)
-            if not sl:
-                flash("Slot not found", "error"); return redirect(url_for("admin_panel"))
-            sl.categories = cats_to_str(request.form.getlist("categories")); s.commit()
-            flash("Categories updated", "success")
-            return redirect(url_for("admin_panel"))
-        finally:
-            s.close()
-
-    @app.get("/admin/employees")
-    @_require_login
-    def admin_employees():
-        s = session()
-        try:
-            emps = s.query(Employee).order_by(Employee.last_name.asc(), Employee.first_name.asc()).all()
-            categories = ["Weld","Press","Paint","QA","Mill"]
-            data = []
-            for e in emps:
-                data.append({
-                    "id": e.id, "name": f"{e.first_name} {e.last_name}",
-                    "first_name": e.first_name, "last_name": e.last_name,
-                    "clock_number": e.clock_number, "phone": e.phone or "",
-                    "cats": parse_categories(e.categories)
-                })
-            return render_template("employees.html", employees=data, categories=categories)
-        finally:
-            s.close()
-
-    @app.post("/admin/employees")
-    @_require_login
-    def admin_emp_create():
-        s = session()
+# app/routes.py
+from datetime import date, timedelta
+from flask import render_template, request, jsonify, current_app, redirect, Response, make_response, stream_with_context
+from .services import assign_slot
+from .state import apply_states, local_now, freeze_at
+from .grid import find_week, week_grid
+from .stream import event_stream, stream_id
+from .roster import roster_index, employee_by_clock, SEARCH_LIMIT
+from .utils import monday_of
+from .idempotency import MAX_KEY_LENGTH, fingerprint, lookup, store, replay
+
+BATCH_LIMIT = 100  # items per /api/signup/batch
+
+def _current_and_next():
+    start = monday_of(date.today())
+    return find_week(start), find_week(start + timedelta(days=7))
+
+def _published(wk):
+    return wk if wk and wk[1] == "published" else None
+
+# Weeks each page shows; /api/stream?view=... watches the same set so a
+# snapshot always matches the rows on screen.
+_VIEWS = {
+    "kiosk": lambda: tuple(_published(wk) for wk in _current_and_next()),
+    "display": lambda: _current_and_next()[:1],
+    "wallboard": _current_and_next,
+}
+
+def _week_header(wk, start):
+    if not wk:
+        return None
+    return {"id": wk[0], "status": wk[1], "start_date": start, "end_date": start + timedelta(days=6)}
+
+def _flat_slots(wk, now):
+    if not wk:
+        return []
+    return [r for day in apply_states(week_grid(wk[0]), wk[1], now) for r in day["rows"]]
+
+def _page_etag(view: str) -> str:
+    """Changes with the grid data version, the process (templates, assets), the week and the weekend freeze."""
+    now = local_now()
+    monday = monday_of(date.today())
+    frozen = now >= freeze_at(monday + timedelta(days=5), now.tzinfo.zone)
+    return f"{view}-{stream_id()}-{monday:%Y%m%d}-{int(frozen)}"
+
+def _conditional_page(view: str, render):
+    """304 when the client's copy of `view` is current, else render() with an ETag."""
+    etag = _page_etag(view)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = make_response(render())
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+def _signup_once(key, slot_id: int, employee_id: int, hits: dict):
+    """(body, status, replayed). A key seen before returns its stored result; otherwise assign_slot runs."""
+    fp = fingerprint(slot_id, employee_id)
+    if key and key in hits:
+        status, body = replay(hits[key], fp)
+        return body, status, True
+    body, status = assign_slot(slot_id, employee_id)
+    if key:
+        hits[key] = (fp, status, body)
+    return body, status, False
+
+def _bad_key(key):
+    return key is not None and not (isinstance(key, str) and 0 < len(key) <= MAX_KEY_LENGTH)
+
+def _signup_response(slot_id: int, employee_id: int, employee=None):
+    """One signup honouring Idempotency-Key; `employee` (a roster entry) is echoed back for confirmation."""
+    key = request.headers.get("Idempotency-Key")
+    if _bad_key(key):
+        return jsonify({"error": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}), 400
+    body, status, replayed = _signup_once(key, slot_id, employee_id, lookup([key]))
+    if employee is not None:
+        body = {**body, "employee": {"id": employee["id"], "tag": employee["tag"]}}
+    if key and not replayed:
+        store([(key, fingerprint(slot_id, employee_id), status, body)])
+    if not request.is_json and status == 200:
+        return redirect("/")
+    resp = jsonify(body)
+    if replayed:
+        resp.headers["Idempotent-Replayed"] = "true"
+    return resp, status
+
+def register_kiosk(app):
+    @app.get("/")
+    def kiosk():
+        def render():
+            grid, now = [], local_now()
+            for wk in _VIEWS["kiosk"]():
+                if wk:
+                    grid.extend(apply_states(week_grid(wk[0]), wk[1], now))
+            return render_template("kiosk.html", grid=grid, stream_id=stream_id())
+        return _conditional_page("kiosk", render)
+
+    @app.get("/display")
+    def display():
+        def render():
+            cur, _ = _current_and_next()
+            grid = apply_states(week_grid(cur[0]), cur[1], local_now()) if cur else []
+            return render_template("display.html", grid=grid, stream_id=stream_id())
+        return _conditional_page("display", render)
+
+    @app.get("/wallboard")
+    def wallboard():
+        def render():
+            start, now = monday_of(date.today()), local_now()
+            cur, nxt = _current_and_next()
+            return render_template(
+                "wallboard.html",
+                cur_week=_week_header(cur, start), cur_slots=_flat_slots(cur, now),
+                nxt_week=_week_header(nxt, start + timedelta(days=7)), nxt_slots=_flat_slots(nxt, now),
+                stream_id=stream_id(),
+            )
+        return _conditional_page("wallboard", render)
+
+    @app.get("/api/stream")
+    def api_stream():
+        last_id = request.headers.get("Last-Event-ID") or request.args.get("since")
+        weeks = _VIEWS.get(request.args.get("view", "wallboard"), _current_and_next)
+        resp = Response(stream_with_context(event_stream(weeks, last_id)),
+                        mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"
+        return resp
+
+    @app.get("/api/roster")
+    def api_roster():
+        idx = roster_index()
+        resp = Response(idx.payload, mimetype="application/json")
+        resp.set_etag(idx.etag)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp.make_conditional(request)
+
+    @app.get("/api/roster/search")
+    def api_roster_search():
         try:
-            name = (request.form.get("name") or "").strip()
-            parts = name.split()
-            first = parts[0] if parts else ""
-            last = parts[-1] if len(parts) >= 2 else ""
-            clock = (request.form.get("clock_number") or "").strip()
-            phone = (request.form.get("phone") or "").strip()
-            cats = request.form.getlist("categories")
-            if not (first and last and clock):
-                flash("Name and 4-digit clock number required", "error")
-                return redirect(url_for("admin_employees"))
-            if len(clock) != 4 or not clock.isdigit():
-                flash("Clock number must be 4 digits", "error")
-                return redirect(url_for("admin_employees"))
-            e = Employee(first_name=first, last_name=last, clock_number=clock, phone=phone, categories=cats_to_str(cats))
-            s.add(e); s.commit()
-            flash("Employee added", "success")
-            return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
-
-    @app.post("/admin/employees/<int:emp_id>")
-    @_require_login
-    def admin_emp_update(emp_id: int):
-        s = session()
+            limit = min(max(int(request.args.get("limit", SEARCH_LIMIT)), 1), 100)
+        except ValueError:
+            limit = SEARCH_LIMIT
+        matches = roster_index().search(request.args.get("q", ""), limit)
+        return jsonify([{"id": e["id"], "name": e["name"], "tag": e["tag"]} for e in matches])
+
+    @app.post("/api/signup")
+    def api_signup():
+        data = request.get_json(silent=True) or request.form
         try:
-            e = s.get(Employee, emp_id)
-            if not e:
-                flash("Employee not found", "error"); return redirect(url_for("admin_employees"))
-            e.first_name = (request.form.get("first_name") or request.form.get("name","")).split()[0] or e.first_name
-            if request.form.get("last_name"):
-                e.last_name = request.form.get("last_name")
-            elif request.form.get("name"):
-                parts = request.form["name"].split()
-                if len(parts) >= 2: e.last_name = parts[-1]
-            clock = (request.form.get("clock_number") or "").strip()
-            if clock: e.clock_number = clock
-            e.phone = (request.form.get("phone") or "").strip()
-            e.categories = cats_to_str(request.form.getlist("categories"))
-            s.commit()
-            flash("Employee updated", "success")
-            return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
-
-    @app.post("/admin/employees/<int:emp_id>/delete")
-    @_require_login
-    def admin_emp_delete(emp_id: int):
-        s = session()
+            slot_id = int(data.get("slot_id", 0))
+            employee_id = int(data.get("employee_id", 0))
+        except (TypeError, ValueError):
+            return jsonify({"error": "slot_id and employee_id must be integers"}), 400
+        return _signup_response(slot_id, employee_id)
+
+    @app.post("/api/signup/badge")
+    def api_signup_badge():
+        """{slot_id, clock_number} -> signup; a typed or badge-scanned clock number resolves without SQL."""
+        data = request.get_json(silent=True) or request.form
         try:
-            e = s.get(Employee, emp_id)
-            if not e:
-                flash("Employee not found", "error"); return redirect(url_for("admin_employees"))
-            s.delete(e); s.commit()
-            flash("Employee deleted", "success")
-            return redirect(url_for("admin_employees"))
-        finally:
-            s.close()
+            slot_id = int(data.get("slot_id", 0))
+        except (TypeError, ValueError):
+            return jsonify({"error": "slot_id must be an integer"}), 400
+        employee = employee_by_clock(data.get("clock_number"))
+        if employee is None:
+            return jsonify({"error": "Unknown clock number"}), 404
+        return _signup_response(slot_id, employee["id"], employee)
+
+    @app.post("/api/signup/batch")
+    def api_signup_batch():
+        """{"items": [{slot_id, employee_id | clock_number, idempotency_key?}, ...]} -> {"results": [{status, body, replayed}]}.
+
+        Items run in order, each as its own signup transaction; results line up with items.
+        """
+        items = (request.get_json(silent=True) or {}).get("items")
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "items must be a non-empty list"}), 400
+        if len(items) > BATCH_LIMIT:
+            return jsonify({"error": f"at most {BATCH_LIMIT} items per batch"}), 400
+        hits = lookup([it.get("idempotency_key") for it in items
+                       if isinstance(it, dict) and not _bad_key(it.get("idempotency_key"))])
+        results, fresh = [], []
+        for it in items:
+            employee = None
+            try:
+                slot_id = int(it["slot_id"])
+                if "clock_number" in it:
+                    employee = employee_by_clock(it["clock_number"])
+                    if employee is None:
+                        results.append({"status": 404, "body": {"error": "Unknown clock number"}, "replayed": False})
+                        continue
+                    employee_id = employee["id"]
+                else:
+                    employee_id = int(it["employee_id"])
+            except (KeyError, TypeError, ValueError):
+                results.append({"status": 400, "body": {"error": "slot_id and employee_id must be integers"},
+                                "replayed": False})
+                continue
+            key = it.get("idempotency_key")
+            if _bad_key(key):
+                results.append({"status": 400, "replayed": False,
+                                "body": {"error": f"idempotency_key must be 1-{MAX_KEY_LENGTH} characters"}})
+                continue
+            body, status, replayed = _signup_once(key, slot_id, employee_id, hits)
+            if employee is not None:
+                body = {**body, "employee": {"id": employee["id"], "tag": employee["tag"]}}
+            if key and not replayed:
+                fresh.append((key, fingerprint(slot_id, employee_id), status, body))
+            results.append({"status": status, "body": body, "replayed": replayed})
+        store(fresh)
+        return jsonify({"results": results})
+
+    @app.get("/health")
+    def health():
+        return jsonify({"ok": True, "version": current_app.config["APP_VERSION"],
+                        "startup": current_app.config.get("STARTUP_TIMING", {})})
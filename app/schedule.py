@@ -0,0 +1,116 @@
+# app/schedule.py
+"""Per-employee schedule rules: no overlapping shifts, weekly overtime-hours cap.
+
+Slots carry starts_at/ends_at derived from their code (weeks.slot_interval) and
+every signup copies them, so an employee's shifts around a time are one range
+of the (employee_id, starts_at) index; no shift is longer than LONGEST_SHIFT,
+which bounds that range from below. Weekly hours come from the hours ledger
+row (employee, week) that the signup transaction already maintains.
+assign_slot folds both rules into its conditional INSERT, so they are checked
+under the same write lock as the capacity; refusal() only runs after a refused
+insert, to say why. WEEKLY_HOURS_CAP sets the cap per shift_type.
+"""
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, exists, func, and_
+from .models import Slot, Signup, Employee, HoursLedger
+from .weeks import SLOT_HOURS, SLOT_TIMES
+
+LONGEST_SHIFT = timedelta(hours=max(end - start for start, end in SLOT_TIMES.values()))
+
+def parse_caps(text: str) -> dict:
+    """"DAY:16,ROTATING:12" -> {"DAY": 16, "ROTATING": 12}; shift types left out (or 0) have no cap."""
+    caps = {}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        name, _, hours = part.partition(":")
+        try:
+            value = int(hours)
+        except ValueError:
+            raise ValueError(f"WEEKLY_HOURS_CAP entry {part.strip()!r} is not SHIFT_TYPE:HOURS")
+        if value > 0:
+            caps[name.strip().upper()] = value
+    return caps
+
+def cap_for(shift_type) -> int | None:
+    caps = current_app.config.get("WEEKLY_HOURS_CAP") or {}   # bench apps built without create_app have none
+    return caps.get((shift_type or "DAY").upper())
+
+def _overlapping(employee_id: int, slot_id: int, starts_at, ends_at):
+    """The employee's other signups whose interval intersects [starts_at, ends_at)."""
+    return and_(
+        Signup.employee_id == employee_id,
+        Signup.starts_at > starts_at - LONGEST_SHIFT,
+        Signup.starts_at < ends_at,
+        Signup.ends_at > starts_at,
+        Signup.slot_id != slot_id,
+    )
+
+def _week_hours(employee_id: int, week_start):
+    return func.coalesce(
+        select(HoursLedger.hours)
+        .where(HoursLedger.employee_id == employee_id, HoursLedger.week_start == week_start)
+        .scalar_subquery(), 0)
+
+def allowed(employee_id: int, slot_id: int, week_start, code: str, starts_at, ends_at, cap: int | None):
+    """SQL condition: the signup overlaps none of the employee's shifts and stays within `cap` hours."""
+    rules = []
+    if starts_at is not None and ends_at is not None:
+        rules.append(~exists().where(_overlapping(employee_id, slot_id, starts_at, ends_at)))
+    if cap is not None:
+        rules.append(_week_hours(employee_id, week_start) + SLOT_HOURS.get(code, 0) <= cap)
+    return and_(*rules) if rules else None
+
+def refusal(s, employee_id: int, slot_id: int, week_start, code: str, starts_at, ends_at, cap: int | None):
+    """Why allowed() failed, as a kiosk message; None when both rules pass (the slot was full)."""
+    clash = None
+    if starts_at is not None and ends_at is not None:
+        clash = s.execute(
+            select(Slot.code, Slot.date).join(Signup, Signup.slot_id == Slot.id)
+            .where(_overlapping(employee_id, slot_id, starts_at, ends_at))
+            .order_by(Signup.starts_at).limit(1)
+        ).first()
+    if clash:
+        return f"Overlaps your {clash.code} shift on {clash.date:%a %b %d}"
+    if cap is not None:
+        hours = s.execute(select(_week_hours(employee_id, week_start))).scalar()
+        if hours + SLOT_HOURS.get(code, 0) > cap:
+            return f"Weekly overtime cap of {cap} h reached ({hours} h signed up this week)"
+    return None
+
+def week_conflicts(s, week_id: int) -> dict:
+    """Overlapping signups and over-cap employees across a week: one query, one sweep.
+
+    Rows come back ordered by employee and start time, so an overlap is a shift
+    starting before the latest end seen so far for the same employee.
+    """
+    rows = s.execute(
+        select(Signup.employee_id, Employee.first_name, Employee.last_name, Employee.clock_number,
+               Employee.shift_type, Slot.id, Slot.date, Slot.code, Signup.starts_at, Signup.ends_at)
+        .join(Slot, Slot.id == Signup.slot_id)
+        .join(Employee, Employee.id == Signup.employee_id)
+        .where(Slot.week_id == week_id)
+        .order_by(Signup.employee_id, Signup.starts_at, Slot.id)
+    ).all()
+    overlaps, over_cap, hours = [], [], {}
+    last = None   # (slot_id, date, code, ends_at) of this employee's shift ending latest so far
+    for emp_id, first, last_name, clock, shift_type, slot_id, day, code, starts_at, ends_at in rows:
+        tag = f"{first[:1].upper() + '.' if first else ''} {last_name} - {clock}"
+        if emp_id not in hours:
+            hours[emp_id] = [0, tag, shift_type]
+            last = None
+        hours[emp_id][0] += SLOT_HOURS.get(code, 0)
+        if starts_at is None or ends_at is None:
+            continue
+        if last is not None and starts_at < last[3]:
+            overlaps.append({"employee_id": emp_id, "tag": tag,
+                             "slots": [{"slot_id": last[0], "date": last[1].isoformat(), "code": last[2]},
+                                       {"slot_id": slot_id, "date": day.isoformat(), "code": code}]})
+        if last is None or ends_at > last[3]:
+            last = (slot_id, day, code, ends_at)
+    for emp_id, (total, tag, shift_type) in hours.items():
+        cap = cap_for(shift_type)
+        if cap is not None and total > cap:
+            over_cap.append({"employee_id": emp_id, "tag": tag, "shift_type": shift_type, "hours": total, "cap": cap})
+    return {"week_id": week_id, "overlaps": overlaps, "over_cap": over_cap}
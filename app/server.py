@@ -0,0 +1,70 @@
+# app/server.py
+"""Production serving: the app under gunicorn's threaded workers.
+
+The app is created once in the master (preload) and forked into WEB_WORKERS
+processes of WEB_THREADS threads each. The master starts no job threads, so
+no half-held lock or connection is forked; workers drop the inherited pooled
+connections after fork. The background jobs (SMS dispatcher, archiver,
+backups, auto-allocation) start after fork in whichever worker takes the jobs
+lock (jobs.py); the others stand by and take over if that worker is recycled.
+Each /api/stream client holds a thread for as long as it is connected, so
+WEB_THREADS must cover the screens plus request headroom.
+
+SIGTERM (systemctl stop/restart) and SIGHUP (systemctl reload: new workers,
+then the old ones retire) both drain: a worker stops accepting, ends its SSE
+streams within a second (the browsers reconnect elsewhere) and finishes
+in-flight requests for up to WEB_GRACEFUL_TIMEOUT seconds. With preload, HUP
+re-reads settings but not code; deploys restart the service.
+"""
+import signal
+from .grid import stop as stop_streams
+from .models import dispose_engines
+from . import jobs
+
+def _post_fork(server, worker):
+    dispose_engines()
+
+def _post_worker_init(worker):
+    # Runs after gunicorn installed the worker's own handlers; chain in front of them.
+    for sig in (signal.SIGTERM, signal.SIGQUIT, signal.SIGINT):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            stop_streams()
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+    start = worker.wsgi.extensions.get("background_jobs")   # worker.wsgi: the preloaded app
+    if start:
+        jobs.lead(worker.wsgi, start)
+
+def serve(app, host: str, port: int, workers: int, threads: int, keepalive: int, graceful_timeout: int):
+    """Block serving `app` (already created: preloaded into every worker)."""
+    from gunicorn.app.base import BaseApplication  # deferred: the dev server does not need it
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "gthread",
+        "threads": threads,
+        "keepalive": keepalive,
+        "graceful_timeout": graceful_timeout,
+        "timeout": 60,
+        "preload_app": True,
+        "accesslog": None,
+        "errorlog": "-",
+        "post_fork": _post_fork,
+        "post_worker_init": _post_worker_init,
+    }
+
+    class _Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    _Server().run()
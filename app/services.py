@@ -1,42 +1,109 @@
 # app/services.py
-from datetime import datetime, time, timedelta, date
-from flask import current_app
-import pytz
-from .models import session, Slot, Employee, Signup
-from .utils import is_weekend, parse_categories
+from datetime import datetime
+from sqlalchemy import select, insert, func, literal, exists, or_, and_
+from sqlalchemy.exc import IntegrityError
+from .models import session, seniority_order, Week, Slot, Employee, Signup
+from .grid import bump_week
+from .ledger import record_signup
+from .allocator import claim_holder, bump_notice
+from . import notify
+from .state import blocked_state, local_now, CLOSED
+from .schedule import allowed, refusal, cap_for
 
-def _is_weekend_frozen(slot_date: date) -> bool:
-    """Weekend slots freeze Friday 15:30 local time."""
-    if not is_weekend(slot_date): return False
-    tz = pytz.timezone(current_app.config["TIMEZONE"])
-    wkday = slot_date.weekday()
-    days_back = (wkday - 4) if wkday >= 5 else 0
-    freeze_dt = tz.localize(datetime.combine(slot_date - timedelta(days=days_back), time(15, 30)))
-    return datetime.now(tz) >= freeze_dt
+def _conditional_signup(slot_id: int, employee_id: int, rules=None):
+    """INSERT ... SELECT that only produces a row while the slot has a free seat.
+
+    The count and the insert run as one statement, so SQLite evaluates them
+    under the same write lock and two kiosks cannot both take the last seat.
+    `rules` (schedule.allowed: overlap and weekly cap) joins the seat check.
+    An existing (slot, employee) row also lets the insert through so that the
+    unique constraint reports the duplicate instead of the other checks.
+    """
+    taken = select(func.count(Signup.id)).where(Signup.slot_id == slot_id).scalar_subquery()
+    capacity = select(func.coalesce(Slot.capacity, 0)).where(Slot.id == slot_id).scalar_subquery()
+    duplicate = exists().where(Signup.slot_id == slot_id, Signup.employee_id == employee_id)
+    ok = taken < capacity if rules is None else and_(taken < capacity, rules)
+    row = select(
+        literal(slot_id), literal(employee_id), literal(datetime.utcnow(), type_=Signup.created_at.type),
+        Slot.starts_at, Slot.ends_at,
+    ).where(Slot.id == slot_id, or_(ok, duplicate))
+    return insert(Signup).from_select(["slot_id", "employee_id", "created_at", "starts_at", "ends_at"], row)
+
+def _eligible(slot_mask, emp_mask):
+    """SQL form of `not slot_mask or slot_mask & emp_mask`."""
+    return or_(slot_mask == 0, slot_mask.op("&")(emp_mask) != 0)
+
+def eligible_employees(slot_id: int):
+    """Employees whose categories satisfy the slot, by seniority; one query."""
+    s = session()
+    try:
+        return s.execute(
+            select(Employee)
+            .join(Slot, and_(Slot.id == slot_id, _eligible(Slot.category_mask, Employee.category_mask)))
+            .order_by(seniority_order(), Employee.last_name.asc())
+        ).scalars().all()
+    finally:
+        s.close()
+
+def eligible_for_week(week_id: int) -> dict:
+    """slot_id -> [employee_id, ...] for every slot of a week; one join."""
+    s = session()
+    try:
+        rows = s.execute(
+            select(Slot.id, Employee.id)
+            .join(Employee, _eligible(Slot.category_mask, Employee.category_mask))
+            .where(Slot.week_id == week_id)
+            .order_by(Slot.id, seniority_order(), Employee.id)
+        ).all()
+    finally:
+        s.close()
+    out = {}
+    for slot_id, emp_id in rows:
+        out.setdefault(slot_id, []).append(emp_id)
+    return out
 
 def assign_slot(slot_id: int, employee_id: int):
     s = session()
     try:
-        slot = s.get(Slot, slot_id)
-        emp = s.get(Employee, employee_id)
-        if not slot or not emp:
+        row = s.execute(
+            select(Slot.week_id, Week.start_date, Slot.date, Slot.code, Slot.is_closed, Week.status,
+                   Slot.category_mask, Employee.category_mask, Employee.seniority_rank,
+                   Slot.starts_at, Slot.ends_at, Employee.shift_type)
+            .join(Week, Week.id == Slot.week_id)
+            .join(Employee, Employee.id == employee_id)
+            .where(Slot.id == slot_id)
+        ).one_or_none()
+        if not row:
             return {"error": "Invalid slot or employee"}, 400
-        if _is_weekend_frozen(slot.date):
-            return {"error": "Weekend slots are frozen"}, 400
-        if len(slot.signups) >= (slot.capacity or 0):
-            return {"error": "Slot is full"}, 400
-
-        slot_cats = set(parse_categories(slot.categories))
-        emp_cats = set(parse_categories(emp.categories))
-        if slot_cats and not (slot_cats & emp_cats):
+        (week_id, week_start, slot_date, code, is_closed, week_status, slot_mask, emp_mask, rank,
+         starts_at, ends_at, shift_type) = row
+        blocked = blocked_state(slot_date, week_status, is_closed, local_now())
+        if blocked:
+            return {"error": "Slot is closed" if blocked == CLOSED else "Weekend slots are frozen"}, 400
+        if slot_mask and not (slot_mask & emp_mask):
             return {"error": "Employee not in required category"}, 400
 
-        exists = s.query(Signup).filter(Signup.slot_id == slot.id, Signup.employee_id == emp.id).one_or_none()
-        if exists:
+        cap = cap_for(shift_type)
+        rules = allowed(employee_id, slot_id, week_start, code, starts_at, ends_at, cap)
+        try:
+            result = s.execute(_conditional_signup(slot_id, employee_id, rules))
+        except IntegrityError:
+            s.rollback()
             return {"ok": True, "message": "Already signed up"}, 200
-
-        s.add(Signup(slot_id=slot.id, employee_id=emp.id))
+        if result.rowcount == 0:
+            reason = rules is not None and refusal(s, employee_id, slot_id, week_start, code, starts_at, ends_at, cap)
+            return {"error": reason or "Slot is full"}, 400
+        record_signup(s, employee_id, week_start, code)
+        bumped = claim_holder(s, week_id, slot_id, employee_id, rank)
+        what = notify.slot_text(slot_date, code)
+        notices = [{"kind": "signup", "employee_id": employee_id, "dedup_key": f"signup:{slot_id}:{employee_id}",
+                    "body": f"Overtime: you are signed up for {what}."}]
+        if bumped is not None:
+            notices.append(bump_notice(slot_id, bumped, employee_id, what))
+        notify.enqueue(s, notices)
         s.commit()
-        return {"ok": True}, 200
+        bump_week(week_id)
+        notify.wake()
+        return {"ok": True, "was_bump": bumped is not None}, 200
     finally:
         s.close()
@@ -0,0 +1,101 @@
+# app/slot_edits.py
+"""Batch slot edits from the admin panel with per-slot optimistic concurrency.
+
+Every change names a slot, the version the editor loaded, and any of
+capacity, categories, label and is_closed. The whole batch is validated
+first (any bad value rejects it outright), then each slot is written with
+UPDATE ... WHERE id = ? AND version = ?, bumping the version. A slot another
+admin saved in the meantime matches no row and comes back as a conflict with
+its current values; the rest of the batch still commits, in one transaction.
+"""
+from sqlalchemy import select, update
+from .models import Slot
+from .categories import register_bits
+from .utils import cats_to_str
+
+FIELDS = ("capacity", "categories", "label", "is_closed")
+
+def _names(value):
+    """"A, B" or ["A", "B"] -> ["A", "B"]; anything else is a ValueError."""
+    if isinstance(value, str):
+        return [c.strip() for c in value.split(",") if c.strip()]
+    if not isinstance(value, list) or not all(isinstance(c, str) for c in value):
+        raise ValueError("categories must be a string or a list of strings")
+    return [c.strip() for c in value if c.strip()]
+
+def validate(changes):
+    """Clean [{id, version, **fields}] or raise ValueError naming the first bad entry."""
+    if not isinstance(changes, list) or not changes:
+        raise ValueError("changes must be a non-empty list")
+    out, seen = [], set()
+    for i, ch in enumerate(changes):
+        if not isinstance(ch, dict):
+            raise ValueError(f"changes[{i}] must be an object")
+        try:
+            slot_id, version = int(ch["id"]), int(ch["version"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"changes[{i}] needs integer id and version")
+        if slot_id in seen:
+            raise ValueError(f"slot {slot_id} appears twice")
+        seen.add(slot_id)
+        clean = {"id": slot_id, "version": version}
+        if "capacity" in ch:
+            try:
+                clean["capacity"] = int(ch["capacity"])
+            except (TypeError, ValueError):
+                raise ValueError(f"slot {slot_id}: capacity must be an integer")
+            if clean["capacity"] < 0:
+                raise ValueError(f"slot {slot_id}: capacity must be >= 0")
+        if "categories" in ch:
+            try:
+                clean["categories"] = _names(ch["categories"] if ch["categories"] is not None else [])
+            except ValueError as e:
+                raise ValueError(f"slot {slot_id}: {e}")
+        if "label" in ch:
+            label = str(ch["label"] or "").strip()
+            if not label:
+                raise ValueError(f"slot {slot_id}: label cannot be empty")
+            clean["label"] = label
+        if "is_closed" in ch:
+            clean["is_closed"] = 1 if ch["is_closed"] in (True, 1, "1", "true", "on") else 0
+        if len(clean) == 2:
+            raise ValueError(f"slot {slot_id}: nothing to change (fields: {', '.join(FIELDS)})")
+        out.append(clean)
+    return out
+
+def _current(s, ids):
+    rows = s.execute(
+        select(Slot.id, Slot.week_id, Slot.version, Slot.capacity, Slot.categories, Slot.label, Slot.is_closed)
+        .where(Slot.id.in_(ids))
+    ).all()
+    return {r.id: {"id": r.id, "week_id": r.week_id, "version": r.version, "capacity": r.capacity or 0,
+                   "categories": _names(r.categories or ""), "label": r.label, "is_closed": bool(r.is_closed)}
+            for r in rows}
+
+def apply(s, changes):
+    """Apply validated changes in the caller's transaction (does not commit).
+
+    Returns (applied [{id, version}], conflicts [current slot dicts], missing [ids], week_ids touched).
+    """
+    bits = register_bits(s, {n for ch in changes for n in ch.get("categories", ())})
+    applied, stale = [], []
+    for ch in changes:
+        values = {k: ch[k] for k in ("capacity", "label", "is_closed") if k in ch}
+        if "categories" in ch:
+            values["categories"] = cats_to_str(ch["categories"])
+            values["category_mask"] = sum(1 << bits[n] for n in set(ch["categories"]))
+        result = s.execute(
+            update(Slot)
+            .where(Slot.id == ch["id"], Slot.version == ch["version"])
+            .values(version=Slot.version + 1, **values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            applied.append({"id": ch["id"], "version": ch["version"] + 1})
+        else:
+            stale.append(ch["id"])
+    current = _current(s, [a["id"] for a in applied] + stale)
+    conflicts = [current[i] for i in stale if i in current]
+    missing = [i for i in stale if i not in current]
+    weeks = {current[a["id"]]["week_id"] for a in applied}
+    return applied, conflicts, missing, weeks
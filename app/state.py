@@ -0,0 +1,62 @@
+# app/state.py
+"""Slot-state engine shared by the grid pages, the SSE stream and assign_slot.
+
+A slot is closed (week not published, or slot.is_closed), frozen (weekend slot
+past Friday 15:30 local time of its week), full, or open. Callers read the
+clock once per request via local_now() and pass it in; the tz object and the
+per-day freeze instant are cached, so a two-week grid is one pass of dict
+lookups and comparisons.
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from flask import current_app
+
+OPEN, FULL, FROZEN, CLOSED = "open", "full", "frozen", "closed"
+HINTS = {OPEN: "Open", FULL: "Full", FROZEN: "Frozen", CLOSED: "Closed"}
+FREEZE_WEEKDAY = 4          # Friday
+FREEZE_TIME = time(15, 30)
+
+@lru_cache(maxsize=8)
+def zone(tzname: str):
+    import pytz  # deferred: only needed once a page or signup asks for the time
+    return pytz.timezone(tzname)
+
+def local_now(tzname: str | None = None) -> datetime:
+    """The one clock read for a request, in the configured zone."""
+    return datetime.now(zone(tzname or current_app.config["TIMEZONE"]))
+
+@lru_cache(maxsize=512)
+def freeze_at(day: date, tzname: str) -> datetime | None:
+    """When a slot on `day` freezes: Friday 15:30 of its week for Sat/Sun, else None."""
+    if day.weekday() < 5:
+        return None
+    friday = day - timedelta(days=day.weekday() - FREEZE_WEEKDAY)
+    return zone(tzname).localize(datetime.combine(friday, FREEZE_TIME))
+
+def blocked_state(day: date, week_status: str, is_closed, now: datetime) -> str | None:
+    """CLOSED / FROZEN when signups are not allowed regardless of seats, else None."""
+    if week_status != "published" or is_closed:
+        return CLOSED
+    freeze = freeze_at(day, now.tzinfo.zone)
+    if freeze is not None and now >= freeze:
+        return FROZEN
+    return None
+
+def slot_state(row, week_status: str, now: datetime) -> str:
+    """State of one grid row (needs date, is_closed, taken, capacity)."""
+    blocked = blocked_state(row["date"], week_status, row.get("is_closed"), now)
+    if blocked:
+        return blocked
+    return FULL if row["taken"] >= row["capacity"] else OPEN
+
+def apply_states(grid, week_status: str, now: datetime):
+    """Copy cached grid days, adding state, disabled and state_hint to every row."""
+    out = []
+    for day in grid:
+        rows = []
+        for r in day["rows"]:
+            state = slot_state(r, week_status, now)
+            disabled = state in (CLOSED, FROZEN)
+            rows.append({**r, "state": state, "disabled": disabled, "state_hint": HINTS[state] if disabled else None})
+        out.append({"date": day["date"], "rows": rows})
+    return out
@@ -0,0 +1,57 @@
+# app/stream.py
+"""Server-sent-event feed of per-slot deltas for the kiosk, display and wallboard.
+
+Each connection keeps the last state it sent per slot and, whenever the grid
+data version moves (or the heartbeat fires, which catches the Friday freeze),
+sends only the slots that changed. Event ids are "<boot>-<version>"; a client
+reconnecting with a different Last-Event-ID gets a full snapshot to resync.
+"""
+import json, os, time
+from .grid import data_version, stopping, wait_for_change, week_grid
+from .state import apply_states, local_now
+
+HEARTBEAT_SECONDS = 15
+# Computed at import: with gunicorn's preload that is once in the master, so every worker
+# shares it, which is right because the data version is shared too (grid.data_version).
+_BOOT = f"{int(time.time()):x}{os.getpid():x}"
+
+def stream_id(version: int | None = None) -> str:
+    return f"{_BOOT}-{data_version() if version is None else version}"
+
+def _snapshot(weeks):
+    """slot_id -> delta payload for every slot of the given (week_id, status) pairs."""
+    out, now = {}, local_now()
+    for wk in weeks:
+        if not wk:
+            continue
+        for day in apply_states(week_grid(wk[0]), wk[1], now):
+            for r in day["rows"]:
+                out[r["slot_id"]] = {
+                    "slot_id": r["slot_id"], "week_id": wk[0],
+                    "taken": r["taken"], "capacity": r["capacity"],
+                    "holder": r["holder"], "state": r["state"],
+                }
+    return out
+
+def _event(kind: str, version: int, slots) -> str:
+    payload = json.dumps({"version": version, "slots": slots}, separators=(",", ":"))
+    return f"id: {stream_id(version)}\nevent: {kind}\ndata: {payload}\n\n"
+
+def event_stream(current_weeks, last_event_id: str | None):
+    """Generator for /api/stream. `current_weeks` returns the (week_id, status) pairs to watch."""
+    version = data_version()
+    sent = _snapshot(current_weeks())
+    yield "retry: 3000\n\n"
+    if last_event_id != stream_id(version):
+        yield _event("snapshot", version, list(sent.values()))
+    while not stopping():
+        version = wait_for_change(version, HEARTBEAT_SECONDS)
+        if stopping():
+            return  # server is draining; EventSource reconnects to the next worker
+        snap = _snapshot(current_weeks())
+        if snap.keys() != sent.keys():
+            yield _event("snapshot", version, list(snap.values()))
+        else:
+            changed = [v for k, v in snap.items() if sent[k] != v]
+            yield _event("delta", version, changed) if changed else ": keepalive\n\n"
+        sent = snap
@@ -1,6 +1,6 @@
 # app/utils.py
 from datetime import datetime, timedelta, date
-import pytz, pathlib
+import pathlib
 
 def load_version():
     try:
@@ -9,8 +9,8 @@ def load_version():
         return "0.0.0"
 
 def tz_now(tzname: str):
-    tz = pytz.timezone(tzname)
-    return datetime.now(tz)
+    from .state import local_now
+    return local_now(tzname)
 
 def monday_of(d: date):
     return d - timedelta(days=d.weekday())
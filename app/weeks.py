@@ -0,0 +1,118 @@
+# app/weeks.py
+"""Week templating: stamp a slot layout onto a run of future weeks.
+
+The layout comes from an existing week (its slots' weekday, code, label,
+capacity and categories) or from a named template. Weeks are created with one
+Core INSERT ... ON CONFLICT(start_date) DO NOTHING RETURNING, so weeks that
+already exist are skipped by the unique index, and all slots for the new weeks
+go in with a single executemany of a cached INSERT in the caller's
+transaction. (A literal multi-row VALUES list was measured slower: compiling
+thousands of bind parameters costs more than the insert itself.)
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select, insert
+from .models import new_session, Week, Slot
+from .utils import monday_of
+from .grid import bump_week
+
+SLOT_CODES = ["First 4", "Full 8", "Last 4"]
+DAY_START = time(6, 0)  # local start of an overtime day; migration 014 backfills with the same value
+SLOT_TIMES = {"First 4": (0, 4), "Full 8": (0, 8), "Last 4": (4, 8)}  # hours after DAY_START
+SLOT_HOURS = {code: end - start for code, (start, end) in SLOT_TIMES.items()}
+TEMPLATES = {
+    "standard": [(day, code) for day in range(7) for code in SLOT_CODES],
+    "weekdays": [(day, code) for day in range(5) for code in SLOT_CODES],
+}
+STATUSES = ("draft", "published", "closed")
+
+def slot_interval(day: date, code: str):
+    """(starts_at, ends_at) as local naive datetimes; (None, None) for a code without set times."""
+    if code not in SLOT_TIMES:
+        return None, None
+    start, end = SLOT_TIMES[code]
+    base = datetime.combine(day, DAY_START)
+    return base + timedelta(hours=start), base + timedelta(hours=end)
+
+def template_layout(name: str):
+    if name not in TEMPLATES:
+        raise ValueError(f"Unknown template {name!r}")
+    return [
+        {"offset": day, "code": code, "label": code, "capacity": 0, "categories": "", "category_mask": 0}
+        for day, code in TEMPLATES[name]
+    ]
+
+def week_layout(s, week_id: int):
+    """Layout rows of an existing week, one per slot."""
+    rows = s.execute(
+        select(Week.start_date, Slot.date, Slot.code, Slot.label, Slot.capacity, Slot.categories, Slot.category_mask)
+        .join(Slot, Slot.week_id == Week.id)
+        .where(Week.id == week_id)
+        .order_by(Slot.date, Slot.code)
+    ).all()
+    return [
+        {"offset": (d - start).days, "code": code, "label": label, "capacity": cap or 0,
+         "categories": cats or "", "category_mask": mask or 0}
+        for start, d, code, label, cap, cats, mask in rows
+    ]
+
+def _insert_weeks(s, starts, status):
+    rows = [{"start_date": m, "end_date": m + timedelta(days=6), "status": status} for m in starts]
+    if s.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(Week).on_conflict_do_nothing(index_elements=["start_date"])
+    else:
+        existing = set(s.execute(select(Week.start_date).where(Week.start_date.in_(starts))).scalars())
+        rows = [r for r in rows if r["start_date"] not in existing]
+        stmt = insert(Week)
+    if not rows:
+        return []
+    return s.execute(stmt.returning(Week.id, Week.start_date), rows).all()
+
+def clone_weeks(s, layout, first_monday: date, count: int, status: str = "draft"):
+    """Create `count` consecutive weeks from `first_monday` using `layout`.
+
+    Runs inside session `s` without committing. Returns the (week_id, start_date)
+    pairs that were created; weeks that already existed are left untouched.
+    """
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status {status!r}")
+    first_monday = monday_of(first_monday)
+    starts = [first_monday + timedelta(days=7 * i) for i in range(count)]
+    if not starts:
+        return []
+    created = _insert_weeks(s, starts, status)
+    slot_rows = [
+        {"week_id": week_id, "date": day, "code": r["code"], "label": r["label"], "capacity": r["capacity"],
+         "categories": r["categories"], "category_mask": r["category_mask"], "starts_at": starts, "ends_at": ends}
+        for week_id, start in created
+        for r in layout
+        for day in [start + timedelta(days=r["offset"])]
+        for starts, ends in [slot_interval(day, r["code"])]
+    ]
+    if slot_rows:
+        s.execute(insert(Slot), slot_rows)
+    return created
+
+_seeded_monday = None
+
+def ensure_current_week() -> bool:
+    """Create this week from the standard template if missing; True if it was created.
+
+    Cheap after the first call each week: the check is skipped until Monday rolls over.
+    """
+    global _seeded_monday
+    monday = monday_of(date.today())
+    if _seeded_monday == monday:
+        return False
+    s = new_session()
+    try:
+        created = False
+        if s.execute(select(Week.id).where(Week.start_date == monday)).first() is None:
+            created = bool(clone_weeks(s, template_layout("standard"), monday, 1, status="published"))
+            s.commit()
+    finally:
+        s.close()
+    _seeded_monday = monday
+    if created:
+        bump_week()
+    return created
@@ -0,0 +1,80 @@
+"""Benchmark: batch allocation of a heavily subscribed week.
+
+Generates employees with random seniority, category masks and prior hours,
+signs them up across a week's slots, then times allocator.plan() (dry run) and
+allocate_week() (writes holders and bumps).
+
+    python bench/allocator.py --employees 2000 --signups 20
+"""
+import argparse, os, pathlib, random, sys, tempfile, time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from sqlalchemy import insert, select
+from app.models import init_db, session, Slot, Signup, Employee, HoursLedger
+from app.utils import monday_of
+from app.weeks import clone_weeks, template_layout
+from app.allocator import plan, allocate_week
+
+def build_app(db_path: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    init_db(app)
+    return app
+
+def seed(employees: int, per_employee: int, rnd: random.Random):
+    s = session()
+    try:
+        monday = monday_of(date.today()) + timedelta(days=7)
+        [(week_id, _)] = clone_weeks(s, template_layout("standard"), monday, 1, status="published")
+        slots = s.execute(select(Slot.id).where(Slot.week_id == week_id)).scalars().all()
+        s.execute(insert(Employee), [
+            {"first_name": "E", "last_name": str(i), "clock_number": f"{i:04d}", "categories": "",
+             "category_mask": rnd.choice([0, 1, 2, 3]), "shift_type": "DAY", "seniority_rank": rnd.randint(1, 500)}
+            for i in range(employees)
+        ])
+        emp_ids = s.execute(select(Employee.id)).scalars().all()
+        s.execute(insert(HoursLedger), [
+            {"employee_id": e, "week_start": monday - timedelta(weeks=1), "hours": rnd.randint(0, 60), "shifts": 1}
+            for e in emp_ids
+        ])
+        now = datetime.utcnow()
+        s.execute(insert(Signup), [
+            {"slot_id": sl, "employee_id": e, "created_at": now}
+            for e in emp_ids for sl in rnd.sample(slots, min(per_employee, len(slots)))
+        ])
+        s.commit()
+        return week_id
+    finally:
+        s.close()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--employees", type=int, default=2000)
+    ap.add_argument("--signups", type=int, default=20, help="slots each employee signs up for")
+    args = ap.parse_args()
+    rnd = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_app(os.path.join(tmp, "alloc.db"))
+        week_id = seed(args.employees, args.signups, rnd)
+        s = session()
+        t0 = time.perf_counter()
+        proposal = plan(s, week_id, weekend_only=False)
+        plan_s = time.perf_counter() - t0
+        s.close()
+        report = allocate_week(week_id, weekend_only=False)
+        again = allocate_week(week_id, weekend_only=False)
+
+    print(f"signups:        {args.employees * args.signups}")
+    print(f"plan (dry run): {plan_s * 1000:8.1f} ms  {len(proposal)} slots assigned")
+    print(f"allocate_week:  {report['ms']:8.1f} ms  changed={report['changed']}")
+    print(f"re-run:         {again['ms']:8.1f} ms  changed={again['changed']} bumped={len(again['bumped'])}")
+    if again["changed"] or again["bumped"] or len(proposal) != len(report["assignments"]):
+        print("FAIL")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Concurrent stress benchmark for services.assign_slot.
+
+Hammers a single weekday slot with hundreds of threads (each with its own
+scoped session) and checks that the slot never ends up over capacity and
+that no employee holds two signups for it.
+
+    python bench/assign_slot_stress.py --callers 400 --capacity 25 --threads 32
+"""
+import argparse, os, pathlib, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from sqlalchemy import func, select
+from app.models import init_db, session, Week, Slot, Employee, Signup
+from app.services import assign_slot
+
+def build_app(db_path: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    app.config["TIMEZONE"] = os.getenv("TIMEZONE", "America/Los_Angeles")
+    init_db(app)
+    return app
+
+def seed(callers: int, capacity: int) -> int:
+    s = session()
+    try:
+        monday = date.today() - timedelta(days=date.today().weekday()) + timedelta(days=7 * 52)
+        wk = Week(start_date=monday, end_date=monday + timedelta(days=6), status="published")
+        s.add(wk); s.flush()
+        slot = Slot(week_id=wk.id, date=monday, code="Full 8", label="Full 8", capacity=capacity)
+        s.add(slot)
+        s.add_all(Employee(first_name=f"E{i}", last_name="Bench", clock_number=f"{i:04d}") for i in range(callers))
+        s.commit()
+        return slot.id
+    finally:
+        s.close()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--callers", type=int, default=400, help="distinct employees racing for the slot")
+    ap.add_argument("--capacity", type=int, default=25)
+    ap.add_argument("--threads", type=int, default=32)
+    ap.add_argument("--repeats", type=int, default=2, help="times each employee taps (duplicate retries)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"))
+        with app.app_context():
+            slot_id = seed(args.callers, args.capacity)
+            emp_ids = [e for (e,) in session().execute(select(Employee.id)).all()]
+            session().close()
+
+        def tap(emp_id):
+            with app.app_context():
+                return assign_slot(slot_id, emp_id)[1]
+
+        calls = emp_ids * args.repeats
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            codes = list(pool.map(tap, calls))
+        elapsed = time.perf_counter() - t0
+
+        with app.app_context():
+            s = session()
+            taken = s.execute(select(func.count()).select_from(Signup).where(Signup.slot_id == slot_id)).scalar_one()
+            dupes = s.execute(
+                select(func.count()).select_from(
+                    select(Signup.employee_id).where(Signup.slot_id == slot_id)
+                    .group_by(Signup.employee_id).having(func.count() > 1).subquery()
+                )
+            ).scalar_one()
+            s.close()
+
+    overbooked = max(0, taken - args.capacity)
+    print(f"calls:        {len(calls)} ({args.callers} employees x {args.repeats}, {args.threads} threads)")
+    print(f"elapsed:      {elapsed:.3f}s")
+    print(f"throughput:   {len(calls) / elapsed:.0f} assign_slot/s")
+    print(f"accepted:     {codes.count(200)}  rejected: {codes.count(400)}  other: {len(codes) - codes.count(200) - codes.count(400)}")
+    print(f"seats taken:  {taken} / {args.capacity}")
+    print(f"overbookings: {overbooked}  duplicate signups: {dupes}")
+    if overbooked or dupes or taken != min(args.capacity, args.callers):
+        print("FAIL")
+        sys.exit(1)
+    print("OK: zero overbookings")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: process start to first HTTP 200 on "/".
+
+Starts run.py against a scratch database, polls "/" until it answers 200 and
+reports the wall time plus the app's own startup timing from /health. The
+first run creates the schema; later runs should hit the stored fingerprint.
+
+    python bench/cold_start.py --runs 5
+"""
+import argparse, json, os, pathlib, socket, subprocess, sys, tempfile, time, urllib.request
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(url: str):
+    with urllib.request.urlopen(url, timeout=2) as resp:
+        return resp.status, resp.read()
+
+def one_run(db_path: str, seed_mode: str, timeout: float = 30.0):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), DATABASE_URL=f"sqlite:///{db_path}", SEED_MODE=seed_mode)
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "run.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                status, _ = get(f"http://127.0.0.1:{port}/")
+                if status == 200:
+                    elapsed = time.perf_counter() - t0
+                    _, body = get(f"http://127.0.0.1:{port}/health")
+                    return elapsed, json.loads(body).get("startup", {})
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer 200 within %.0fs" % timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--seed-mode", default="lazy", choices=["lazy", "background", "eager"])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cold.db")
+        results = [one_run(db_path, args.seed_mode) for _ in range(args.runs)]
+
+    for i, (elapsed, timing) in enumerate(results):
+        label = "fresh DB " if i == 0 else "existing "
+        print(f"run {i + 1} ({label}): first 200 after {elapsed * 1000:7.1f} ms  {timing}")
+    warm = sorted(e for e, _ in results[1:]) or [results[0][0]]
+    print(f"median time-to-first-200 (existing DB): {warm[len(warm) // 2] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
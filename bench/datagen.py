@@ -0,0 +1,116 @@
+"""Seeded plant-scale data generator for the bench suite.
+
+Creates the schema through the app's own init_db, then writes employees,
+weeks, slots and signups straight into the SQLite file with executemany
+(no ORM), and rebuilds the hours ledger from the result. The same seed always
+produces the same database.
+
+    python bench/datagen.py /tmp/plant.db --employees 2000 --weeks 104 --signups 200000
+"""
+import argparse, os, pathlib, random, sqlite3, sys, time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from app.categories import DEFAULT_CATEGORIES
+from app.ledger import rebuild
+from app.models import init_db, session
+from app.utils import monday_of
+from app.weeks import SLOT_CODES, slot_interval
+
+FIRST = ["Ana", "Ben", "Cruz", "Dee", "Eli", "Fay", "Gus", "Hal", "Ivy", "Jo", "Kai", "Lou", "Max", "Noa"]
+LAST = ["Nguyen", "Smith", "Garcia", "Lee", "Patel", "Kim", "Lopez", "Brown", "Ward", "Young", "Reyes", "Chen"]
+FUTURE_WEEKS = 12  # weeks after the current one; the rest of --weeks is history
+STAMP = "%Y-%m-%d %H:%M:%S.%f"  # SQLAlchemy's SQLite DateTime text, so raw rows compare like ORM ones
+
+def build_app(db_path: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    app.config["TIMEZONE"] = os.getenv("TIMEZONE", "America/Los_Angeles")
+    init_db(app)
+    return app
+
+def generate(db_path: str, employees: int = 2000, weeks: int = 104, signups: int = 200_000, seed: int = 1):
+    """Write a synthetic plant into a new SQLite file at `db_path`; returns row counts."""
+    if employees > 10000:
+        raise ValueError("clock numbers are 4 digits; at most 10000 employees")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    rnd = random.Random(seed)
+    build_app(db_path)
+    n_cats = len(DEFAULT_CATEGORIES)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO employees (id, first_name, last_name, clock_number, phone, categories, category_mask,"
+            " shift_type, seniority_rank) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (i + 1, rnd.choice(FIRST), rnd.choice(LAST), f"{i:04d}", f"555-{i:04d}", ",".join(names), mask,
+                 rnd.choice(["DAY", "ROTATING"]), rnd.randint(1, employees))
+                for i in range(employees)
+                for bits in [rnd.sample(range(n_cats), rnd.randint(0, 2))]
+                for names, mask in [(sorted(DEFAULT_CATEGORIES[b] for b in bits), sum(1 << b for b in bits))]
+            ],
+        )
+
+        this_monday = monday_of(date.today())
+        first_monday = this_monday - timedelta(weeks=weeks - FUTURE_WEEKS - 1)
+        week_rows, slot_rows = [], []
+        for w in range(weeks):
+            monday = first_monday + timedelta(weeks=w)
+            status = "closed" if monday < this_monday else "published" if monday <= this_monday + timedelta(weeks=1) else "draft"
+            week_rows.append((w + 1, monday.isoformat(), (monday + timedelta(days=6)).isoformat(), status))
+            for day in range(7):
+                for code in SLOT_CODES:
+                    bit = rnd.randrange(n_cats) if rnd.random() < 0.2 else None
+                    starts, ends = slot_interval(monday + timedelta(days=day), code)
+                    slot_rows.append([len(slot_rows) + 1, w + 1, (monday + timedelta(days=day)).isoformat(), code, code,
+                                      0, DEFAULT_CATEGORIES[bit] if bit is not None else "",
+                                      (1 << bit) if bit is not None else 0, 0,
+                                      starts.strftime(STAMP), ends.strftime(STAMP)])
+        conn.executemany("INSERT INTO weeks (id, start_date, end_date, status) VALUES (?, ?, ?, ?)", week_rows)
+
+        # Spread signups evenly over past and current slots; capacity leaves a few seats open.
+        open_slots = [r for r in slot_rows if r[2] < (this_monday + timedelta(weeks=2)).isoformat()]
+        per_slot = min(employees, -(-signups // max(1, len(open_slots))))
+        signup_rows, emp_ids = [], range(1, employees + 1)
+        for r in open_slots:
+            take = min(per_slot, signups - len(signup_rows))
+            chosen = rnd.sample(emp_ids, take) if take > 0 else []
+            r[5] = take + rnd.randint(0, 5)
+            day = datetime.fromisoformat(r[2])
+            signup_rows.extend((r[0], e, (day - timedelta(days=rnd.randint(1, 6))).isoformat(sep=" "), r[9], r[10])
+                               for e in chosen)
+        conn.executemany(
+            "INSERT INTO slots (id, week_id, date, code, label, capacity, categories, category_mask, is_closed,"
+            " starts_at, ends_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", slot_rows)
+        conn.executemany("INSERT INTO signups (slot_id, employee_id, created_at, starts_at, ends_at)"
+                         " VALUES (?, ?, ?, ?, ?)", signup_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    s = session()
+    try:
+        rebuild(s)
+        s.commit()
+    finally:
+        s.close()
+    return {"employees": employees, "weeks": weeks, "slots": len(slot_rows), "signups": len(signup_rows)}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("db_path")
+    ap.add_argument("--employees", type=int, default=2000)
+    ap.add_argument("--weeks", type=int, default=104)
+    ap.add_argument("--signups", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    counts = generate(args.db_path, args.employees, args.weeks, args.signups, args.seed)
+    print(f"{counts} in {time.perf_counter() - t0:.1f}s -> {args.db_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: import a generated CSV roster through importer.validate/upsert.
+
+Times the first import (all inserts) and a re-import of the same file (all
+updates), each as one transaction.
+
+    python bench/employee_import.py --rows 5000
+"""
+import argparse, csv, io, os, pathlib, random, sys, tempfile, time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from sqlalchemy import func, select
+from app.models import init_db, session, Employee
+from app.importer import COLUMNS, validate, upsert
+
+FIRST = ["Ana", "Ben", "Cruz", "Dee", "Eli", "Fay", "Gus", "Hal", "Ivy", "Jo"]
+LAST = ["Nguyen", "Smith", "Garcia", "Lee", "Patel", "Kim", "Lopez", "Brown", "Ward", "Young"]
+CATS = ["Millwright", "Electrician", "Mechanic", "Operator"]
+
+def build_app(db_path: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    init_db(app)
+    return app
+
+def make_csv(rows: int, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(COLUMNS)
+    for i in range(rows):
+        w.writerow([f"{rnd.choice(FIRST)} {rnd.choice(LAST)}", f"{i:04d}", f"555-{i:04d}",
+                    ";".join(rnd.sample(CATS, rnd.randint(0, 2))), rnd.choice(["DAY", "ROTATING"]), i])
+    return buf.getvalue()
+
+def run_import(text: str):
+    t0 = time.perf_counter()
+    rows, errors, present = validate(text)
+    s = session()
+    try:
+        inserted, updated = upsert(s, rows, present)
+        s.commit()
+    finally:
+        s.close()
+    return time.perf_counter() - t0, inserted, updated, errors
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--budget-ms", type=float, default=1000.0)
+    args = ap.parse_args()
+    if args.rows > 10000:
+        ap.error("clock numbers are 4 digits; at most 10000 rows")
+
+    text = make_csv(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        build_app(os.path.join(tmp, "import.db"))
+        first = run_import(text)
+        again = run_import(text)
+        s = session()
+        total = s.execute(select(func.count()).select_from(Employee)).scalar_one()
+        s.close()
+
+    print(f"rows:          {args.rows}")
+    print(f"first import:  {first[0] * 1000:8.1f} ms  inserted={first[1]} updated={first[2]} errors={len(first[3])}")
+    print(f"re-import:     {again[0] * 1000:8.1f} ms  inserted={again[1]} updated={again[2]} errors={len(again[3])}")
+    if total != args.rows or first[1] != args.rows or again[2] != args.rows or \
+            max(first[0], again[0]) * 1000 > args.budget_ms:
+        print("FAIL")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
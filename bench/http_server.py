@@ -0,0 +1,221 @@
+"""Dev server vs production (gunicorn) under a shift-change load, over real HTTP.
+
+For each mode it starts `run.py` on a copy of a generated plant database,
+opens --screens long-lived /api/stream connections (wallboard, display,
+kiosks), then runs --clients keep-alive clients that mix kiosk/wallboard page
+loads, roster fetches and signup POSTs. It reports p50/p95/p99 latency,
+throughput and errors per mode, then a restart drill: SIGTERM while signups
+are in flight, counting requests reset before any response or truncated
+mid-response.
+
+    python bench/http_server.py --clients 16 --requests 100
+    python bench/http_server.py --modes production --workers 2 --threads 16
+"""
+import argparse, http.client, json, os, pathlib, random, signal, socket, sqlite3, subprocess, sys, \
+    tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from datagen import generate
+from suite import percentile
+
+PAGES = ["/", "/wallboard", "/api/roster", "/display"]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start(mode: str, db: str, port: int, workers: int, threads: int):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db}", AUTO_ALLOCATE="false", ARCHIVE_AFTER_WEEKS="0",
+               BACKUP_INTERVAL_HOURS="0", NOTIFY_TRANSPORT="none", SEED_MODE="eager")
+    cmd = [sys.executable, str(ROOT / "run.py"), "--port", str(port), "--host", "127.0.0.1",
+           "--prod" if mode == "production" else "--dev"]
+    if mode == "production":
+        cmd += ["--workers", str(workers), "--threads", str(threads)]
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            c.request("GET", "/health")
+            if c.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not come up on port {port}")
+
+def copy_db(src: str, dst: str):
+    # The generator's engine is still open and its rows may sit in the WAL; copy through SQLite.
+    with sqlite3.connect(src) as a, sqlite3.connect(dst) as b:
+        a.backup(b)
+
+def signup_pairs(db: str, n: int):
+    """(slot_id, employee_id) pairs open for signup; capacities are raised so every pair succeeds."""
+    conn = sqlite3.connect(db)
+    slots = [r[0] for r in conn.execute(
+        "SELECT s.id FROM slots s JOIN weeks w ON w.id = s.week_id WHERE w.status = 'published' "
+        "AND s.date > date('now') AND strftime('%w', s.date) NOT IN ('0', '6') AND s.category_mask = 0")]
+    emps = [r[0] for r in conn.execute("SELECT id FROM employees")]
+    # Shifts on one day overlap: one pair per employee and day, on days they are not already working.
+    busy = set(conn.execute("SELECT sg.employee_id, s.date FROM signups sg JOIN slots s ON s.id = sg.slot_id "
+                            "WHERE s.date > date('now')").fetchall())
+    days = dict(conn.execute(f"SELECT id, date FROM slots WHERE id IN ({','.join(map(str, slots)) or 0})").fetchall())
+    conn.execute(f"UPDATE slots SET capacity = {len(emps)}, is_closed = 0 WHERE id IN ({','.join(map(str, slots)) or 0})")
+    conn.commit()
+    conn.close()
+    pairs = [(s, e) for s in slots for e in emps]
+    random.Random(1).shuffle(pairs)
+    out = []
+    for s, e in pairs:
+        if (e, days[s]) not in busy:
+            busy.add((e, days[s]))
+            out.append((s, e))
+            if len(out) == n:
+                break
+    return out
+
+def screen(port: int, view: str, stop: threading.Event):
+    c = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        c.request("GET", f"/api/stream?view={view}")
+        resp = c.getresponse()
+        while not stop.is_set() and resp.fp.readline():
+            pass
+    except OSError:
+        pass
+    finally:
+        c.close()
+
+def client(port: int, requests: int, pairs, seed: int):
+    rng, conn, out = random.Random(seed), None, []
+    for i in range(requests):
+        if conn is None:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        t = time.perf_counter()
+        try:
+            if pairs and i % 4 == 3:
+                slot, emp = pairs.pop()
+                conn.request("POST", "/api/signup", body=json.dumps({"slot_id": slot, "employee_id": emp}),
+                             headers={"Content-Type": "application/json"})
+            else:
+                conn.request("GET", rng.choice(PAGES))
+            resp = conn.getresponse()
+            resp.read()
+            ok = resp.status == 200
+            if resp.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = None
+        out.append((time.perf_counter() - t, ok))
+    if conn is not None:
+        conn.close()
+    return out
+
+def run_load(port: int, clients: int, requests: int, screens: int, pairs):
+    stop = threading.Event()
+    views = ["wallboard", "display"] + ["kiosk"] * max(0, screens - 2)
+    watchers = [threading.Thread(target=screen, args=(port, v, stop), daemon=True) for v in views[:screens]]
+    for w in watchers:
+        w.start()
+    time.sleep(0.5)
+    shared = list(pairs)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = [r for batch in pool.map(lambda i: client(port, requests, shared, i), range(clients)) for r in batch]
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    ms = [t * 1000 for t, _ in results]
+    return {"requests": len(results), "errors": sum(not ok for _, ok in results),
+            "p50_ms": round(percentile(ms, 50), 2), "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2), "throughput_rps": round(len(results) / elapsed, 1)}
+
+def restart_drill(proc, port: int, pairs, clients: int = 8):
+    """Signups in flight when SIGTERM arrives: completed, reset with no response, or truncated mid-response."""
+    started, counts = threading.Event(), {"completed": 0, "reset": 0, "truncated": 0}
+    lock = threading.Lock()
+
+    def tapper(chunk):
+        for slot, emp in chunk:
+            try:
+                c = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                c.connect()
+            except OSError:
+                return  # server gone before we connected: refused, not dropped
+            try:
+                c.request("POST", "/api/signup", body=json.dumps({"slot_id": slot, "employee_id": emp}),
+                          headers={"Content-Type": "application/json"})
+                started.set()
+                c.getresponse().read()
+                outcome = "completed"
+            except http.client.IncompleteRead:
+                outcome = "truncated"
+            except (OSError, http.client.HTTPException):
+                outcome = "reset"
+            finally:
+                c.close()
+            with lock:
+                counts[outcome] += 1
+
+    chunks = [pairs[i::clients] for i in range(clients)]
+    threads = [threading.Thread(target=tapper, args=(ch,)) for ch in chunks]
+    for t in threads:
+        t.start()
+    started.wait(10)
+    time.sleep(0.3)
+    t0 = time.perf_counter()
+    proc.send_signal(signal.SIGTERM)
+    proc.wait(60)
+    counts["stop_s"] = round(time.perf_counter() - t0, 2)
+    for t in threads:
+        t.join()
+    return counts
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--modes", nargs="*", default=["dev", "production"])
+    ap.add_argument("--employees", type=int, default=2000)
+    ap.add_argument("--weeks", type=int, default=104)
+    ap.add_argument("--signups", type=int, default=200_000)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=100, help="requests per client")
+    ap.add_argument("--screens", type=int, default=6, help="open /api/stream connections")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    base = os.path.join(tmp.name, "plant.db")
+    generate(base, args.employees, args.weeks, args.signups, 1)
+    results = {}
+    for mode in args.modes:
+        db = os.path.join(tmp.name, f"{mode}.db")
+        copy_db(base, db)
+        pairs = signup_pairs(db, args.clients * args.requests + 2000)
+        port = free_port()
+        proc = start(mode, db, port, args.workers, args.threads)
+        try:
+            load = run_load(port, args.clients, args.requests, args.screens, pairs[:args.clients * args.requests])
+            load["restart"] = restart_drill(proc, port, pairs[args.clients * args.requests:])
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+        results[mode] = load
+        r = load["restart"]
+        print(f"{mode:10s} p50 {load['p50_ms']:7.2f}  p95 {load['p95_ms']:7.2f}  p99 {load['p99_ms']:7.2f} ms  "
+              f"{load['throughput_rps']:7.1f} req/s  errors {load['errors']}  |  SIGTERM: "
+              f"{r['completed']} completed, {r['reset']} reset, {r['truncated']} truncated, stopped in {r['stop_s']} s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark: mixed read/write throughput under each SQLITE_PROFILE.
+
+Reader threads load a week grid straight from the database (the query behind
+/wallboard and /display) while writer threads sign employees up through
+services.assign_slot. Each profile gets a fresh database and runs for the
+same wall time.
+
+    python bench/sqlite_profile.py --seconds 3 --readers 4 --writers 2
+"""
+import argparse, itertools, os, pathlib, sys, tempfile, threading, time
+from datetime import date, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from sqlalchemy import insert, select
+from app.models import init_db, session, SQLITE_PROFILES, Slot, Employee
+from app.utils import monday_of
+from app.weeks import clone_weeks, template_layout
+from app.grid import _load_grid, bump_week
+from app.services import assign_slot
+
+def build_app(db_path: str, profile: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    app.config["TIMEZONE"] = os.getenv("TIMEZONE", "America/Los_Angeles")
+    app.config["SQLITE_PROFILE"] = profile
+    init_db(app)
+    return app
+
+def seed(employees: int):
+    s = session()
+    try:
+        # A week far enough out that no slot is frozen while the bench runs.
+        monday = monday_of(date.today()) + timedelta(weeks=8)
+        [(week_id, _)] = clone_weeks(s, template_layout("standard"), monday, 1, status="published")
+        s.execute(Slot.__table__.update().where(Slot.week_id == week_id).values(capacity=employees))
+        s.execute(insert(Employee), [{"first_name": "E", "last_name": str(i), "clock_number": f"{i:04d}",
+                                      "categories": "", "category_mask": 0} for i in range(employees)])
+        s.commit()
+        slots = s.execute(select(Slot.id).where(Slot.week_id == week_id)).scalars().all()
+        emps = s.execute(select(Employee.id)).scalars().all()
+        return week_id, slots, emps
+    finally:
+        s.close()
+
+def run(profile: str, seconds: float, readers: int, writers: int, employees: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, f"{profile}.db"), profile)
+        bump_week()
+        week_id, slots, emps = seed(employees)
+        pairs = iter(itertools.product(emps, slots))
+        pairs_lock = threading.Lock()
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        count_lock = threading.Lock()
+
+        def tally(key):
+            with count_lock:
+                counts[key] += 1
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    _load_grid(week_id)
+                    tally("reads")
+                except Exception:
+                    tally("errors")
+
+        def writer():
+            with app.app_context():
+                while not stop.is_set():
+                    with pairs_lock:
+                        pair = next(pairs, None)
+                    if pair is None:
+                        return
+                    try:
+                        body, status = assign_slot(pair[1], pair[0])
+                        tally("writes" if status == 200 else "errors")
+                    except Exception:
+                        tally("errors")
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        session().close()
+    return {k: v / seconds for k, v in counts.items()}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--writers", type=int, default=2)
+    ap.add_argument("--employees", type=int, default=2000)
+    args = ap.parse_args()
+
+    results = {p: run(p, args.seconds, args.readers, args.writers, args.employees) for p in ("default", "tuned")}
+    for profile, r in results.items():
+        print(f"{profile:8s} reads/s {r['reads']:8.1f}  writes/s {r['writes']:7.1f}  errors/s {r['errors']:5.1f}")
+    base, tuned = results["default"], results["tuned"]
+    if base["reads"] and base["writes"]:
+        print(f"tuned vs default: reads x{tuned['reads'] / base['reads']:.2f}, "
+              f"writes x{tuned['writes'] / base['writes']:.2f}")
+    print("profiles:", {p: SQLITE_PROFILES[p] for p in results})
+
+if __name__ == "__main__":
+    main()
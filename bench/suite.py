@@ -0,0 +1,225 @@
+"""Load benchmark suite: page and API latency against a plant-scale database.
+
+Generates (or reuses) a synthetic database with bench/datagen.py, then drives
+the real app through Flask's test client:
+
+    kiosk, wallboard, admin_panel, employees, roster   sequential GETs
+    assign_slot                                        concurrent POST /api/signup
+    badge_signup                                       concurrent POST /api/signup/badge (clock number)
+
+For each scenario it reports p50/p95/p99 latency, SQL statements per request
+(counted on both engines) and peak RSS, and can write the results as JSON.
+With --baseline it compares p95 and SQL/request against an earlier run and
+exits 1 when either grows by more than --threshold.
+
+    python bench/suite.py --out bench-results.json
+    python bench/suite.py --baseline bench-results.json --threshold 0.25
+"""
+import argparse, json, math, os, pathlib, platform, resource, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, select
+from datagen import generate
+
+READ_SCENARIOS = {
+    "kiosk": "/",
+    "wallboard": "/wallboard",
+    "admin_panel": "/admin/panel",
+    "employees": "/admin/employees",
+    "roster": "/api/roster",
+}
+
+class SqlCounter:
+    """Counts statements executed on the given engines."""
+    def __init__(self, *engines):
+        self.count = 0
+        self._lock = threading.Lock()
+        for engine in {id(e): e for e in engines}.values():
+            event.listen(engine, "before_cursor_execute", self._hit)
+
+    def _hit(self, *_):
+        with self._lock:
+            self.count += 1
+
+def percentile(values, p: float) -> float:
+    """Nearest-rank percentile of `values` (p in 0..100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 1024 / (1024 if platform.system() == "Darwin" else 1), 1)
+
+def summarize(latencies, statements: int, requests: int, errors: int, elapsed: float):
+    ms = [t * 1000 for t in latencies]
+    return {
+        "requests": requests, "errors": errors,
+        "p50_ms": round(percentile(ms, 50), 2), "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "sql_per_request": round(statements / requests, 2) if requests else 0.0,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def login(client):
+    client.post("/admin", data={"username": os.environ.get("ADMIN_USERNAME", "admin"),
+                                "password": os.environ.get("ADMIN_PASSWORD", "admin123")})
+
+def run_reads(app, counter, path: str, requests: int):
+    client = app.test_client()
+    login(client)
+    client.get(path)  # warm caches and templates; production serves most requests warm too
+    latencies, errors = [], 0
+    before = counter.count
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        t = time.perf_counter()
+        resp = client.get(path)
+        latencies.append(time.perf_counter() - t)
+        errors += resp.status_code != 200
+    return summarize(latencies, counter.count - before, requests, errors, time.perf_counter() - t0)
+
+def open_pairs(app, limit: int):
+    """(slot_id, employee_id) pairs that can still sign up: future weekday slots of this week and next."""
+    from app.models import session, Week, Slot, Employee, Signup
+    with app.app_context():
+        s = session()
+        monday = date.today() - timedelta(days=date.today().weekday())
+        days = {sl: d for sl, d in s.execute(
+            select(Slot.id, Slot.date).join(Week, Week.id == Slot.week_id)
+            .where(Week.status == "published", Slot.date > date.today(), Slot.category_mask == 0,
+                   Slot.date < monday + timedelta(days=14))
+        ).all() if d.weekday() < 5}  # weekend slots may already be frozen
+        slots = list(days)
+        # Slots on one day overlap, so an employee can take at most one and only on a day they are not working.
+        busy = set(s.execute(
+            select(Signup.employee_id, Slot.date).join(Slot, Slot.id == Signup.slot_id)
+            .where(Slot.date.in_(set(days.values())))).all())
+        emps = s.execute(select(Employee.id)).scalars().all()
+        s.execute(Slot.__table__.update().where(Slot.id.in_(slots)).values(capacity=len(emps)))
+        s.commit()
+    pairs = []
+    for sl in slots:
+        for e in emps:
+            if (e, days[sl]) not in busy:
+                busy.add((e, days[sl]))
+                pairs.append((sl, e))
+    return pairs[:limit]
+
+def run_signups(app, counter, requests: int, threads: int, badge: bool = False):
+    pairs = open_pairs(app, requests)
+    if badge:
+        from app.models import session, Employee
+        with app.app_context():
+            clocks = dict(session().execute(select(Employee.id, Employee.clock_number)).all())
+    local = threading.local()
+
+    def tap(pair):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        t = time.perf_counter()
+        if badge:
+            resp = local.client.post("/api/signup/badge", json={"slot_id": pair[0], "clock_number": clocks[pair[1]]})
+        else:
+            resp = local.client.post("/api/signup", json={"slot_id": pair[0], "employee_id": pair[1]})
+        return time.perf_counter() - t, resp.status_code
+
+    before = counter.count
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(tap, pairs))
+    elapsed = time.perf_counter() - t0
+    out = summarize([t for t, _ in results], counter.count - before, len(results),
+                    sum(code != 200 for _, code in results), elapsed)
+    out["threads"] = threads
+    return out
+
+def compare(current: dict, baseline: dict, threshold: float):
+    """Regressions where p95 or SQL/request grew by more than `threshold` (fraction)."""
+    failures = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for metric in ("p95_ms", "sql_per_request"):
+            if base[metric] and cur[metric] > base[metric] * (1 + threshold):
+                failures.append(f"{name}.{metric}: {base[metric]} -> {cur[metric]}")
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--db", help="reuse this database (generated if missing); the signup scenario "
+                                 "writes to it, so copy it first for comparable runs")
+    ap.add_argument("--employees", type=int, default=2000)
+    ap.add_argument("--weeks", type=int, default=104)
+    ap.add_argument("--signups", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--requests", type=int, default=200, help="requests per read scenario")
+    ap.add_argument("--writes", type=int, default=1000, help="signup POSTs in each signup scenario")
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--only", nargs="*", help="scenario names to run")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.2, help="allowed fractional growth before failing")
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = args.db or os.path.join(tmp.name, "plant.db")
+    t0 = time.perf_counter()
+    counts = generate(db_path, args.employees, args.weeks, args.signups, args.seed) \
+        if not os.path.exists(db_path) else None
+    gen_s = time.perf_counter() - t0
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("AUTO_ALLOCATE", "false")
+    os.environ.setdefault("ARCHIVE_AFTER_WEEKS", "0")
+    os.environ.setdefault("BACKUP_INTERVAL_HOURS", "0")
+    from app import create_app
+    from app.models import SessionLocal, ReadSession
+    app = create_app()
+    counter = SqlCounter(SessionLocal.session_factory.kw["bind"], ReadSession.kw["bind"])
+
+    wanted = set(args.only or list(READ_SCENARIOS) + ["assign_slot", "badge_signup"])
+    scenarios = {}
+    for name, path in READ_SCENARIOS.items():
+        if name in wanted:
+            scenarios[name] = run_reads(app, counter, path, args.requests)
+    if "assign_slot" in wanted:
+        scenarios["assign_slot"] = run_signups(app, counter, args.writes, args.threads)
+    if "badge_signup" in wanted:
+        scenarios["badge_signup"] = run_signups(app, counter, args.writes, args.threads, badge=True)
+
+    results = {
+        "generated": counts, "generate_s": round(gen_s, 1) if counts else None,
+        "python": platform.python_version(), "sqlite_profile": app.config.get("SQLITE_PROFILE"),
+        "scenarios": scenarios,
+    }
+    for name, r in scenarios.items():
+        print(f"{name:12s} p50 {r['p50_ms']:7.2f}  p95 {r['p95_ms']:7.2f}  p99 {r['p99_ms']:7.2f} ms  "
+              f"sql/req {r['sql_per_request']:5.2f}  {r['throughput_rps']:7.1f} req/s  "
+              f"errors {r['errors']}  rss {r['peak_rss_mb']} MB")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"wrote {args.out}")
+    tmp.cleanup()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        if failures:
+            print("REGRESSION (> {:.0%}):".format(args.threshold))
+            for line in failures:
+                print("  " + line)
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+    if any(r["errors"] for r in scenarios.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: plan a year of weeks with weeks.clone_weeks vs. per-slot ORM adds.
+
+    python bench/week_template.py --weeks 52
+"""
+import argparse, os, pathlib, sys, tempfile, time
+from datetime import date, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from sqlalchemy import func, select
+from app.models import init_db, session, SessionLocal, Week, Slot
+from app.utils import monday_of
+from app.weeks import clone_weeks, week_layout, template_layout, SLOT_CODES
+
+def build_app(db_path: str) -> Flask:
+    app = Flask(__name__)
+    app.config["DATABASE_URL"] = f"sqlite:///{db_path}"
+    app.config["TIMEZONE"] = os.getenv("TIMEZONE", "America/Los_Angeles")
+    init_db(app)
+    return app
+
+def orm_baseline(first: date, weeks: int):
+    """The init_db-style approach: one Week + 21 Slot objects per week, flushed per week."""
+    s = session()
+    try:
+        for w in range(weeks):
+            monday = first + timedelta(days=7 * w)
+            wk = Week(start_date=monday, end_date=monday + timedelta(days=6), status="draft")
+            s.add(wk); s.flush()
+            for i in range(7):
+                for code in SLOT_CODES:
+                    s.add(Slot(week_id=wk.id, date=monday + timedelta(days=i), code=code, label=code))
+            s.flush()
+        s.commit()
+    finally:
+        s.close()
+
+def templated(source_id: int, first: date, weeks: int):
+    s = session()
+    try:
+        created = clone_weeks(s, week_layout(s, source_id), first, weeks)
+        s.commit()
+        return created
+    finally:
+        s.close()
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--weeks", type=int, default=52)
+    args = ap.parse_args()
+
+    this_monday = monday_of(date.today())
+    with tempfile.TemporaryDirectory() as tmp:
+        build_app(os.path.join(tmp, "orm.db"))
+        orm_s, _ = timed(orm_baseline, this_monday + timedelta(days=7), args.weeks)
+        SessionLocal.remove()
+
+        build_app(os.path.join(tmp, "bulk.db"))
+        s = session()
+        [(source_id, _)] = clone_weeks(s, template_layout("standard"), this_monday, 1)
+        s.commit()
+        s.close()
+        first = this_monday + timedelta(days=7)
+        bulk_s, created = timed(templated, source_id, first, args.weeks)
+        rerun_s, again = timed(templated, source_id, first, args.weeks)
+        s = session()
+        slots = s.execute(select(func.count()).select_from(Slot)).scalar_one()
+        s.close()
+
+    print(f"weeks:              {args.weeks} ({slots - 21} slots cloned)")
+    print(f"ORM per-slot adds:  {orm_s * 1000:8.1f} ms")
+    print(f"clone_weeks:        {bulk_s * 1000:8.1f} ms  ({orm_s / bulk_s:.1f}x)")
+    print(f"re-run (all exist): {rerun_s * 1000:8.1f} ms  created={len(again)}")
+    if len(created) != args.weeks or again or slots - 21 != args.weeks * 21:
+        print("FAIL")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 # init_db.py
 from app import create_app
 from app.models import init_db
+from app.weeks import ensure_current_week
 
 if __name__ == "__main__":
-    app = create_app()
-    # init_db is already called inside create_app, but this makes the script idempotent and explicit.
-    init_db(app)
+    app = create_app(start_background=False)
+    # create_app skips create_all when the schema fingerprint matches; force it here
+    # so this script stays the explicit "make the DB right" step, and seed eagerly.
+    init_db(app, force=True)
+    ensure_current_week()
     print("✅ Database initialized (SQLAlchemy)")
@@ -0,0 +1,2 @@
+DELETE FROM signups WHERE id NOT IN (SELECT MIN(id) FROM signups GROUP BY slot_id, employee_id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_signups_slot_employee ON signups(slot_id, employee_id);
@@ -0,0 +1 @@
+ALTER TABLE slots ADD COLUMN is_closed INTEGER DEFAULT 0;
@@ -0,0 +1,18 @@
+CREATE TABLE IF NOT EXISTS categories (id INTEGER PRIMARY KEY,name TEXT NOT NULL UNIQUE,bit INTEGER NOT NULL UNIQUE);
+INSERT OR IGNORE INTO categories(name, bit) VALUES ('Weld',0),('Press',1),('Paint',2),('QA',3),('Mill',4);
+ALTER TABLE slots ADD COLUMN category_mask INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE employees ADD COLUMN category_mask INTEGER NOT NULL DEFAULT 0;
+-- Register any category names used in the comma strings that are not in the registry yet.
+INSERT INTO categories(name, bit)
+WITH RECURSIVE split(rest, name) AS (
+  SELECT COALESCE(categories, '') || ',', NULL FROM slots
+  UNION ALL SELECT COALESCE(categories, '') || ',', NULL FROM employees
+  UNION ALL SELECT substr(rest, instr(rest, ',') + 1), trim(substr(rest, 1, instr(rest, ',') - 1)) FROM split WHERE rest <> ''
+)
+SELECT name, (SELECT MAX(bit) FROM categories) + ROW_NUMBER() OVER (ORDER BY name)
+FROM (SELECT DISTINCT name FROM split WHERE name <> '' AND name NOT IN (SELECT name FROM categories));
+-- Backfill masks: OR of the bits whose name appears in the comma string.
+UPDATE slots SET category_mask = (SELECT COALESCE(SUM(1 << c.bit), 0) FROM categories c
+  WHERE ',' || REPLACE(COALESCE(slots.categories, ''), ', ', ',') || ',' LIKE '%,' || c.name || ',%');
+UPDATE employees SET category_mask = (SELECT COALESCE(SUM(1 << c.bit), 0) FROM categories c
+  WHERE ',' || REPLACE(COALESCE(employees.categories, ''), ', ', ',') || ',' LIKE '%,' || c.name || ',%');
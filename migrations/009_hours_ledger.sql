@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS hours_ledger (employee_id INTEGER NOT NULL REFERENCES employees(id),week_start DATE NOT NULL,hours INTEGER NOT NULL DEFAULT 0,shifts INTEGER NOT NULL DEFAULT 0,PRIMARY KEY (employee_id, week_start));
+CREATE INDEX IF NOT EXISTS ix_hours_ledger_week ON hours_ledger(week_start);
+INSERT OR REPLACE INTO hours_ledger (employee_id, week_start, hours, shifts)
+SELECT su.employee_id, w.start_date,
+       SUM(CASE sl.code WHEN 'Full 8' THEN 8 WHEN 'First 4' THEN 4 WHEN 'Last 4' THEN 4 ELSE 0 END),
+       COUNT(*)
+FROM signups su JOIN slots sl ON sl.id = su.slot_id JOIN weeks w ON w.id = sl.week_id
+GROUP BY su.employee_id, w.start_date;
@@ -0,0 +1,3 @@
+ALTER TABLE weeks ADD COLUMN allocated_at DATETIME;
+CREATE TABLE IF NOT EXISTS bumps (id INTEGER PRIMARY KEY,week_id INTEGER NOT NULL REFERENCES weeks(id),slot_id INTEGER NOT NULL REFERENCES slots(id),employee_id INTEGER NOT NULL REFERENCES employees(id),by_employee_id INTEGER REFERENCES employees(id),reason VARCHAR NOT NULL,created_at DATETIME);
+CREATE INDEX IF NOT EXISTS ix_bumps_week ON bumps(week_id);
@@ -0,0 +1 @@
+ALTER TABLE slots ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
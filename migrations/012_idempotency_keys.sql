@@ -0,0 +1,2 @@
+CREATE TABLE IF NOT EXISTS idempotency_keys (key VARCHAR NOT NULL PRIMARY KEY,fingerprint VARCHAR NOT NULL,status INTEGER NOT NULL,body TEXT NOT NULL,created_at DATETIME NOT NULL);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created ON idempotency_keys(created_at);
@@ -0,0 +1,2 @@
+CREATE TABLE IF NOT EXISTS notifications (id INTEGER PRIMARY KEY,dedup_key VARCHAR NOT NULL UNIQUE,kind VARCHAR NOT NULL,employee_id INTEGER NOT NULL REFERENCES employees(id),body VARCHAR NOT NULL,status VARCHAR NOT NULL DEFAULT 'pending',attempts INTEGER NOT NULL DEFAULT 0,next_attempt_at DATETIME NOT NULL,last_error VARCHAR,created_at DATETIME NOT NULL,sent_at DATETIME);
+CREATE INDEX IF NOT EXISTS ix_notifications_due ON notifications(status, next_attempt_at);
@@ -0,0 +1,15 @@
+ALTER TABLE slots ADD COLUMN starts_at DATETIME;
+ALTER TABLE slots ADD COLUMN ends_at DATETIME;
+ALTER TABLE signups ADD COLUMN starts_at DATETIME;
+ALTER TABLE signups ADD COLUMN ends_at DATETIME;
+-- Slot times from the code, with the overtime day starting at 06:00 (weeks.DAY_START / SLOT_TIMES).
+-- The .000000 suffix matches how SQLAlchemy stores DateTime, so values compare correctly as text.
+UPDATE slots SET
+  starts_at = datetime(date, CASE code WHEN 'Last 4' THEN '+10 hours' ELSE '+6 hours' END) || '.000000',
+  ends_at = datetime(date, CASE code WHEN 'First 4' THEN '+10 hours' ELSE '+14 hours' END) || '.000000'
+WHERE code IN ('First 4', 'Full 8', 'Last 4') AND starts_at IS NULL;
+UPDATE signups SET
+  starts_at = (SELECT starts_at FROM slots WHERE slots.id = signups.slot_id),
+  ends_at = (SELECT ends_at FROM slots WHERE slots.id = signups.slot_id)
+WHERE starts_at IS NULL;
+CREATE INDEX IF NOT EXISTS ix_signups_employee_start ON signups(employee_id, starts_at);
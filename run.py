@@ -1,8 +1,41 @@
 # run.py
-import os
-from app import create_app
+"""Start the kiosk server.
 
-if __name__ == "__main__":
+    python run.py                 # Flask development server (default)
+    python run.py --prod          # gunicorn: WEB_WORKERS x WEB_THREADS, graceful SIGTERM/SIGHUP
+
+SERVER_MODE=production in the environment selects --prod too (the systemd unit sets it).
+"""
+import argparse, os
+
+def main():
+    ap = argparse.ArgumentParser(description="Overtime kiosk server")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--prod", action="store_const", dest="mode", const="production")
+    mode.add_argument("--dev", action="store_const", dest="mode", const="dev")
+    ap.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.environ.get("PORT", "5000")))
+    ap.add_argument("--workers", type=int, help="worker processes (WEB_WORKERS, default 1)")
+    ap.add_argument("--threads", type=int, help="threads per worker (WEB_THREADS, default 16)")
+    args = ap.parse_args()
+
+    # create_app reads these, so set them first
+    if args.mode:
+        os.environ["SERVER_MODE"] = args.mode
+    if args.workers:
+        os.environ["WEB_WORKERS"] = str(args.workers)
+    if args.threads:
+        os.environ["WEB_THREADS"] = str(args.threads)
+
+    from app import create_app
     app = create_app()
-    port = int(os.environ.get("PORT", "5000"))
-    app.run(host="0.0.0.0", port=port)
+    cfg = app.config
+    if cfg["SERVER_MODE"] == "production":
+        from app.server import serve
+        serve(app, args.host, args.port, cfg["WEB_WORKERS"], cfg["WEB_THREADS"],
+              cfg["WEB_KEEPALIVE"], cfg["WEB_GRACEFUL_TIMEOUT"])
+    else:
+        app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Move closed weeks older than the retention window into per-year archive databases.
+
+    python scripts/archive.py [--after-weeks 26] [--batch 4] [--dry-run] [--vacuum]
+"""
+import argparse, os, pathlib, sys, time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text
+from app import create_app
+from app.archive import archive_dir, archive_due
+from app.models import SessionLocal
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--after-weeks", type=int, default=26, help="retention window for closed weeks")
+    ap.add_argument("--batch", type=int, default=4, help="weeks moved per transaction")
+    ap.add_argument("--dry-run", action="store_true", help="only report what would move")
+    ap.add_argument("--vacuum", action="store_true", help="VACUUM the live database afterwards to shrink the file")
+    args = ap.parse_args()
+
+    os.environ["ARCHIVE_AFTER_WEEKS"] = "0"  # this process does the work itself; no background job
+    create_app(start_background=False)
+    directory = archive_dir()
+    if directory is None:
+        sys.exit("archiving needs a file-backed SQLite DATABASE_URL")
+    engine = SessionLocal.session_factory.kw["bind"]
+    t0 = time.perf_counter()
+    moved = archive_due(engine, directory, args.after_weeks, args.batch, dry_run=args.dry_run)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"{verb} {moved['weeks']} weeks ({moved['slots']} slots, {moved['signups']} signups, "
+          f"{moved['bumps']} bumps) for years {moved['years'] or '-'} into {directory} "
+          f"in {time.perf_counter() - t0:.2f}s")
+    if args.vacuum and not args.dry_run:
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+        print("Vacuumed live database")
+
+if __name__ == "__main__":
+    main()
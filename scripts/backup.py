@@ -0,0 +1,59 @@
+"""Back up, list, rotate or restore the SQLite database.
+
+    python scripts/backup.py                  # take a backup now and rotate
+    python scripts/backup.py list
+    python scripts/backup.py restore latest   # or a file name from `list`; stop the service first
+
+Reads DATABASE_URL and the BACKUP_* settings from the environment / .env.
+"""
+import argparse, os, pathlib, sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv
+from app.backup import BackupError, backups, db_path, default_dir, restore, rotate, snapshot
+
+def main():
+    load_dotenv()
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("command", nargs="?", default="create", choices=("create", "list", "prune", "restore"))
+    ap.add_argument("backup", nargs="?", help="restore: backup file name or path, or 'latest'")
+    ap.add_argument("--dir", default=os.getenv("BACKUP_DIR", ""))
+    ap.add_argument("--keep", type=int, default=int(os.getenv("BACKUP_KEEP", "14")))
+    ap.add_argument("--max-age-days", type=float, default=float(os.getenv("BACKUP_MAX_AGE_DAYS", "60")))
+    ap.add_argument("--pages", type=int, default=int(os.getenv("BACKUP_PAGES_PER_STEP", "256")))
+    ap.add_argument("--pause-ms", type=float, default=float(os.getenv("BACKUP_STEP_PAUSE_MS", "20")))
+    args = ap.parse_args()
+
+    path = db_path(os.getenv("DATABASE_URL", "sqlite:///overtime.db"))
+    if path is None:
+        sys.exit("backups need a file-backed SQLite DATABASE_URL")
+    directory = args.dir or default_dir(path)
+
+    try:
+        if args.command == "create":
+            r = snapshot(path, directory, args.pages, args.pause_ms / 1000)
+            removed = rotate(directory, args.keep, args.max_age_days)
+            print(f"Backed up {path} -> {r['path']} ({r['bytes']} B, {r['gz_bytes']} B gzip, {r['ms']} ms); "
+                  f"removed {len(removed)} old backups")
+        elif args.command == "list":
+            for taken, p in backups(directory):
+                print(f"{taken:%Y-%m-%d %H:%M:%S}Z  {os.path.getsize(p):>10}  {os.path.basename(p)}")
+        elif args.command == "prune":
+            removed = rotate(directory, args.keep, args.max_age_days)
+            print(f"Removed {len(removed)} backups")
+        else:
+            found = backups(directory)
+            if args.backup in (None, "latest"):
+                if not found:
+                    sys.exit(f"no backups in {directory}")
+                source = found[0][1]
+            else:
+                source = args.backup if os.path.sep in args.backup else os.path.join(directory, args.backup)
+            kept = restore(source, path)
+            print(f"Restored {source} -> {path}" + (f" (previous file kept as {kept})" if kept else ""))
+    except BackupError as e:
+        sys.exit(str(e))
+
+if __name__ == "__main__":
+    main()
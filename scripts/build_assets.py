@@ -0,0 +1,54 @@
+"""Fingerprint and precompress static assets into static/dist.
+
+Every file under static/ (except dist/ itself) is copied to
+dist/<path>/<name>.<hash>.<ext>, text files also get a .gz copy at maximum
+compression, and dist/manifest.json maps each source path to its copy for
+app/assets.static_url(). Output is deterministic, so an unchanged file keeps
+its name and stays cached. Files from earlier builds are kept (a running
+server still references them until it restarts) unless --clean is given.
+
+    python scripts/build_assets.py [--clean]
+"""
+import argparse, gzip, hashlib, json, pathlib, shutil, sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+STATIC = ROOT / "static"
+DIST = STATIC / "dist"
+COMPRESS = {".css", ".js", ".svg", ".json", ".html", ".txt", ".map"}
+HASH_LEN = 10
+
+def build(clean: bool = False) -> dict:
+    if clean and DIST.exists():
+        shutil.rmtree(DIST)
+    manifest, raw, packed = {}, 0, 0
+    for src in sorted(p for p in STATIC.rglob("*") if p.is_file()):
+        rel = src.relative_to(STATIC)
+        if rel.parts[0] == DIST.name or src.name.startswith("."):
+            continue
+        data = src.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+        out = DIST / rel.parent / f"{src.stem}.{digest}{src.suffix}"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        if not out.exists():
+            out.write_bytes(data)
+        if src.suffix in COMPRESS:
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            out.with_name(out.name + ".gz").write_bytes(gz)
+            raw, packed = raw + len(data), packed + len(gz)
+        manifest[rel.as_posix()] = out.relative_to(STATIC).as_posix()
+    tmp = DIST / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    tmp.replace(DIST / "manifest.json")
+    return {"files": len(manifest), "text_bytes": raw, "gzip_bytes": packed}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clean", action="store_true", help="remove static/dist before building")
+    args = ap.parse_args()
+    stats = build(args.clean)
+    ratio = stats["gzip_bytes"] / stats["text_bytes"] if stats["text_bytes"] else 0
+    print(f"Built {stats['files']} assets into {DIST.relative_to(ROOT)} "
+          f"(text {stats['text_bytes']} B -> {stats['gzip_bytes']} B gzip, {ratio:.0%})")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,7 +27,7 @@ fi
 echo "Installing systemd unit to ${SERVICE_PATH}"
 cat > "${SERVICE_PATH}" <<EOF
 [Unit]
-Description=Overtime Kiosk (Flask / Socket.IO)
+Description=Overtime Kiosk (Flask / gunicorn)
 After=network-online.target
 Wants=network-online.target
 
@@ -38,7 +38,11 @@ WorkingDirectory=${APPDIR}
 Environment=FLASK_ENV=production
 Environment=PORT=5000
 Environment=PYTHONUNBUFFERED=1
-ExecStart=${APPDIR}/.venv/bin/python app.py
+Environment=SERVER_MODE=production
+ExecStart=${APPDIR}/.venv/bin/python run.py --prod
+ExecReload=/bin/kill -HUP \$MAINPID
+KillSignal=SIGTERM
+TimeoutStopSec=30
 Restart=always
 RestartSec=3
 
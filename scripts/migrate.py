@@ -19,6 +19,24 @@ def ensure_core_tables(conn):
         is_closed INTEGER DEFAULT 0
     );""")
 
+def apply_script(cur, sql):
+    """Run a migration statement by statement.
+
+    ADD COLUMN is skipped when the column already exists, since create_all (or
+    ensure_core_tables above) may have created it before the migration ran.
+    """
+    stmt = ""
+    for line in sql.splitlines(keepends=True):
+        stmt += line
+        if not sqlite3.complete_statement(stmt):
+            continue
+        try:
+            cur.execute(stmt)
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        stmt = ""
+
 def main():
     os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
@@ -34,7 +52,7 @@ def main():
             continue
         sql = open(path, "r", encoding="utf-8").read()
         try:
-            cur.executescript(sql)
+            apply_script(cur, sql)
             cur.execute("INSERT INTO migrations(name) VALUES (?)", (name,))
             conn.commit()
             print(f"Applied {name}")
@@ -0,0 +1,30 @@
+"""Recompute hours_ledger from the full signup history.
+
+    python scripts/rebuild_ledger.py [--batch 5000]
+"""
+import argparse, pathlib, sys, time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app import create_app
+from app.ledger import rebuild
+from app.models import session
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--batch", type=int, default=5000, help="signups read per batch")
+    args = ap.parse_args()
+
+    app = create_app(start_background=False)
+    with app.app_context():
+        s = session()
+        try:
+            t0 = time.perf_counter()
+            n = rebuild(s, batch_size=args.batch)
+            s.commit()
+        finally:
+            s.close()
+    print(f"Rebuilt hours ledger from {n} signups in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
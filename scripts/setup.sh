@@ -34,6 +34,10 @@ say "Initialize DB"
 python "$APPDIR/init_db.py"
 ok "Database ready"
 
+say "Build static assets"
+python "$APPDIR/scripts/build_assets.py"
+ok "Assets built"
+
 say "Install systemd service"
 sudo "${APPDIR}/scripts/install-service.sh"
 ok "Service installed"
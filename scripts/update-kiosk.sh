@@ -67,6 +67,10 @@ say "DB init/migrations"
 python "${APPDIR}/init_db.py"
 ok "DB ready"
 
+say "Build static assets"
+python "${APPDIR}/scripts/build_assets.py"
+ok "Assets built"
+
 if [[ $DO_SELFTEST -eq 1 ]]; then
   if [[ -x "${APPDIR}/scripts/self-test.sh" ]]; then
     "${APPDIR}/scripts/self-test.sh"
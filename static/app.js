@@ -5,9 +5,6 @@
   const slotIdInput = document.getElementById('slot_id');
   const msg = document.getElementById('signupMsg');
 
-  let roster = [];
-  fetch('/api/roster').then(r=>r.json()).then(data=>{ roster = data; });
-
   function openModal(slotId){
     slotIdInput.value = slotId;
     nameInput.value = '';
@@ -16,16 +13,24 @@
     modal.showModal();
   }
 
+  // Server-side prefix/trigram search; only the latest response is rendered.
+  let searchTimer = null, searchSeq = 0;
   function filterRoster(q){
-    q = (q||'').toLowerCase();
-    const res = roster.filter(r => r.name.toLowerCase().includes(q));
-    empSel.innerHTML = '';
-    res.forEach(r => {
-      const opt = document.createElement('option');
-      opt.value = r.id;
-      opt.textContent = r.tag;
-      empSel.appendChild(opt);
-    });
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(async ()=>{
+      const seq = ++searchSeq;
+      const res = await fetch('/api/roster/search?q=' + encodeURIComponent(q || ''));
+      if(!res.ok || seq !== searchSeq) return;
+      const matches = await res.json();
+      if(seq !== searchSeq) return;
+      empSel.innerHTML = '';
+      matches.forEach(r => {
+        const opt = document.createElement('option');
+        opt.value = r.id;
+        opt.textContent = r.tag;
+        empSel.appendChild(opt);
+      });
+    }, 120);
   }
 
   document.querySelectorAll('.btn-sign').forEach(btn => {
@@ -46,7 +51,8 @@
     const body = await res.json();
     if(res.ok){
       msg.textContent = body.was_bump ? 'Assigned (bumped prior holder).' : 'Signed up!';
-      setTimeout(()=>{ window.location.reload(); }, 600);
+      // The slot row itself is patched by live.js from /api/stream.
+      setTimeout(()=>{ modal.close(); }, 600);
     }else{
       msg.textContent = body.error || 'Error.';
     }
@@ -0,0 +1,63 @@
+// Admin panel: collect edited slot rows and save them in one POST to
+// /admin/api/slots/batch. Each row carries the version it was loaded at; rows
+// another admin saved meanwhile come back as conflicts and are refreshed.
+(function(){
+  const form = document.getElementById('slot-batch');
+  if(!form) return;
+  const msg = document.getElementById('slot-batch-msg');
+  const dirty = new Set();
+
+  function rowOf(el){ return el.closest('tr[data-slot-id]'); }
+
+  function read(row){
+    return {
+      id: Number(row.dataset.slotId),
+      version: Number(row.dataset.version),
+      label: row.querySelector('[name=label]').value,
+      capacity: Number(row.querySelector('[name=capacity]').value || 0),
+      categories: [...row.querySelector('[name=categories]').selectedOptions].map(o => o.value),
+      is_closed: row.querySelector('[name=is_closed]').checked,
+    };
+  }
+
+  function fill(row, s){
+    row.dataset.version = s.version;
+    row.querySelector('[name=label]').value = s.label;
+    row.querySelector('[name=capacity]').value = s.capacity;
+    [...row.querySelector('[name=categories]').options].forEach(o => { o.selected = s.categories.includes(o.value); });
+    row.querySelector('[name=is_closed]').checked = s.is_closed;
+  }
+
+  form.addEventListener('input', e => {
+    const row = rowOf(e.target);
+    if(row){ dirty.add(row); row.style.background = '#fffbe6'; }
+  });
+
+  form.addEventListener('submit', async e => {
+    e.preventDefault();
+    if(!dirty.size){ msg.textContent = 'No changes.'; return; }
+    const rows = new Map([...dirty].map(r => [Number(r.dataset.slotId), r]));
+    msg.textContent = 'Saving…';
+    const res = await fetch(form.action, {
+      method: 'POST', headers: {'Content-Type': 'application/json'},
+      body: JSON.stringify({changes: [...dirty].map(read)}),
+    });
+    const body = await res.json();
+    if(res.status === 400){ msg.textContent = body.error || 'Error.'; return; }
+    (body.applied || []).forEach(a => {
+      const row = rows.get(a.id);
+      row.dataset.version = a.version;
+      row.style.background = '';
+      dirty.delete(row);
+    });
+    (body.conflicts || []).forEach(c => {
+      const row = rows.get(c.id);
+      fill(row, c);
+      row.style.background = '#fdecea';
+      dirty.delete(row);
+    });
+    const n = (body.conflicts || []).length;
+    msg.textContent = `Saved ${(body.applied || []).length} slot(s).` +
+      (n ? ` ${n} changed by someone else — reloaded, re-apply your edit.` : '');
+  });
+})();
@@ -18,4 +18,103 @@ function confirmSubmit(form){
   return true;
 }
 
-window.addEventListener('load', ()=>{ startClock(); });
+function unlockSubmit(form, label){
+  const btn = form.querySelector('button[type=submit]');
+  if(btn){ delete btn.dataset.locked; btn.textContent = label; }
+}
+
+// Kiosk signups: each tap gets an Idempotency-Key and is posted as JSON, by
+// clock number (typed, or scanned by a keyboard-wedge badge reader) to
+// /api/signup/badge, or by employee_id to /api/signup. If the network drops,
+// the tap is queued in localStorage under the same key and flushed to
+// /api/signup/batch once the Pi answers again, so a retried tap can never run
+// twice.
+const signupQueue = (()=>{
+  const STORE = 'signupQueue';
+  const BATCH = 100;  // items per /api/signup/batch (routes.BATCH_LIMIT)
+  const newKey = () => (window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+  const load = () => { try { return JSON.parse(localStorage.getItem(STORE)) || []; } catch(_) { return []; } };
+  const save = q => localStorage.setItem(STORE, JSON.stringify(q));
+  let flushing = false;
+
+  function show(form, text){
+    if(!form) return;
+    let el = form.querySelector('.signup-msg');
+    if(!el){ el = document.createElement('span'); el.className = 'signup-msg muted'; form.appendChild(el); }
+    el.textContent = text;
+  }
+
+  function describe(status, body){
+    if(status >= 200 && status < 300){
+      const who = body.employee ? `${body.employee.tag}: ` : '';
+      return who + (body.was_bump ? 'Assigned (bumped prior holder).' : (body.message || 'Signed up!'));
+    }
+    return body.error || 'Error.';
+  }
+
+  // Oldest first, at most BATCH per request (the server's BATCH_LIMIT). A
+  // network error or 5xx keeps the rest queued; a 4xx (for the batch or one
+  // item) is final, so it is shown on the slot and dropped, never retried.
+  async function flush(){
+    if(flushing || !load().length) return;
+    flushing = true;
+    try {
+      let queue;
+      while((queue = load().slice(0, BATCH)).length){
+        const res = await fetch('/api/signup/batch', {
+          method: 'POST', headers: {'Content-Type': 'application/json'},
+          body: JSON.stringify({items: queue}),
+        });
+        if(res.status >= 500) return;
+        const body = await res.json().catch(() => ({}));
+        const results = res.ok ? body.results : queue.map(() => ({status: res.status, body}));
+        const done = new Set(queue.filter((q, i) => results[i].status < 500).map(q => q.idempotency_key));
+        save(load().filter(q => !done.has(q.idempotency_key)));  // keep taps queued while we were sending
+        results.forEach((r, i) => {
+          show(document.querySelector(`[data-slot="${queue[i].slot_id}"] form`), describe(r.status, r.body));
+        });
+        if(done.size < queue.length) return;  // a server error inside the batch: retry on the next flush
+      }
+    } catch(_) {
+      // still offline; the next flush retries with the same keys
+    } finally {
+      flushing = false;
+    }
+  }
+
+  async function submit(form){
+    const f = form.elements;
+    const item = {slot_id: parseInt(f.slot_id.value, 10), idempotency_key: newKey()};
+    if(f.clock_number) item.clock_number = f.clock_number.value.trim();
+    else item.employee_id = parseInt(f.employee_id.value, 10);
+    const {idempotency_key, ...payload} = item;
+    try {
+      const res = await fetch(form.getAttribute('action'), {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json', 'Idempotency-Key': idempotency_key},
+        body: JSON.stringify(payload),
+      });
+      show(form, describe(res.status, await res.json()));
+      if(res.ok) form.reset();
+    } catch(_) {
+      save([...load(), item]);
+      show(form, 'Saved — will send when the connection is back.');
+    }
+  }
+
+  return {submit, flush};
+})();
+
+document.addEventListener('submit', async e => {
+  const form = e.target;
+  if(!form.matches('form[action="/api/signup"], form[action="/api/signup/badge"]')) return;
+  e.preventDefault();
+  if(!confirmSubmit(form)) return;
+  await signupQueue.submit(form);
+  unlockSubmit(form, 'Sign up');
+});
+
+window.addEventListener('online', ()=> signupQueue.flush());
+setInterval(()=> signupQueue.flush(), 15_000);
+
+window.addEventListener('load', ()=>{ startClock(); signupQueue.flush(); });
@@ -0,0 +1,59 @@
+// Live slot updates over /api/stream (server-sent events).
+// Patches rows marked data-slot in place; a "snapshot" event carries every slot
+// and is sent on first connect or when our last event id is stale.
+(function(){
+  const root = document.getElementById('live');
+  if(!root || !window.EventSource) return;
+
+  const HINTS = {open: 'Open', full: 'Full', frozen: 'Frozen', closed: 'Closed'};
+  let lastId = root.dataset.streamId || '';
+
+  function setText(el, field, value){
+    const f = el.querySelector(`[data-field="${field}"]`);
+    if(f && f.textContent !== String(value)) f.textContent = value;
+  }
+
+  function patch(s){
+    const el = root.querySelector(`[data-slot="${s.slot_id}"]`);
+    if(!el) return false;
+    setText(el, 'taken', s.taken);
+    setText(el, 'capacity', s.capacity);
+    setText(el, 'status', HINTS[s.state]);
+    const hint = el.querySelector('[data-field="hint"]');
+    if(hint){ hint.textContent = HINTS[s.state]; hint.hidden = s.state === 'open'; }
+    el.querySelectorAll('[data-open-only]').forEach(f => { f.hidden = s.state !== 'open'; });
+    const holder = el.querySelector('[data-field="holder"]');
+    if(holder && holder.dataset.value !== (s.holder || '')){
+      holder.dataset.value = s.holder || '';
+      holder.innerHTML = '';
+      const tag = document.createElement(s.holder ? 'span' : 'em');
+      if(s.holder) tag.className = 'name-tag';
+      tag.textContent = s.holder || 'Open';
+      holder.appendChild(tag);
+    }
+    el.dataset.state = s.state;
+    el.classList.toggle('locked', s.state === 'closed' || s.state === 'frozen');
+    return true;
+  }
+
+  function connect(){
+    const es = new EventSource('/api/stream?view=' + encodeURIComponent(root.dataset.view || 'wallboard')
+                                + '&since=' + encodeURIComponent(lastId));
+    const apply = (ev) => {
+      lastId = ev.lastEventId || lastId;
+      const body = JSON.parse(ev.data);
+      const missing = body.slots.filter(s => !patch(s)).length;
+      // The stream watches the same weeks as this page, so a snapshot that does
+      // not line up with our rows means the layout changed (new week): re-render.
+      const rows = root.querySelectorAll('[data-slot]').length;
+      if(ev.type === 'snapshot' && (missing || rows !== body.slots.length)) window.location.reload();
+    };
+    es.addEventListener('snapshot', apply);
+    es.addEventListener('delta', apply);
+    es.onerror = () => {
+      // Let EventSource retry on its own; if it gave up, reconnect with our last id.
+      if(es.readyState === EventSource.CLOSED) setTimeout(connect, 3000);
+    };
+  }
+  connect();
+})();
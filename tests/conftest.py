@@ -0,0 +1,75 @@
+# tests/conftest.py
+"""An app on a fresh SQLite file per test, plus a published week well in the future."""
+import pathlib, sys
+from datetime import date, timedelta
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app import categories, roster, weeks
+from app.grid import bump_week
+from app.models import session, dispose_engines, Slot, Employee
+from app.utils import monday_of
+
+ENV = {"NOTIFY_TRANSPORT": "none", "AUTO_ALLOCATE": "false", "ARCHIVE_AFTER_WEEKS": "0",
+       "BACKUP_INTERVAL_HOURS": "0", "WEEKLY_HOURS_CAP": "", "SEED_MODE": "lazy", "SERVER_MODE": "dev"}
+
+def _drop_caches():
+    # Ids restart at 1 in every test database, so nothing cached may carry over.
+    bump_week()
+    roster.invalidate()
+    categories.invalidate()
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    for name, value in ENV.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(weeks, "_seeded_monday", None)
+    from app import create_app
+    app = create_app(start_background=False)
+    _drop_caches()
+    with app.app_context():
+        yield app
+    _drop_caches()
+    dispose_engines()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def admin(client):
+    """The test client, logged in to the admin panel."""
+    with client.session_transaction() as sess:
+        sess["admin_ok"] = True
+    return client
+
+@pytest.fixture
+def week(app):
+    """A published standard week a year out: {"id", "start", "slots": {(day offset, code): slot_id}}."""
+    start = monday_of(date.today()) + timedelta(weeks=52)
+    s = session()
+    [(week_id, _)] = weeks.clone_weeks(s, weeks.template_layout("standard"), start, 1, status="published")
+    s.query(Slot).filter(Slot.week_id == week_id).update({Slot.capacity: 2})
+    slots = {((d - start).days, code): sid
+             for sid, d, code in s.query(Slot.id, Slot.date, Slot.code).filter(Slot.week_id == week_id)}
+    s.commit()
+    return {"id": week_id, "start": start, "slots": slots}
+
+@pytest.fixture
+def make_employee(app):
+    """make_employee(rank, **fields) -> employee id; clock numbers are handed out in order."""
+    made = []
+
+    def make(rank: int = 1, **fields):
+        s = session()
+        e = Employee(first_name="Emp", last_name=f"No{len(made) + 1}", clock_number=f"{1000 + len(made)}",
+                     seniority_rank=rank, **fields)
+        s.add(e)
+        s.commit()
+        made.append(e.id)
+        return e.id
+
+    return make
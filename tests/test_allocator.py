@@ -0,0 +1,114 @@
+# tests/test_allocator.py
+from datetime import timedelta
+import pytest
+from app.allocator import allocate_week, plan
+from app.models import session, Bump, Signup, Slot, HoursLedger, Week
+from app.services import assign_slot
+from app.weeks import slot_interval
+
+SAT = 5
+
+def _sign(week, emp, code, day=SAT):
+    s = session()
+    starts_at, ends_at = slot_interval(week["start"] + timedelta(days=day), code)
+    s.add(Signup(slot_id=week["slots"][day, code], employee_id=emp, starts_at=starts_at, ends_at=ends_at))
+    s.commit()
+
+def _holders(week, order="seniority"):
+    return {(a["code"], a["date"]): a["employee_id"] for a in plan(session(), week["id"], order)}
+
+def test_most_senior_signup_holds(week, make_employee):
+    junior, senior = make_employee(rank=5), make_employee(rank=1)
+    _sign(week, junior, "Full 8")
+    _sign(week, senior, "Full 8")
+    [a] = plan(session(), week["id"])
+    assert a["employee_id"] == senior and a["previous_id"] is None
+
+def test_equalization_prefers_fewer_prior_hours(week, make_employee):
+    busy, rested = make_employee(rank=1), make_employee(rank=2)
+    s = session()
+    s.add(HoursLedger(employee_id=busy, week_start=week["start"] - timedelta(weeks=1), hours=16, shifts=2))
+    s.commit()
+    _sign(week, busy, "Full 8")
+    _sign(week, rested, "Full 8")
+    assert list(_holders(week, "seniority").values()) == [busy]
+    assert list(_holders(week, "equalization").values()) == [rested]
+
+def test_same_day_halves_can_both_be_held(week, make_employee):
+    emp = make_employee()
+    for code in ("First 4", "Last 4", "Full 8"):
+        _sign(week, emp, code)
+    held = _holders(week)
+    assert sorted(code for code, _ in held) == ["First 4", "Last 4"]
+
+def test_overlapping_win_goes_to_the_next_candidate(week, make_employee):
+    senior, junior = make_employee(rank=1), make_employee(rank=2)
+    _sign(week, senior, "Full 8")
+    _sign(week, senior, "First 4")
+    _sign(week, junior, "First 4")
+    held = _holders(week)
+    day = (week["start"] + timedelta(days=SAT)).isoformat()
+    assert held[("Full 8", day)] == senior
+    assert held[("First 4", day)] == junior
+
+def test_weekdays_are_left_alone_by_default(week, make_employee):
+    emp = make_employee()
+    _sign(week, emp, "Full 8", day=1)
+    assert plan(session(), week["id"]) == []
+    assert len(plan(session(), week["id"], weekend_only=False)) == 1
+
+def test_unknown_order_is_rejected(week):
+    with pytest.raises(ValueError):
+        plan(session(), week["id"], "lottery")
+
+def test_freeze_allocation_runs_once(week, make_employee):
+    emp = make_employee()
+    _sign(week, emp, "Full 8")
+    report = allocate_week(week["id"], once=True)
+    assert report["changed"] == 1
+    assert allocate_week(week["id"], once=True) is None
+    assert session().get(Week, week["id"]).allocated_at is not None
+
+@pytest.mark.parametrize("unranked", [None, 0])
+def test_unranked_employees_come_last(week, make_employee, unranked):
+    newcomer, ranked = make_employee(rank=unranked), make_employee(rank=40)
+    _sign(week, newcomer, "Full 8")
+    _sign(week, ranked, "Full 8")
+    assert list(_holders(week).values()) == [ranked]
+
+def test_unranked_signup_does_not_bump_a_ranked_holder(week, make_employee):
+    slot = week["slots"][SAT, "Full 8"]
+    ranked, newcomer = make_employee(rank=40), make_employee(rank=None)
+    assert assign_slot(slot, ranked)[0]["was_bump"] is False
+    assert assign_slot(slot, newcomer)[0]["was_bump"] is False
+    assert session().get(Slot, slot).assigned_employee_id == ranked
+
+def test_ranked_signup_bumps_an_unranked_holder(week, make_employee):
+    slot = week["slots"][SAT, "Full 8"]
+    newcomer, ranked = make_employee(rank=None), make_employee(rank=40)
+    assign_slot(slot, newcomer)
+    assert assign_slot(slot, ranked)[0]["was_bump"] is True
+    assert session().get(Slot, slot).assigned_employee_id == ranked
+
+def test_allocation_writes_holders_and_bumps(week, make_employee):
+    slot = week["slots"][SAT, "Full 8"]
+    junior, senior = make_employee(rank=5), make_employee(rank=1)
+    s = session()
+    s.get(Slot, slot).assigned_employee_id = junior
+    s.commit()
+    _sign(week, junior, "Full 8")
+    _sign(week, senior, "Full 8")
+    assert allocate_week(week["id"], dry_run=True)["changed"] == 1
+    assert session().get(Slot, slot).assigned_employee_id == junior
+    report = allocate_week(week["id"])
+    assert report["bumped"] == [{"slot_id": slot, "employee_id": junior, "by_employee_id": senior}]
+    s = session()
+    assert s.get(Slot, slot).assigned_employee_id == senior
+    assert s.query(Bump.employee_id, Bump.reason).all() == [(junior, "allocation")]
+
+def test_allocate_endpoint(admin, week, make_employee):
+    _sign(week, make_employee(), "Full 8")
+    resp = admin.post(f"/admin/weeks/{week['id']}/allocate", json={"dry_run": True})
+    assert resp.status_code == 200 and len(resp.get_json()["assignments"]) == 1
+    assert admin.post(f"/admin/weeks/{week['id']}/allocate", json={"order": "lottery"}).status_code == 400
+    assert admin.post("/admin/weeks/999/allocate", json={}).status_code == 400
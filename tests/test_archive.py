@@ -0,0 +1,66 @@
+# tests/test_archive.py
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from app import archive
+from app.models import session, SessionLocal, Week, Slot, Signup, Bump, Employee
+from app.utils import monday_of
+from app.weeks import clone_weeks, template_layout
+
+TODAY = date(2030, 6, 3)
+
+def _closed_weeks(n: int, first: date):
+    """n consecutive closed weeks from `first`, each slot with one signup by a fresh employee: [week_id]."""
+    s = session()
+    created = clone_weeks(s, template_layout("weekdays"), first, n, status="closed")
+    emp = Employee(first_name="Old", last_name="Timer", clock_number="7777")
+    s.add(emp)
+    s.flush()
+    for week_id, _ in created:
+        for slot_id in s.execute(select(Slot.id).where(Slot.week_id == week_id)).scalars():
+            s.add(Signup(slot_id=slot_id, employee_id=emp.id))
+    s.commit()
+    return [w for w, _ in created], emp.id
+
+def _engine():
+    return SessionLocal.session_factory.kw["bind"]
+
+def test_weeks_holding_the_highest_ids_stay_live(app):
+    weeks, emp = _closed_weeks(4, monday_of(TODAY) - timedelta(weeks=60))
+    s = session()
+    # The newest signup and bump land in the oldest weeks, so those weeks guard the id sequences.
+    slot0 = s.execute(select(Slot.id).where(Slot.week_id == weeks[0])).scalars().first()
+    slot1 = s.execute(select(Slot.id).where(Slot.week_id == weeks[1])).scalars().first()
+    s.add(Bump(week_id=weeks[0], slot_id=slot0, employee_id=emp, reason="signup"))
+    s.flush()
+    other = Employee(first_name="New", last_name="Hire", clock_number="8888")
+    s.add(other)
+    s.flush()
+    s.add(Signup(slot_id=slot1, employee_id=other.id))
+    s.commit()
+    due = [w for w, _ in archive.due_weeks(s, TODAY, 26)]
+    assert weeks[0] not in due          # highest bump id
+    assert weeks[1] not in due          # highest signup id
+    assert weeks[3] not in due          # highest week and slot id
+    assert due == [weeks[2]]
+
+def test_archive_moves_due_weeks_and_history_still_sees_them(app):
+    weeks, _ = _closed_weeks(3, monday_of(TODAY) - timedelta(weeks=60))
+    s = session()
+    live_signups = s.execute(select(func.count(Signup.id))).scalar()
+    s.close()
+    moved = archive.archive_due(_engine(), archive.archive_dir(), 26, today=TODAY)
+    assert moved["weeks"] == 2 and moved["signups"] == 30    # the newest week guards the ids
+    s = session()
+    assert s.get(Week, weeks[0]) is None and s.get(Week, weeks[2]) is not None
+    assert s.execute(select(func.count(Signup.id))).scalar() == live_signups - 30
+    s.close()
+    h = archive.history_session()
+    try:
+        assert h.execute(select(func.count()).select_from(archive.history("signups"))).scalar() == live_signups
+        assert {r[0] for r in h.execute(select(archive.history("weeks").c.id))} >= set(weeks)
+    finally:
+        h.close()
+
+def test_open_and_recent_weeks_are_not_due(app):
+    _closed_weeks(2, monday_of(TODAY) - timedelta(weeks=4))
+    assert archive.due_weeks(session(), TODAY, 26) == []
@@ -0,0 +1,55 @@
+# tests/test_assets.py
+import gzip, json, pathlib, sys
+import pytest
+from flask import Flask
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+import build_assets
+from app.assets import IMMUTABLE, init_assets, static_url
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """A static/ folder with a script and an image, built into static/dist/, served by a bare app."""
+    static = tmp_path / "static"
+    (static / "js").mkdir(parents=True)
+    (static / "js" / "app.js").write_text("console.log('hi');\n" * 50)
+    (static / "logo.png").write_bytes(b"\x89PNG fake")
+    monkeypatch.setattr(build_assets, "STATIC", static)
+    monkeypatch.setattr(build_assets, "DIST", static / "dist")
+    build_assets.build()
+    app = Flask(__name__, static_folder=str(static))
+    init_assets(app)
+    return app, json.loads((static / "dist" / "manifest.json").read_text())
+
+def test_build_is_deterministic(built):
+    app, manifest = built
+    assert sorted(manifest) == ["js/app.js", "logo.png"]
+    assert manifest["js/app.js"].startswith("dist/js/app.") and manifest["js/app.js"].endswith(".js")
+    assert not (pathlib.Path(app.static_folder) / (manifest["logo.png"] + ".gz")).exists()
+    build_assets.build()
+    assert json.loads((pathlib.Path(app.static_folder) / "dist" / "manifest.json").read_text()) == manifest
+
+def test_static_url_points_at_the_fingerprinted_copy(built):
+    app, manifest = built
+    with app.test_request_context():
+        assert static_url("js/app.js") == "/static/" + manifest["js/app.js"]
+        assert static_url("missing.css") == "/static/missing.css"
+
+def test_gzip_is_served_when_accepted(built):
+    app, manifest = built
+    client, url = app.test_client(), "/static/" + manifest["js/app.js"]
+    resp = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "gzip" and resp.mimetype in ("text/javascript", "application/javascript")
+    assert gzip.decompress(resp.data).startswith(b"console.log")
+    assert resp.headers["Cache-Control"] == IMMUTABLE and "Accept-Encoding" in resp.headers["Vary"]
+    for refused in ("gzip;q=0", "identity"):
+        plain = client.get(url, headers={"Accept-Encoding": refused})
+        assert "Content-Encoding" not in plain.headers and plain.data.startswith(b"console.log")
+
+def test_uncompressed_and_source_files(built):
+    app, manifest = built
+    client = app.test_client()
+    image = client.get("/static/" + manifest["logo.png"], headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in image.headers and image.headers["Cache-Control"] == IMMUTABLE
+    source = client.get("/static/js/app.js")
+    assert source.status_code == 200 and source.headers.get("Cache-Control") != IMMUTABLE
@@ -0,0 +1,76 @@
+# tests/test_backup.py
+import fcntl, gzip, os, sqlite3
+from datetime import datetime, timedelta
+import pytest
+from app.backup import PREFIX, STAMP, SUFFIX, BackupError, backups, restore, rotate, run_once, snapshot
+
+CONFIG = {"BACKUP_DIR": "", "BACKUP_INTERVAL_HOURS": 24, "BACKUP_PAGES_PER_STEP": 2, "BACKUP_STEP_PAUSE_MS": 0,
+          "BACKUP_KEEP": 3, "BACKUP_MAX_AGE_DAYS": 60}
+
+def _db(path, rows=200):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [("x" * 100,)] * rows)
+    conn.commit()
+    return conn   # left open, like the running app, so the WAL stays in use
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT count(*) FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+def _fake(directory, taken):
+    path = directory / f"{PREFIX}{taken.strftime(STAMP)}{SUFFIX}"
+    path.write_bytes(b"")
+    return str(path)
+
+def test_snapshot_and_restore(tmp_path):
+    live, directory = str(tmp_path / "overtime.db"), tmp_path / "backups"
+    conn = _db(live)
+    result = snapshot(live, str(directory), pages=2, pause=0)
+    assert result["pages"] > 2 and result["gz_bytes"] < result["bytes"]
+    assert [p for _, p in backups(str(directory))] == [result["path"]]
+    assert sorted(os.listdir(directory)) == [".lock", os.path.basename(result["path"])]
+
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+    kept = restore(result["path"], live)
+    assert _count(live) == 200 and _count(kept) == 0
+    assert not os.path.exists(live + "-wal")
+
+def test_bad_backup_leaves_the_live_file_alone(tmp_path):
+    live = str(tmp_path / "overtime.db")
+    _db(live, rows=5).close()
+    bad = tmp_path / "bad.db.gz"
+    bad.write_bytes(gzip.compress(b"not a database" * 100))
+    with pytest.raises(BackupError):
+        restore(str(bad), live)
+    assert _count(live) == 5 and sorted(os.listdir(tmp_path)) == ["bad.db.gz", "overtime.db"]
+
+def test_one_backup_at_a_time(tmp_path):
+    live, directory = str(tmp_path / "overtime.db"), tmp_path / "backups"
+    _db(live, rows=5).close()
+    directory.mkdir()
+    with open(directory / ".lock", "w") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        with pytest.raises(BackupError):
+            snapshot(live, str(directory))
+
+def test_rotate_keeps_the_newest(tmp_path):
+    now = datetime(2030, 6, 1)
+    paths = [_fake(tmp_path, now - timedelta(days=d)) for d in (1, 2, 3, 90)]
+    assert rotate(str(tmp_path), keep=2, max_age_days=60, now=now) == paths[2:]
+    assert rotate(str(tmp_path), keep=5, max_age_days=0, now=now) == [paths[1]]
+    assert [p for _, p in backups(str(tmp_path))] == [paths[0]]
+
+def test_run_once_waits_for_the_interval(tmp_path):
+    live = str(tmp_path / "overtime.db")
+    _db(live, rows=5).close()
+    config = dict(CONFIG, BACKUP_DIR=str(tmp_path / "backups"))
+    first = run_once(config, live)
+    assert first and first["removed"] == []
+    assert run_once(config, live) is None
@@ -0,0 +1,50 @@
+# tests/test_badge.py
+from sqlalchemy import func, select
+from app import roster
+from app.models import session, Employee, Signup
+
+SAT = 5
+
+def _badge(client, slot, clock, **headers):
+    return client.post("/api/signup/badge", json={"slot_id": slot, "clock_number": clock}, headers=headers)
+
+def _signups():
+    return session().execute(select(func.count(Signup.id))).scalar()
+
+def test_clock_numbers_resolve_padded_and_trimmed(client, week, make_employee):
+    emp = make_employee()
+    s = session()
+    s.get(Employee, emp).clock_number = "0042"
+    s.commit()
+    roster.invalidate()
+    resp = _badge(client, week["slots"][SAT, "Full 8"], " 42\n")
+    assert resp.status_code == 200
+    assert resp.get_json()["employee"] == {"id": emp, "tag": "E. No1 - 0042"}
+    assert session().execute(select(Signup.employee_id)).scalar() == emp
+
+def test_unknown_clock_and_bad_slot(client, week, make_employee):
+    make_employee()
+    assert _badge(client, week["slots"][SAT, "Full 8"], "9999").status_code == 404
+    assert _badge(client, week["slots"][SAT, "Full 8"], None).status_code == 404
+    assert _badge(client, "sat", "1000").status_code == 400
+    assert _signups() == 0
+
+def test_new_employee_resolves_after_invalidation(admin, week, make_employee):
+    make_employee()
+    assert _badge(admin, week["slots"][SAT, "Full 8"], "4444").status_code == 404   # index built without them
+    admin.post("/admin/employees", data={"name": "Zed Zulu", "clock_number": "4444"})
+    assert _badge(admin, week["slots"][SAT, "Full 8"], "4444").status_code == 200
+
+def test_badge_honours_idempotency_and_batches(client, week, make_employee):
+    make_employee()
+    slot = week["slots"][SAT, "First 4"]
+    first = _badge(client, slot, "1000", **{"Idempotency-Key": "badge-1"})
+    again = _badge(client, slot, "1000", **{"Idempotency-Key": "badge-1"})
+    assert again.headers["Idempotent-Replayed"] == "true" and again.get_json() == first.get_json()
+    results = client.post("/api/signup/batch", json={"items": [
+        {"slot_id": week["slots"][SAT, "Last 4"], "clock_number": "1000"},
+        {"slot_id": week["slots"][SAT, "Last 4"], "clock_number": "0000"},
+    ]}).get_json()["results"]
+    assert [r["status"] for r in results] == [200, 404]
+    assert results[0]["body"]["employee"]["tag"].endswith("1000")
+    assert _signups() == 2
@@ -0,0 +1,38 @@
+# tests/test_bench.py
+import pathlib, sqlite3, sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "bench"))   # the bench scripts import each other as siblings
+from datagen import generate
+from suite import compare, percentile
+from app import archive
+
+def _dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [conn.execute(f"SELECT * FROM {t} ORDER BY id").fetchall()
+                for t in ("employees", "weeks", "slots", "signups")]
+    finally:
+        conn.close()
+
+def test_datagen_is_seeded(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "_history", None)   # left over from an earlier test's app; datagen runs without one
+    counts = generate(str(tmp_path / "a.db"), employees=30, weeks=16, signups=400, seed=7)
+    generate(str(tmp_path / "b.db"), employees=30, weeks=16, signups=400, seed=7)
+    assert counts["signups"] == 400 and counts["slots"] == 16 * 7 * 3
+    a = _dump(tmp_path / "a.db")
+    assert a == _dump(tmp_path / "b.db")
+    assert [len(rows) for rows in a] == [30, 16, counts["slots"], 400]
+    conn = sqlite3.connect(tmp_path / "a.db")
+    assert conn.execute("SELECT sum(shifts) FROM hours_ledger").fetchone()[0] == 400
+    conn.close()
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (50, 95, 100)
+    assert percentile([], 99) == 0.0
+
+def test_compare_flags_regressions_past_the_threshold():
+    base = {"scenarios": {"grid": {"p95_ms": 10.0, "sql_per_request": 2.0}}}
+    cur = {"scenarios": {"grid": {"p95_ms": 11.5, "sql_per_request": 2.0}, "new": {"p95_ms": 1, "sql_per_request": 1}}}
+    assert compare(cur, base, 0.2) == []
+    assert compare(cur, base, 0.1) == ["grid.p95_ms: 10.0 -> 11.5"]
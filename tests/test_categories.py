@@ -0,0 +1,38 @@
+# tests/test_categories.py
+from app import categories
+from app.models import session, Slot
+from app.services import assign_slot, eligible_employees
+
+TUE = 1
+
+def test_default_categories_own_the_first_bits(app):
+    assert categories.all_names()[:5] == categories.DEFAULT_CATEGORIES
+    assert categories.mask_of(["Weld", "Paint"]) == 0b101
+    assert categories.names_of(0b101) == ["Weld", "Paint"]
+    assert categories.mask_of(["Nope"]) == 0
+
+def test_new_category_is_visible_only_after_commit(app):
+    s = session()
+    mask = categories.register(s, ["Forklift"])
+    assert mask == 1 << len(categories.DEFAULT_CATEGORIES)
+    assert "Forklift" not in categories.all_names()    # a read before the commit cannot cache it stale
+    s.commit()
+    assert "Forklift" in categories.all_names()
+
+def test_rolled_back_registration_leaves_the_registry(app):
+    s = session()
+    categories.register(s, ["Crane"])
+    s.rollback()
+    assert "Crane" not in categories.all_names()
+    assert categories.register(s, ["Crane"]) == 1 << len(categories.DEFAULT_CATEGORIES)   # bit not burnt
+
+def test_slot_category_gates_signup(week, make_employee):
+    slot = week["slots"][TUE, "Full 8"]
+    s = session()
+    s.get(Slot, slot).category_mask = categories.mask_of(["QA"])
+    s.commit()
+    qa, welder = make_employee(category_mask=categories.mask_of(["QA", "Mill"])), make_employee(
+        category_mask=categories.mask_of(["Weld"]))
+    assert [e.id for e in eligible_employees(slot)] == [qa]
+    assert assign_slot(slot, welder) == ({"error": "Employee not in required category"}, 400)
+    assert assign_slot(slot, qa)[1] == 200
@@ -0,0 +1,30 @@
+# tests/test_db.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.models import session, read_session, Employee, SessionLocal
+
+def _pragma(s, name):
+    return s.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_tuned_profile(app):
+    s = session()
+    assert _pragma(s, "journal_mode") == "wal"
+    assert _pragma(s, "busy_timeout") == 5000
+    assert _pragma(s, "foreign_keys") == 1
+
+def test_reader_is_query_only(app):
+    r = read_session()
+    try:
+        assert _pragma(r, "query_only") == 1 and _pragma(r, "busy_timeout") == 5000
+        with pytest.raises(OperationalError):
+            r.execute(text("DELETE FROM employees"))
+    finally:
+        r.close()
+
+def test_app_context_closes_its_session(app):
+    with app.app_context():
+        session().add(Employee(first_name="Left", last_name="Open", clock_number="0001"))
+        assert SessionLocal.registry.has()
+    assert not SessionLocal.registry.has()
+    assert session().query(Employee).count() == 0
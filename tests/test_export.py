@@ -0,0 +1,41 @@
+# tests/test_export.py
+import csv, io
+from datetime import timedelta
+from app import export
+from app.services import assign_slot
+
+TUE, SAT = 1, 5
+
+def _rows(resp):
+    return list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+
+def test_signups_export(admin, week, make_employee):
+    emp = make_employee()
+    assign_slot(week["slots"][TUE, "Full 8"], emp)
+    assign_slot(week["slots"][SAT, "First 4"], emp)
+    resp = admin.get("/admin/export/signups.csv")
+    assert resp.status_code == 200 and resp.mimetype == "text/csv"
+    rows = _rows(resp)
+    assert [(r["date"], r["code"], r["clock_number"]) for r in rows] == [
+        ((week["start"] + timedelta(days=TUE)).isoformat(), "Full 8", "1000"),
+        ((week["start"] + timedelta(days=SAT)).isoformat(), "First 4", "1000")]
+    day = (week["start"] + timedelta(days=SAT)).isoformat()
+    assert [r["code"] for r in _rows(admin.get(f"/admin/export/signups.csv?from={day}"))] == ["First 4"]
+
+def test_slots_export_streams_in_chunks(admin, week, monkeypatch):
+    monkeypatch.setattr(export, "BATCH", 4)
+    chunks = list(export.slots_csv())
+    assert len(chunks) > 2
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(rows) == len(week["slots"])
+    assert {r["capacity"] for r in rows} == {"2"} and {r["fill_rate"] for r in rows} == {"0.00"}
+
+def test_weeks_export(admin, week):
+    [row] = [r for r in _rows(admin.get("/admin/export/weeks.csv")) if r["week_id"] == str(week["id"])]
+    assert row["slots"] == str(len(week["slots"])) and row["capacity"] == str(2 * len(week["slots"]))
+
+def test_export_errors_and_revalidation(admin, week):
+    assert admin.get("/admin/export/payroll.csv").status_code == 404
+    assert admin.get("/admin/export/weeks.csv?from=monday").status_code == 400
+    modified = admin.get("/admin/export/weeks.csv").headers["Last-Modified"]
+    assert admin.get("/admin/export/weeks.csv", headers={"If-Modified-Since": modified}).status_code == 304
@@ -0,0 +1,33 @@
+# tests/test_grid.py
+from datetime import timedelta
+from app import grid
+from app.models import session
+from app.services import assign_slot
+from app.weeks import clone_weeks, template_layout
+
+TUE = 1
+
+def _taken(rows, slot_id):
+    return next(r["taken"] for day in rows for r in day["rows"] if r["slot_id"] == slot_id)
+
+def test_grid_is_cached_until_the_week_is_bumped(week, make_employee):
+    first = grid.week_grid(week["id"])
+    assert grid.week_grid(week["id"]) is first
+    slot = week["slots"][TUE, "Full 8"]
+    assert assign_slot(slot, make_employee())[1] == 200   # bumps the week after its commit
+    again = grid.week_grid(week["id"])
+    assert again is not first
+    assert _taken(first, slot) == 0 and _taken(again, slot) == 1
+
+def test_cache_keeps_at_most_max_grids_weeks(week):
+    s = session()
+    extra = clone_weeks(s, template_layout("weekdays"), week["start"] + timedelta(weeks=1), grid.MAX_GRIDS + 2,
+                        status="published")
+    s.commit()
+    ids = [week["id"]] + [w for w, _ in extra]
+    for week_id in ids:
+        grid.week_grid(week_id)
+    assert len(grid._grids) == grid.MAX_GRIDS
+    assert list(grid._grids) == ids[-grid.MAX_GRIDS:]   # the oldest builds were dropped
+    grid.week_grid(ids[0])                              # rebuilt, now the most recent
+    assert list(grid._grids)[-1] == ids[0]
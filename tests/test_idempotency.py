@@ -0,0 +1,81 @@
+# tests/test_idempotency.py
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, update
+from app.models import session, Signup, IdempotencyKey
+
+WED = 2
+
+def _signups():
+    return session().execute(select(func.count(Signup.id))).scalar()
+
+def _batch(client, *items):
+    return client.post("/api/signup/batch", json={"items": list(items)})
+
+def test_idempotent_replay(client, week, make_employee):
+    emp, slot = make_employee(), week["slots"][WED, "Full 8"]
+    payload, headers = {"slot_id": slot, "employee_id": emp}, {"Idempotency-Key": "tap-1"}
+    first = client.post("/api/signup", json=payload, headers=headers)
+    again = client.post("/api/signup", json=payload, headers=headers)
+    assert first.status_code == again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.get_json() == first.get_json()
+    assert _signups() == 1
+    assert session().execute(select(func.count()).select_from(IdempotencyKey)).scalar() == 1
+
+def test_idempotency_key_reused_for_another_signup(client, week, make_employee):
+    emp, headers = make_employee(), {"Idempotency-Key": "tap-2"}
+    client.post("/api/signup", json={"slot_id": week["slots"][WED, "First 4"], "employee_id": emp}, headers=headers)
+    resp = client.post("/api/signup", json={"slot_id": week["slots"][WED, "Last 4"], "employee_id": emp},
+                       headers=headers)
+    assert resp.status_code == 422
+    assert _signups() == 1
+
+def test_expired_key_runs_again(app, client, week, make_employee):
+    emp, slot = make_employee(), week["slots"][WED, "Full 8"]
+    payload, headers = {"slot_id": slot, "employee_id": emp}, {"Idempotency-Key": "tap-3"}
+    client.post("/api/signup", json=payload, headers=headers)
+    s = session()
+    s.execute(update(IdempotencyKey).values(
+        created_at=datetime.utcnow() - timedelta(hours=app.config["IDEMPOTENCY_TTL_HOURS"] + 1)))
+    s.commit()
+    again = client.post("/api/signup", json=payload, headers=headers)
+    assert "Idempotent-Replayed" not in again.headers
+    assert again.get_json()["message"] == "Already signed up"
+
+def test_bad_key_is_refused(client, week, make_employee):
+    resp = client.post("/api/signup", json={"slot_id": week["slots"][WED, "Full 8"], "employee_id": make_employee()},
+                       headers={"Idempotency-Key": "k" * 201})
+    assert resp.status_code == 400 and _signups() == 0
+
+def test_batch_results_line_up_with_items(client, week, make_employee):
+    a, b = make_employee(), make_employee()
+    full8, first4 = week["slots"][WED, "Full 8"], week["slots"][WED, "First 4"]
+    resp = _batch(client,
+                  {"slot_id": full8, "employee_id": a, "idempotency_key": "q-1"},
+                  {"slot_id": full8, "employee_id": a, "idempotency_key": "q-1"},
+                  {"slot_id": first4, "employee_id": a},
+                  {"slot_id": "x", "employee_id": b},
+                  {"slot_id": full8, "employee_id": b, "idempotency_key": ""},
+                  {"slot_id": full8, "employee_id": b})
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [(r["status"], r["replayed"]) for r in results] == [
+        (200, False), (200, True), (400, False), (400, False), (400, False), (200, False)]
+    assert results[2]["body"]["error"].startswith("Overlaps your Full 8 shift")
+    assert _signups() == 2
+
+def test_batch_retry_replays_stored_results(client, week, make_employee):
+    emp, slot = make_employee(), week["slots"][WED, "Full 8"]
+    item = {"slot_id": slot, "employee_id": emp, "idempotency_key": "q-2"}
+    first = _batch(client, item).get_json()["results"]
+    again = _batch(client, item).get_json()["results"]
+    assert again[0]["replayed"] and again[0]["body"] == first[0]["body"]
+    single = client.post("/api/signup", json={"slot_id": slot, "employee_id": emp}, headers={"Idempotency-Key": "q-2"})
+    assert single.headers["Idempotent-Replayed"] == "true"
+    assert _signups() == 1
+
+def test_batch_bounds(client, week, make_employee):
+    assert _batch(client).status_code == 400
+    item = {"slot_id": week["slots"][WED, "Full 8"], "employee_id": make_employee()}
+    assert _batch(client, *[item] * 101).status_code == 400
+    assert _signups() == 0
@@ -0,0 +1,52 @@
+# tests/test_importer.py
+from sqlalchemy import select
+from app.importer import validate
+from app.models import session, Employee
+
+CSV = """Name,Clock_Number,Phone,Categories,Shift_Type,Seniority_Rank
+Ada Lovelace,0101,555-0101,Weld;Paint,day,3
+Grace Hopper,0102,,,ROTATING,
+"""
+
+def _employees():
+    return {e.clock_number: e for e in session().execute(select(Employee)).scalars()}
+
+def _post(client, text, **query):
+    return client.post("/admin/employees/import", data=text.encode(), content_type="text/csv",
+                       query_string=query)
+
+def test_validate_reports_each_bad_row():
+    rows, errors, present = validate(CSV + "Solo,0103,,,DAY,1\nAlan Turing,101,,,DAY,x\n"
+                                     "Alan Turing,0101,,,NIGHT,0\n")
+    assert [r["clock_number"] for r in rows] == ["0101", "0102"]
+    assert rows[0]["cat_names"] == ["Weld", "Paint"] and rows[1]["seniority_rank"] is None
+    assert [(e["row"], e["error"]) for e in errors] == [
+        (4, "first and last name required"),
+        (5, "clock number must be 4 digits; seniority_rank must be a positive integer"),
+        (6, "duplicate clock number (also on row 2); shift_type must be one of DAY, ROTATING; "
+            "seniority_rank must be a positive integer")]
+    assert "seniority_rank" in present
+
+def test_header_is_required():
+    assert validate("who,when\nAda,now\n")[1][0]["row"] == 1
+
+def test_import_inserts_then_updates(admin):
+    report = _post(admin, CSV).get_json()
+    assert (report["inserted"], report["updated"], report["rejected"]) == (2, 0, 0)
+    ada = _employees()["0101"]
+    assert (ada.shift_type, ada.seniority_rank, ada.categories) == ("DAY", 3, "Paint,Weld")
+    assert ada.category_mask and _employees()["0102"].seniority_rank is None
+
+    report = _post(admin, "first_name,last_name,clock_number\nAda,King,0101\nAlan,Turing,0103\n").get_json()
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    ada = _employees()["0101"]
+    assert (ada.last_name, ada.phone, ada.seniority_rank) == ("King", "555-0101", 3)   # absent columns kept
+
+def test_dry_run_writes_nothing(admin):
+    report = _post(admin, CSV, dry_run="1").get_json()
+    assert report["inserted"] == 2 and report["dry_run"]
+    assert _employees() == {}
+
+def test_nothing_valid_is_a_400(admin):
+    assert _post(admin, "name,clock_number\nAda,12\n").status_code == 400
+    assert _post(admin, "name,clock_number\n").status_code == 200
@@ -0,0 +1,53 @@
+# tests/test_ledger.py
+from datetime import date, timedelta
+from sqlalchemy import select
+from app.ledger import rebuild, record_signup, rolling_totals
+from app.models import session, HoursLedger
+from app.services import assign_slot
+from app.utils import monday_of
+
+TUE, SAT = 1, 5
+
+def _ledger():
+    return sorted(session().execute(select(HoursLedger.employee_id, HoursLedger.week_start,
+                                           HoursLedger.hours, HoursLedger.shifts)).all())
+
+def test_signups_accumulate_per_week(week, make_employee):
+    emp = make_employee()
+    assign_slot(week["slots"][TUE, "Full 8"], emp)
+    assign_slot(week["slots"][SAT, "First 4"], emp)
+    assert _ledger() == [(emp, week["start"], 12, 2)]
+
+def test_rebuild_matches_the_incremental_ledger(week, make_employee):
+    a, b = make_employee(), make_employee()
+    assign_slot(week["slots"][TUE, "Full 8"], a)
+    assign_slot(week["slots"][SAT, "Last 4"], a)
+    assign_slot(week["slots"][TUE, "Full 8"], b)
+    incremental = _ledger()
+    s = session()
+    assert rebuild(s, batch_size=2) == 3
+    s.commit()
+    assert _ledger() == incremental
+
+def test_rolling_windows(week, make_employee):
+    emp = make_employee()
+    s = session()
+    for weeks_back, hours in ((0, 8), (3, 4), (4, 12), (51, 2), (52, 100)):
+        record_signup(s, emp, week["start"] - timedelta(weeks=weeks_back), "Full 8")
+        s.execute(HoursLedger.__table__.update()
+                  .where(HoursLedger.week_start == week["start"] - timedelta(weeks=weeks_back))
+                  .values(hours=hours))
+    s.commit()
+    [row] = rolling_totals(session(), week["start"] + timedelta(days=3))
+    assert (row["hours_4w"], row["hours_13w"], row["hours_52w"]) == (12, 24, 26)
+
+def test_report_orders(admin, make_employee):
+    busy, rested, unranked = make_employee(rank=1), make_employee(rank=2), make_employee(rank=None)
+    s = session()
+    record_signup(s, busy, monday_of(date.today()), "Full 8")
+    s.commit()
+    equalized = admin.get("/admin/reports/hours").get_json()
+    assert [r["employee_id"] for r in equalized] == [rested, unranked, busy]
+    by_rank = admin.get("/admin/reports/hours?order=seniority").get_json()
+    assert [r["employee_id"] for r in by_rank] == [busy, rested, unranked]
+    assert admin.get("/admin/reports/hours?as_of=soon").status_code == 400
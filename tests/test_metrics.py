@@ -0,0 +1,29 @@
+# tests/test_metrics.py
+import re
+
+def _count(text, endpoint):
+    found = re.search(rf'overtime_request_duration_seconds_count{{endpoint="{endpoint}"}} (\d+)', text)
+    return int(found.group(1)) if found else 0
+
+def test_metrics_needs_admin_or_token(app, admin):
+    app.config["METRICS_TOKEN"] = "s3cret"
+    anon = app.test_client()
+    assert anon.get("/metrics").status_code == 401
+    assert anon.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert anon.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    assert admin.get("/metrics").status_code == 200
+
+def test_requests_are_counted_per_endpoint(admin):
+    before = _count(admin.get("/metrics").get_data(as_text=True), "api_roster")
+    admin.get("/api/roster")
+    admin.get("/api/roster")
+    text = admin.get("/metrics").get_data(as_text=True)
+    assert _count(text, "api_roster") == before + 2
+    assert '# TYPE overtime_request_duration_seconds histogram' in text
+    assert re.search(r'overtime_request_sql_statements_total{endpoint="api_roster"} [1-9]', text)
+
+def test_debug_headers(app, client):
+    app.config["METRICS_HEADERS"] = True
+    resp = client.get("/api/roster")
+    assert int(resp.headers["X-Query-Count"]) >= 1
+    assert resp.headers["Server-Timing"].startswith("db;dur=")
@@ -0,0 +1,79 @@
+# tests/test_notify.py
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, update
+from app import notify
+from app.models import session, Notification
+from app.services import assign_slot
+
+SAT = 5
+
+@pytest.fixture
+def outbox(app, monkeypatch):
+    """Notifications on, and a dispatcher on a FakeTransport that is drained by hand."""
+    monkeypatch.setattr(notify, "_enabled", True)
+    made = []
+
+    def dispatcher(fail_first=0, **kw):
+        d = notify.Dispatcher(notify.FakeTransport(fail_first), per_second=0, **kw)
+        made.append(d)
+        return d
+
+    yield dispatcher
+    for d in made:
+        d.pool.shutdown(wait=True)
+
+def _rows():
+    s = session()
+    s.expire_all()
+    return s.execute(select(Notification.kind, Notification.employee_id, Notification.status,
+                            Notification.attempts).order_by(Notification.id)).all()
+
+def _due_now():
+    s = session()
+    s.execute(update(Notification).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+    s.commit()
+
+def test_signup_and_bump_are_queued_once(outbox, week, make_employee):
+    slot = week["slots"][SAT, "Full 8"]
+    junior, senior = make_employee(rank=9, phone="555-0109"), make_employee(rank=1, phone="555-0101")
+    assign_slot(slot, junior)
+    assign_slot(slot, senior)
+    assign_slot(slot, senior)
+    assert [r[:2] for r in _rows()] == [("signup", junior), ("signup", senior), ("bump", junior)]
+
+def test_drain_sends_and_fails_rows_without_a_phone(outbox, week, make_employee):
+    d = outbox()
+    reachable, silent = make_employee(phone=" 555-0101 "), make_employee(phone="")
+    assign_slot(week["slots"][SAT, "First 4"], reachable)
+    assign_slot(week["slots"][SAT, "First 4"], silent)
+    assert d.drain_once() == 2 and d.drain_once() == 0
+    assert [r[2:] for r in _rows()] == [("sent", 1), ("failed", 1)]
+    assert d.transport.sent == [("555-0101", "Overtime: you are signed up for First 4 on "
+                                 + (week["start"] + timedelta(days=SAT)).strftime("%a %m/%d") + ".")]
+
+def test_failures_back_off_then_give_up(outbox, week, make_employee):
+    d = outbox(fail_first=5, max_attempts=2)
+    assign_slot(week["slots"][SAT, "Last 4"], make_employee(phone="555-0101"))
+    assert d.drain_once() == 1
+    [(_, _, status, attempts)] = _rows()
+    assert (status, attempts) == ("pending", 1)
+    assert d.drain_once() == 0                # not due until the backoff has passed
+    _due_now()
+    assert d.drain_once() == 1
+    assert [r[2:] for r in _rows()] == [("failed", 2)] and d.transport.sent == []
+    assert [notify.backoff(n) for n in (1, 2, 3, 20)] == [30, 60, 120, notify.BACKOFF_MAX]
+
+def test_lease_is_released_only_after_it_runs_out(outbox, week, make_employee):
+    d = outbox()
+    assign_slot(week["slots"][SAT, "Full 8"], make_employee(phone="555-0101"))
+    s = session()
+    assert len(d._claim(s, datetime.utcnow())) == 1        # claimed, then the process "dies"
+    assert d.release_stuck() == 0 and d.drain_once() == 0
+    assert d.release_stuck(datetime.utcnow() + timedelta(seconds=notify.LEASE_SECONDS + 1)) == 1
+    _due_now()
+    assert d.drain_once() == 1 and [r[2] for r in _rows()] == ["sent"]
+
+def test_disabled_outbox_writes_nothing(app, week, make_employee):
+    assign_slot(week["slots"][SAT, "Full 8"], make_employee(phone="555-0101"))
+    assert _rows() == []
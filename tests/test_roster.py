@@ -0,0 +1,49 @@
+# tests/test_roster.py
+import pytest
+from app.roster import RosterIndex, normalize
+
+ROWS = [
+    (1, "José", "Silva", "0412", "J. Silva - 0412"),
+    (2, "Ann", "Silvers", "1234", "A. Silvers - 1234"),
+    (3, "Sam", "Jones", "5678", "S. Jones - 5678"),
+]
+
+@pytest.fixture
+def index():
+    return RosterIndex(ROWS)
+
+def _ids(entries):
+    return [e["id"] for e in entries]
+
+def test_normalize_folds_case_and_accents():
+    assert normalize("  JOSÉ ") == "jose"
+
+def test_prefix_and_exact_matches(index):
+    assert _ids(index.search("silv")) == [1, 2]
+    assert _ids(index.search("silva")) == [1]
+    assert _ids(index.search("jose")) == [1]
+    assert _ids(index.search("041")) == [1]
+
+def test_mid_word_match_by_trigrams(index):
+    assert _ids(index.search("ilve")) == [2]
+
+def test_every_term_must_match(index):
+    assert _ids(index.search("ann silv")) == [2]
+    assert index.search("ann jones") == []
+
+def test_blank_query_lists_the_roster_up_to_the_limit(index):
+    assert _ids(index.search("", limit=2)) == [1, 2]
+
+def test_api_roster_etag_and_refresh(admin, make_employee):
+    make_employee()
+    first = admin.get("/api/roster")
+    assert first.status_code == 200 and first.headers["ETag"]
+    assert admin.get("/api/roster", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    admin.post("/admin/employees", data={"name": "Zed Zulu", "clock_number": "4444"})
+    again = admin.get("/api/roster", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 200 and "Zed Zulu" in again.get_data(as_text=True)
+
+def test_api_roster_search(client, make_employee):
+    make_employee()
+    resp = client.get("/api/roster/search?q=no1")
+    assert [e["tag"] for e in resp.get_json()] == ["E. No1 - 1000"]
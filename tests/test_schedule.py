@@ -0,0 +1,64 @@
+# tests/test_schedule.py
+from datetime import timedelta
+import pytest
+from sqlalchemy import func, select
+from app.models import session, Signup
+from app.schedule import parse_caps, week_conflicts
+from app.services import assign_slot
+from app.weeks import slot_interval
+
+TUE, WED = 1, 2
+
+def _signups():
+    return session().execute(select(func.count(Signup.id))).scalar()
+
+def _force(week, emp, day, code):
+    """A signup written directly, past the rules (as old data or an admin edit could leave it)."""
+    s = session()
+    starts_at, ends_at = slot_interval(week["start"] + timedelta(days=day), code)
+    s.add(Signup(slot_id=week["slots"][day, code], employee_id=emp, starts_at=starts_at, ends_at=ends_at))
+    s.commit()
+
+def test_overlapping_shift_is_refused(week, make_employee):
+    emp = make_employee()
+    assert assign_slot(week["slots"][TUE, "Full 8"], emp)[1] == 200
+    body, status = assign_slot(week["slots"][TUE, "First 4"], emp)
+    assert status == 400 and body["error"].startswith("Overlaps your Full 8 shift")
+    assert _signups() == 1
+
+def test_back_to_back_halves_are_allowed(week, make_employee):
+    emp = make_employee()
+    assert assign_slot(week["slots"][TUE, "First 4"], emp)[1] == 200
+    assert assign_slot(week["slots"][TUE, "Last 4"], emp)[1] == 200
+
+def test_weekly_hours_cap(app, week, make_employee):
+    app.config["WEEKLY_HOURS_CAP"] = {"DAY": 8}
+    emp = make_employee(shift_type="DAY")
+    assert assign_slot(week["slots"][TUE, "Full 8"], emp)[1] == 200
+    body, status = assign_slot(week["slots"][WED, "First 4"], emp)
+    assert status == 400 and body["error"].startswith("Weekly overtime cap of 8 h reached")
+    rotating = make_employee(shift_type="ROTATING")   # no cap configured for this shift type
+    assert assign_slot(week["slots"][TUE, "Full 8"], rotating)[1] == 200
+    assert assign_slot(week["slots"][WED, "Full 8"], rotating)[1] == 200
+
+def test_parse_caps():
+    assert parse_caps(" day:16, rotating:12 ,night:0") == {"DAY": 16, "ROTATING": 12}
+    assert parse_caps("") == {}
+    with pytest.raises(ValueError):
+        parse_caps("DAY=16")
+
+def test_week_conflicts(app, admin, week, make_employee):
+    app.config["WEEKLY_HOURS_CAP"] = {"DAY": 12}
+    clashing, busy, fine = make_employee(), make_employee(), make_employee()
+    _force(week, clashing, TUE, "Full 8")
+    _force(week, clashing, TUE, "Last 4")
+    for day in (TUE, WED):
+        _force(week, busy, day, "Full 8")
+    _force(week, fine, TUE, "First 4")
+    _force(week, fine, TUE, "Last 4")
+    report = admin.get(f"/admin/api/weeks/{week['id']}/conflicts").get_json()
+    assert report == week_conflicts(session(), week["id"])
+    [overlap] = report["overlaps"]
+    assert overlap["employee_id"] == clashing
+    assert [sl["code"] for sl in overlap["slots"]] == ["Full 8", "Last 4"]
+    assert [(c["employee_id"], c["hours"], c["cap"]) for c in report["over_cap"]] == [(busy, 16, 12)]
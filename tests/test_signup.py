@@ -0,0 +1,36 @@
+# tests/test_signup.py
+from sqlalchemy import func, select
+from app.models import session, Signup, Slot, HoursLedger
+from app.services import assign_slot
+
+TUE = 1
+
+def _signups(slot_id=None):
+    s = session()
+    stmt = select(func.count(Signup.id))
+    if slot_id is not None:
+        stmt = stmt.where(Signup.slot_id == slot_id)
+    return s.execute(stmt).scalar()
+
+def test_signup_records_hours(week, make_employee):
+    emp = make_employee()
+    body, status = assign_slot(week["slots"][TUE, "Full 8"], emp)
+    assert status == 200 and body["ok"]
+    assert session().execute(select(HoursLedger.hours).where(HoursLedger.employee_id == emp)).scalar() == 8
+
+def test_duplicate_signup_is_a_no_op(week, make_employee):
+    emp, slot = make_employee(), week["slots"][TUE, "First 4"]
+    assert assign_slot(slot, emp)[1] == 200
+    body, status = assign_slot(slot, emp)
+    assert status == 200 and body["message"] == "Already signed up"
+    assert _signups(slot) == 1
+
+def test_full_slot_is_refused(week, make_employee):
+    slot = week["slots"][TUE, "Last 4"]
+    s = session()
+    s.get(Slot, slot).capacity = 1
+    s.commit()
+    assert assign_slot(slot, make_employee())[1] == 200
+    body, status = assign_slot(slot, make_employee())
+    assert status == 400 and body["error"] == "Slot is full"
+    assert _signups(slot) == 1
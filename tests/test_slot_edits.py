@@ -0,0 +1,57 @@
+# tests/test_slot_edits.py
+import pytest
+from app.models import session, Slot
+from app.slot_edits import validate
+
+TUE = 1
+
+def _batch(admin, *changes):
+    return admin.post("/admin/api/slots/batch", json={"changes": list(changes)})
+
+def _slot(slot_id):
+    s = session()
+    s.expire_all()
+    return s.get(Slot, slot_id)
+
+def test_edits_bump_the_version(admin, week):
+    slot = week["slots"][TUE, "Full 8"]
+    resp = _batch(admin, {"id": slot, "version": 1, "capacity": 5, "categories": ["Weld", "Paint"]})
+    assert resp.status_code == 200
+    assert resp.get_json()["applied"] == [{"id": slot, "version": 2}]
+    row = _slot(slot)
+    assert (row.capacity, row.categories, row.version) == (5, "Paint,Weld", 2)
+    assert row.category_mask != 0
+
+def test_stale_version_is_a_conflict_and_the_rest_commits(admin, week):
+    stale, fresh = week["slots"][TUE, "First 4"], week["slots"][TUE, "Last 4"]
+    assert _batch(admin, {"id": stale, "version": 1, "label": "Early"}).status_code == 200
+    resp = _batch(admin, {"id": stale, "version": 1, "label": "Mine"}, {"id": fresh, "version": 1, "capacity": 3})
+    assert resp.status_code == 409
+    body = resp.get_json()
+    assert [c["id"] for c in body["conflicts"]] == [stale]
+    assert body["conflicts"][0]["label"] == "Early" and body["conflicts"][0]["version"] == 2
+    assert body["applied"] == [{"id": fresh, "version": 2}]
+    assert _slot(stale).label == "Early"
+    assert _slot(fresh).capacity == 3
+
+def test_unknown_slot_is_reported_missing(admin, week):
+    resp = _batch(admin, {"id": 999999, "version": 1, "capacity": 1})
+    assert resp.status_code == 409 and resp.get_json()["missing"] == [999999]
+
+@pytest.mark.parametrize("change, error", [
+    ({"capacity": -1}, "capacity must be >= 0"),
+    ({"capacity": "many"}, "capacity must be an integer"),
+    ({"label": "  "}, "label cannot be empty"),
+    ({"categories": 5}, "categories must be a string or a list of strings"),
+    ({"categories": True}, "categories must be a string or a list of strings"),
+    ({"categories": ["Weld", 3]}, "categories must be a string or a list of strings"),
+    ({}, "nothing to change"),
+])
+def test_bad_values_reject_the_whole_batch(admin, week, change, error):
+    good = {"id": week["slots"][TUE, "Full 8"], "version": 1, "capacity": 4}
+    resp = _batch(admin, good, {"id": week["slots"][TUE, "First 4"], "version": 1, **change})
+    assert resp.status_code == 400 and error in resp.get_json()["error"]
+    assert _slot(good["id"]).version == 1
+
+def test_validate_accepts_a_comma_string():
+    assert validate([{"id": 1, "version": 1, "categories": "Weld, QA"}])[0]["categories"] == ["Weld", "QA"]
@@ -0,0 +1,20 @@
+# tests/test_startup.py
+from sqlalchemy import func, select
+from app import create_app
+from app.models import session, AppMeta, Category
+
+def test_second_boot_skips_create_all(app):
+    assert app.config["STARTUP_TIMING"]["schema"] == "created"
+    again = create_app(start_background=False)
+    assert again.config["STARTUP_TIMING"]["schema"] == "fingerprint match"
+
+def test_stale_fingerprint_recreates_without_reseeding(app):
+    s = session()
+    categories = s.execute(select(func.count(Category.id))).scalar()
+    s.merge(AppMeta(key="schema", value="stale"))
+    s.commit()
+    again = create_app(start_background=False)
+    assert again.config["STARTUP_TIMING"]["schema"] == "created"
+    s = session()
+    assert s.get(AppMeta, "schema").value != "stale"
+    assert s.execute(select(func.count(Category.id))).scalar() == categories
@@ -0,0 +1,36 @@
+# tests/test_state.py
+from datetime import date, datetime
+import pytest
+from app.state import CLOSED, FROZEN, FULL, OPEN, apply_states, blocked_state, freeze_at, slot_state, zone
+
+TZ = "America/Los_Angeles"
+SAT, TUE = date(2030, 6, 8), date(2030, 6, 4)
+
+def _at(*args):
+    return zone(TZ).localize(datetime(*args))
+
+def _row(day, taken=0, capacity=2, is_closed=False):
+    return {"date": day, "taken": taken, "capacity": capacity, "is_closed": is_closed}
+
+def test_weekend_freezes_friday_afternoon():
+    assert freeze_at(SAT, TZ) == _at(2030, 6, 7, 15, 30)
+    assert freeze_at(date(2030, 6, 9), TZ) == freeze_at(SAT, TZ)
+    assert freeze_at(TUE, TZ) is None
+
+@pytest.mark.parametrize("now, expected", [((2030, 6, 7, 15, 29), None), ((2030, 6, 7, 15, 30), FROZEN)])
+def test_frozen_from_the_freeze_instant(now, expected):
+    assert blocked_state(SAT, "published", False, _at(*now)) == expected
+
+def test_states():
+    now = _at(2030, 6, 3, 9, 0)
+    assert slot_state(_row(TUE), "published", now) == OPEN
+    assert slot_state(_row(TUE, taken=2), "published", now) == FULL
+    assert slot_state(_row(TUE, is_closed=True), "published", now) == CLOSED
+    assert slot_state(_row(TUE), "draft", now) == CLOSED
+    assert slot_state(_row(SAT, taken=2), "published", _at(2030, 6, 8, 9, 0)) == FROZEN
+
+def test_apply_states_leaves_the_cached_grid_alone():
+    grid = [{"date": SAT.isoformat(), "rows": [_row(SAT)]}]
+    [day] = apply_states(grid, "published", _at(2030, 6, 8, 9, 0))
+    assert day["rows"][0]["disabled"] and day["rows"][0]["state_hint"] == "Frozen"
+    assert "state" not in grid[0]["rows"][0]
@@ -0,0 +1,34 @@
+# tests/test_stream.py
+import json
+from app.services import assign_slot
+from app.stream import event_stream, stream_id
+
+TUE = 1
+
+def _parse(event):
+    fields = dict(line.split(": ", 1) for line in event.strip().splitlines())
+    return fields["event"], fields["id"], json.loads(fields["data"])
+
+def test_new_client_gets_a_snapshot_then_deltas(week, make_employee):
+    watch = lambda: [(week["id"], "published")]
+    events = event_stream(watch, None)
+    assert next(events).startswith("retry:")
+    kind, _, data = _parse(next(events))
+    assert kind == "snapshot" and len(data["slots"]) == len(week["slots"])
+    slot = week["slots"][TUE, "Full 8"]
+    assign_slot(slot, make_employee())
+    kind, event_id, data = _parse(next(events))
+    assert kind == "delta" and event_id == stream_id()
+    assert [(s["slot_id"], s["taken"]) for s in data["slots"]] == [(slot, 1)]
+
+def test_reconnect_with_current_id_skips_the_snapshot(week, make_employee):
+    events = event_stream(lambda: [(week["id"], "published")], stream_id())
+    assert next(events).startswith("retry:")
+    assign_slot(week["slots"][TUE, "First 4"], make_employee())
+    kind, _, data = _parse(next(events))
+    assert kind == "delta" and len(data["slots"]) == 1
+
+def test_reconnect_with_stale_id_resyncs(week):
+    events = event_stream(lambda: [(week["id"], "published")], "gone-0")
+    next(events)
+    assert _parse(next(events))[0] == "snapshot"
@@ -0,0 +1,36 @@
+# tests/test_weeks.py
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from app.models import session, Week, Slot
+from app.weeks import clone_weeks, slot_interval, template_layout, week_layout
+
+def test_clone_copies_a_week_layout(week):
+    s = session()
+    s.query(Slot).filter(Slot.id == week["slots"][1, "Full 8"]).update({Slot.capacity: 7, Slot.label: "Big"})
+    layout = week_layout(s, week["id"])
+    created = clone_weeks(s, layout, week["start"] + timedelta(weeks=1), 3, status="published")
+    s.commit()
+    assert [d for _, d in created] == [week["start"] + timedelta(weeks=i) for i in (1, 2, 3)]
+    copy = s.execute(select(Slot).where(Slot.week_id == created[0][0], Slot.label == "Big")).scalar_one()
+    assert (copy.capacity, copy.code, copy.date) == (7, "Full 8", week["start"] + timedelta(days=8))
+    assert (copy.starts_at, copy.ends_at) == slot_interval(copy.date, "Full 8")
+
+def test_existing_weeks_are_skipped(week):
+    s = session()
+    created = clone_weeks(s, template_layout("weekdays"), week["start"], 2)
+    s.commit()
+    assert [d for _, d in created] == [week["start"] + timedelta(weeks=1)]
+    assert s.execute(select(func.count(Slot.id)).where(Slot.week_id == week["id"])).scalar() == len(week["slots"])
+
+def test_start_snaps_to_monday(app):
+    s = session()
+    [(week_id, start)] = clone_weeks(s, template_layout("weekdays"), date(2031, 3, 5), 1)
+    assert start.weekday() == 0 and s.get(Week, week_id).end_date == start + timedelta(days=6)
+
+def test_plan_endpoint(admin, week):
+    resp = admin.post("/admin/weeks/plan", json={"start": (week["start"] + timedelta(weeks=1)).isoformat(),
+                                                 "count": 4, "source_week_id": week["id"]})
+    assert resp.status_code == 200
+    assert len(resp.get_json()["created"]) == 4 and resp.get_json()["skipped"] == 0
+    bad = admin.post("/admin/weeks/plan", json={"start": week["start"].isoformat(), "count": 500})
+    assert bad.status_code == 400
@@ -0,0 +1,66 @@
+# tests/test_workers.py
+import os, subprocess, sys, threading
+import pytest
+from app import changes, jobs
+
+@pytest.fixture
+def stamp(tmp_path, monkeypatch):
+    """changes.py pointed at a fresh stamp file, with one counting handler."""
+    for name, value in (("_path", None), ("_seen", None), ("_handlers", [])):
+        monkeypatch.setattr(changes, name, value)
+    calls = []
+    changes.on_change(lambda: calls.append(1))
+    path = tmp_path / "overtime.changes"
+    changes.enable(str(path))
+    return path, calls
+
+def _sibling_publishes(path):
+    with open(path, "ab") as f:
+        f.write(b".")
+
+def test_sibling_writes_drop_the_caches_once(stamp):
+    path, calls = stamp
+    changes.check()
+    assert calls == [] and changes.sequence() == 0
+    _sibling_publishes(path)
+    _sibling_publishes(path)
+    changes.check()
+    changes.check()
+    assert calls == [1] and changes.sequence() == 2
+
+def test_own_publish_skips_the_handlers(stamp):
+    path, calls = stamp
+    changes.publish()
+    changes.check()
+    assert calls == [] and changes.sequence() == 1
+    _sibling_publishes(path)
+    changes.publish()          # a sibling wrote in between: handlers run
+    assert calls == [1] and changes.sequence() == 3
+
+def test_enable_never_moves_the_sequence_back(stamp):
+    path, _ = stamp
+    changes.publish()
+    changes.publish()
+    changes.enable(str(path))   # what a script building the app beside the workers does
+    assert path.stat().st_size == 2 and changes.sequence() == 2
+
+def test_jobs_lock_hands_over_when_the_holder_exits(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "_fd", None)
+    monkeypatch.setattr(jobs, "_held", False)
+    path = jobs.lock_path(app.config["DATABASE_URL"])
+    holder = subprocess.Popen(
+        [sys.executable, "-c", "import fcntl, os, sys; fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT);"
+         " fcntl.flock(fd, fcntl.LOCK_EX); os.write(fd, b'4242\\n'); print('held', flush=True); sys.stdin.read()", path],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline() == "held\n"
+        started = threading.Event()
+        assert jobs.lead(app, started.set) is False
+        assert not jobs.held() and not started.wait(0.2)
+    finally:
+        holder.stdin.close()
+        holder.wait(5)
+    assert started.wait(5) and jobs.held()
+    with open(path) as f:
+        assert f.read().strip() == str(os.getpid())
+    os.close(jobs._fd)